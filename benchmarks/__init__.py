@@ -0,0 +1 @@
+"""Load-testing and benchmarking tools for Sieve (not shipped with the app)."""
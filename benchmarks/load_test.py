@@ -0,0 +1,376 @@
+"""End-to-end load test of the real application against mocked upstreams.
+
+Starts :mod:`benchmarks.mock_upstreams` and the Sieve app under uvicorn in
+separate processes, drives ``/api/ask`` (or ``/api/ask/stream``) with a fixed
+number of concurrent clients and prints a JSON report: throughput, latency
+percentiles and per-stage breakdown taken from the ``Server-Timing`` header.
+
+    python -m benchmarks.load_test --concurrency 32 --duration 30 --output run.json
+    python -m benchmarks.load_test --compare run.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from benchmarks.mock_upstreams import GOOGLE_PATH, add_profile_arguments
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ENDPOINTS = {"ask": "/api/ask", "stream": "/api/ask/stream"}
+REPORT_PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class LoadSamples:
+    """Raw observations collected by the load generator."""
+
+    latencies: list[float] = field(default_factory=list)
+    first_byte: list[float] = field(default_factory=list)
+    statuses: Counter[str] = field(default_factory=Counter)
+    stages: defaultdict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    cache_hits: int = 0
+
+    def add(
+        self,
+        status: str,
+        latency: float,
+        first_byte: float | None = None,
+        server_timing: str | None = None,
+        cache_hit: bool = False,
+    ) -> None:
+        self.statuses[status] += 1
+        self.latencies.append(latency)
+        if first_byte is not None:
+            self.first_byte.append(first_byte)
+        for stage, ms in parse_server_timing(server_timing or "").items():
+            self.stages[stage].append(ms / 1000)
+        self.cache_hits += cache_hit
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """Map ``name;dur=12.5, other;dur=3`` to ``{"name": 12.5, "other": 3.0}`` (ms)."""
+    timings: dict[str, float] = {}
+    for metric in header.split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(q / 100 * len(ordered) + 0.5 - 1e-9))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def distribution_ms(values: list[float]) -> dict[str, float]:
+    summary = {f"p{q}": round(percentile(values, q) * 1000, 1) for q in REPORT_PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values) * 1000, 1) if values else 0.0
+    summary["max"] = round(max(values, default=0.0) * 1000, 1)
+    return summary
+
+
+def summarize(samples: LoadSamples, elapsed: float) -> dict:
+    total = sum(samples.statuses.values())
+    ok = samples.statuses.get("200", 0)
+    report = {
+        "requests": total,
+        "ok": ok,
+        "error_rate": round(1 - ok / total, 4) if total else 0.0,
+        "status_counts": dict(samples.statuses),
+        "duration_s": round(elapsed, 2),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "ok_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "cache_hits": samples.cache_hits,
+        "latency_ms": distribution_ms(samples.latencies),
+        "stages_ms": {
+            stage: distribution_ms(values) for stage, values in sorted(samples.stages.items())
+        },
+    }
+    if samples.first_byte:
+        report["first_byte_ms"] = distribution_ms(samples.first_byte)
+    return report
+
+
+class QueryFeed:
+    """Questions for the generator; ``pool`` > 0 repeats them to exercise caches."""
+
+    def __init__(self, pool: int) -> None:
+        self._pool = pool
+        self._next = 0
+
+    def __next__(self) -> str:
+        number = self._next % self._pool if self._pool > 0 else self._next
+        self._next += 1
+        return f"benchmark question {number}"
+
+
+async def _issue(
+    client: httpx.AsyncClient, path: str, body: dict, samples: LoadSamples, stream: bool
+) -> None:
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        async with client.stream("POST", path, json=body) as response:
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+            status = str(response.status_code)
+            timing = response.headers.get("server-timing")
+            cache_hit = response.headers.get("x-sieve-cache") == "HIT"
+    except httpx.HTTPError as exc:
+        samples.add(type(exc).__name__, time.perf_counter() - started)
+        return
+    samples.add(
+        status,
+        time.perf_counter() - started,
+        first_byte if stream else None,
+        timing,
+        cache_hit,
+    )
+
+
+async def generate_load(
+    base_url: str,
+    *,
+    endpoint: str = "ask",
+    concurrency: int = 16,
+    duration: float = 10.0,
+    max_requests: int = 0,
+    warmup: float = 0.0,
+    query_pool: int = 0,
+    top_n: int | None = None,
+    timeout: float = 60.0,
+) -> tuple[LoadSamples, float]:
+    """Closed-loop load: ``concurrency`` clients each send the next request on completion.
+
+    Requests issued during ``warmup`` are sent but not recorded.
+    """
+    path = ENDPOINTS[endpoint]
+    feed = QueryFeed(query_pool)
+    samples = LoadSamples()
+    discarded = LoadSamples()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    issued = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        stop_at = measure_from + duration
+
+        async def worker() -> None:
+            nonlocal issued
+            while time.perf_counter() < stop_at:
+                if max_requests and issued >= max_requests:
+                    return
+                issued += 1
+                body: dict = {"query": next(feed)}
+                if top_n is not None:
+                    body["top_n"] = top_n
+                target = samples if time.perf_counter() >= measure_from else discarded
+                await _issue(client, path, body, target, endpoint == "stream")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - max(measure_from, started)
+    return samples, elapsed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Процесс завершился до готовности ({url})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Сервер не ответил за {timeout} с: {url}")
+
+
+@contextmanager
+def _process(command: list[str], ready_url: str, env: dict[str, str]) -> Iterator[None]:
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+    try:
+        _wait_ready(ready_url, process)
+        yield
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def app_environment(mock_url: str, overrides: list[str]) -> dict[str, str]:
+    """Environment for the app process: mocked upstreams and no rate limiting."""
+    env = {
+        **os.environ,
+        "GOOGLE_API_KEY": "benchmark",
+        "GOOGLE_CSE_ID": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "GOOGLE_SEARCH_ENDPOINT": f"{mock_url}{GOOGLE_PATH}",
+        "OPENAI_BASE_URL": f"{mock_url}/v1",
+        "RATE_LIMIT_ENABLED": "false",
+        "HISTORY_BACKEND": "memory",
+    }
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Ожидалось KEY=VALUE, получено {item!r}")
+        env[key.upper()] = value
+    return env
+
+
+def _git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare_reports(current: dict, baseline: dict) -> dict[str, float]:
+    """Relative change of throughput and latency percentiles versus ``baseline``."""
+    changes: dict[str, float] = {}
+    for key in ("rps", "ok_rps"):
+        if baseline.get(key):
+            changes[key] = round(current[key] / baseline[key] - 1, 4)
+    for name, value in baseline.get("latency_ms", {}).items():
+        if value:
+            changes[f"latency_{name}"] = round(current["latency_ms"][name] / value - 1, 4)
+    return changes
+
+
+def run(args: argparse.Namespace) -> dict:
+    mock_port = args.mock_port or _free_port()
+    app_port = args.app_port or _free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+
+    mock_command = [
+        sys.executable, "-m", "benchmarks.mock_upstreams",
+        "--port", str(mock_port),
+        "--google-latency", args.google_latency,
+        "--google-error-rate", str(args.google_error_rate),
+        "--google-results-bytes", str(args.google_results_bytes),
+        "--openai-latency", args.openai_latency,
+        "--openai-error-rate", str(args.openai_error_rate),
+        "--answer-bytes", str(args.answer_bytes),
+    ]  # fmt: skip
+    if args.seed is not None:
+        mock_command += ["--seed", str(args.seed)]
+    app_command = [
+        sys.executable, "-m", "uvicorn", "src.sieve.api.main:build_app", "--factory",
+        "--port", str(app_port), "--workers", str(args.workers),
+        "--log-level", "warning", "--no-access-log",
+    ]  # fmt: skip
+
+    with _process(mock_command, f"{mock_url}/_mock/stats", dict(os.environ)):
+        with _process(app_command, f"{app_url}/health", app_environment(mock_url, args.set)):
+            samples, elapsed = asyncio.run(
+                generate_load(
+                    app_url,
+                    endpoint=args.endpoint,
+                    concurrency=args.concurrency,
+                    duration=args.duration,
+                    max_requests=args.requests,
+                    warmup=args.warmup,
+                    query_pool=args.query_pool,
+                    top_n=args.top_n,
+                )
+            )
+            upstream_calls = httpx.get(f"{mock_url}/_mock/stats").json()["calls"]
+
+    report = {
+        "label": args.label or _git_revision(),
+        "config": {
+            "endpoint": args.endpoint,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "query_pool": args.query_pool,
+            "top_n": args.top_n,
+            "workers": args.workers,
+            "google_latency": args.google_latency,
+            "google_error_rate": args.google_error_rate,
+            "openai_latency": args.openai_latency,
+            "openai_error_rate": args.openai_error_rate,
+            "answer_bytes": args.answer_bytes,
+            "app_env": args.set,
+        },
+        **summarize(samples, elapsed),
+        "upstream_calls": upstream_calls,
+    }
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        report["compared_to"] = baseline.get("label")
+        report["change"] = compare_reports(report, baseline)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="ask")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds")
+    parser.add_argument("--requests", type=int, default=0, help="stop after N requests")
+    parser.add_argument("--query-pool", type=int, default=0, help="0: every query unique")
+    parser.add_argument("--top-n", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--app-port", type=int, default=0)
+    parser.add_argument("--mock-port", type=int, default=0)
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="KEY=VALUE", help="app setting"
+    )
+    parser.add_argument("--label", default=None, help="defaults to the git revision")
+    parser.add_argument("--output", default=None, help="write the report to this file")
+    parser.add_argument("--compare", default=None, help="baseline report to diff against")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""Microbenchmarks for the pure parts of the request path and the history store.
+
+Data comes from seeded generators so runs are comparable. Every case is timed
+in several rounds (loop count calibrated per case, GC disabled like
+:mod:`timeit`) and reported as per-call statistics in microseconds.
+
+Two checks guard against regressions:
+
+* ``--check baseline.json`` compares medians with a stored run;
+* cases measured at several sizes are checked for their expected growth
+  (constant or linear per call), which catches accidental quadratic behaviour
+  on any machine, with or without a baseline.
+
+    python -m benchmarks.micro --save benchmarks/baseline.json
+    python -m benchmarks.micro --check benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import UUID
+
+from src.sieve.config import Settings
+from src.sieve.models.ask import Citation
+from src.sieve.repositories.history_repository import HistoryRepository, build_history_entry
+from src.sieve.services.ask_service import _build_citations
+from src.sieve.services.google import SearchResult
+from src.sieve.services.openai_payload import build_responses_payload, extract_answer_chunks
+from src.sieve.services.source_packing import pack_sources
+
+SEED = 20240601
+HISTORY_SIZES = (1_000, 10_000, 100_000)
+QUICK_MAX_SIZE = 10_000
+
+# Allowed growth exponent of the per-call time between the smallest and the
+# largest size: constant cases may drift (cache effects), linear ones too, but
+# an extra factor of n is never within these bounds.
+GROWTH_LIMITS = {"1": 0.5, "n": 1.5}
+
+_WORDS = (
+    "python asyncio latency cache search answer source model stream history "
+    "request pool index token budget queue deadline retry circuit breaker"
+).split()
+
+
+# -- fixed data generators ---------------------------------------------------
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def make_results(count: int, seed: int = SEED) -> list[SearchResult]:
+    rng = random.Random(seed)
+    return [
+        SearchResult(
+            title=_sentence(rng, 8),
+            url=f"https://example.com/{seed}/{index}",
+            snippet=_sentence(rng, 30),
+            index=index,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def make_citations(count: int, seed: int = SEED) -> list[Citation]:
+    return _build_citations(make_results(count, seed))
+
+
+def make_response_payload(chunks: int, seed: int = SEED) -> dict:
+    rng = random.Random(seed)
+    return {
+        "id": "resp_benchmark",
+        "output": [
+            {"type": "reasoning", "summary": []},
+            {
+                "type": "message",
+                "content": [
+                    {"type": "output_text", "text": _sentence(rng, 20)} for _ in range(chunks)
+                ],
+            },
+        ],
+    }
+
+
+def make_history_fields(seed: int, results: int = 5) -> dict:
+    rng = random.Random(seed)
+    search_results = make_results(results, seed)
+    return {
+        "query": _sentence(rng, 6),
+        "top_n": results,
+        "model": "gpt-4o-mini",
+        "answer_markdown": _sentence(rng, 120),
+        "message": None,
+        "citations": _build_citations(search_results),
+        "results": search_results,
+        "search_used": True,
+    }
+
+
+def make_history(size: int) -> tuple[HistoryRepository, list[UUID]]:
+    """A full repository of ``size`` entries; the next insert evicts the oldest."""
+    repository = HistoryRepository(max_size=size)
+    # A pool of distinct documents keeps setup affordable at 100k entries
+    # while the search index still sees varied postings.
+    pool = [make_history_fields(SEED + offset) for offset in range(256)]
+    ids = [repository.insert(**pool[number % len(pool)]).id for number in range(size)]
+    return repository, ids
+
+
+# -- benchmark cases ---------------------------------------------------------
+
+
+@dataclass
+class Case:
+    """A prepared operation; ``reset`` runs untimed between rounds."""
+
+    op: Callable[[], object]
+    reset: Callable[[int], None] | None = None
+    max_loops: int | None = None
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[int], Case]
+    sizes: tuple[int, ...] = (0,)
+    # Expected growth of one call with the size: "1" constant, "n" linear.
+    complexity: str = "1"
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str, *, sizes: tuple[int, ...] = (0,), complexity: str = "1"
+) -> Callable[[Callable[[int], Case]], Callable[[int], Case]]:
+    def register(setup: Callable[[int], Case]) -> Callable[[int], Case]:
+        BENCHMARKS[name] = Benchmark(name, setup, sizes, complexity)
+        return setup
+
+    return register
+
+
+@benchmark("pack_sources", sizes=(10, 100), complexity="n")
+def _pack_sources(size: int) -> Case:
+    # Unlimited budget so every result is rendered, as in the worst case.
+    results = make_results(size)
+    settings = Settings(sources_token_budget=0)
+    return Case(lambda: pack_sources(results, "gpt-4o-mini", settings))
+
+
+@benchmark("responses_payload")
+def _responses_payload(size: int) -> Case:
+    sources_block = pack_sources(make_results(10), "gpt-4o-mini", Settings()).block
+    return Case(
+        lambda: build_responses_payload(
+            query="what changed in python 3.12", sources_block=sources_block, model="gpt-4o-mini"
+        )
+    )
+
+
+@benchmark("extract_answer_chunks", sizes=(10, 1_000), complexity="n")
+def _extract_answer_chunks(size: int) -> Case:
+    payload = make_response_payload(size)
+    return Case(lambda: extract_answer_chunks(payload))
+
+
+@benchmark("build_citations", sizes=(10, 100), complexity="n")
+def _citations(size: int) -> Case:
+    results = make_results(size)
+    return Case(lambda: _build_citations(results))
+
+
+@benchmark("history_entry")
+def _history_entry(size: int) -> Case:
+    fields = make_history_fields(SEED)
+    return Case(lambda: build_history_entry(**fields))
+
+
+@benchmark("history.insert", sizes=HISTORY_SIZES)
+def _history_insert(size: int) -> Case:
+    repository, _ = make_history(size)
+    fields = make_history_fields(SEED)
+    return Case(lambda: repository.insert(**fields))
+
+
+@benchmark("history.list_page", sizes=HISTORY_SIZES)
+def _history_list_page(size: int) -> Case:
+    repository, _ = make_history(size)
+    return Case(lambda: repository.list_page(limit=20))
+
+
+@benchmark("history.list_all", sizes=HISTORY_SIZES, complexity="n")
+def _history_list_all(size: int) -> Case:
+    repository, _ = make_history(size)
+    return Case(repository.list)
+
+
+@benchmark("history.delete", sizes=HISTORY_SIZES)
+def _history_delete(size: int) -> Case:
+    repository, ids = make_history(size)
+    fields = make_history_fields(SEED)
+    victims: Iterator[UUID] = iter(ids)
+
+    def op() -> object:
+        return repository.delete(next(victims))
+
+    def reset(loops: int) -> None:
+        # Refill the deleted slots so every round deletes from a full store.
+        nonlocal victims
+        fresh = [repository.insert(**fields).id for _ in range(loops)]
+        remaining = list(victims)
+        victims = iter(remaining + fresh)
+
+    return Case(op, reset=reset, max_loops=size // 2)
+
+
+# -- measurement ---------------------------------------------------------------
+
+
+@dataclass
+class Measurement:
+    name: str
+    size: int
+    loops: int
+    samples: list[float] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]" if self.size else self.name
+
+    def summary(self) -> dict:
+        samples = sorted(self.samples)
+        quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else samples * 3
+        return {
+            "size": self.size,
+            "loops": self.loops,
+            "rounds": len(samples),
+            "min_us": round(samples[0] * 1e6, 3),
+            "median_us": round(statistics.median(samples) * 1e6, 3),
+            "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+            "stdev_us": round(statistics.stdev(samples) * 1e6, 3) if len(samples) > 1 else 0.0,
+            "iqr_us": round((quartiles[2] - quartiles[0]) * 1e6, 3),
+        }
+
+
+def _time_loops(op: Callable[[], object], loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            op()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _calibrate(case: Case, min_time: float) -> int:
+    loops = 1
+    limit = case.max_loops or sys.maxsize
+    while loops < limit:
+        elapsed = _time_loops(case.op, loops)
+        if case.reset is not None:
+            case.reset(loops)
+        if elapsed >= min_time:
+            break
+        loops = min(limit, loops * 10 if elapsed < min_time / 10 else loops * 2)
+    return max(1, loops)
+
+
+def measure(bench: Benchmark, size: int, *, rounds: int = 7, min_time: float = 0.05) -> Measurement:
+    """Per-call time of ``bench`` at ``size`` over ``rounds`` calibrated rounds."""
+    case = bench.setup(size)
+    loops = _calibrate(case, min_time)
+    measurement = Measurement(bench.name, size, loops)
+    for _ in range(rounds):
+        measurement.samples.append(_time_loops(case.op, loops) / loops)
+        if case.reset is not None:
+            case.reset(loops)
+    return measurement
+
+
+def growth_violations(results: dict[str, dict]) -> list[str]:
+    """Cases whose per-call time grows faster with size than declared."""
+    problems = []
+    for bench in BENCHMARKS.values():
+        measured = [
+            results[key]
+            for key in (f"{bench.name}[{size}]" for size in bench.sizes)
+            if key in results
+        ]
+        if len(measured) < 2:
+            continue
+        first, last = measured[0], measured[-1]
+        exponent = math.log(last["median_us"] / first["median_us"]) / math.log(
+            last["size"] / first["size"]
+        )
+        if exponent > GROWTH_LIMITS[bench.complexity]:
+            problems.append(
+                f"{bench.name}: время вызова растёт как n^{exponent:.2f}, "
+                f"ожидалось O({bench.complexity})"
+            )
+    return problems
+
+
+def baseline_regressions(
+    results: dict[str, dict], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    """Cases slower than the baseline median by more than ``tolerance``.
+
+    The fastest round must also be slower than the baseline median, so a
+    single noisy round does not fail the check.
+    """
+    problems = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        ratio = current["median_us"] / previous["median_us"]
+        if ratio > 1 + tolerance and current["min_us"] > previous["median_us"]:
+            problems.append(f"{key}: медиана {ratio:.2f}× от базовой")
+    return problems
+
+
+def run(
+    names: list[str] | None = None,
+    *,
+    max_size: int | None = None,
+    rounds: int = 7,
+    min_time: float = 0.05,
+) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    for bench in BENCHMARKS.values():
+        if names and bench.name not in names:
+            continue
+        for size in bench.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            measurement = measure(bench, size, rounds=rounds, min_time=min_time)
+            results[measurement.key] = measurement.summary()
+            print(
+                f"{measurement.key:<32} {results[measurement.key]['median_us']:>12.3f} µs",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round")
+    parser.add_argument(
+        "--quick", action="store_true", help=f"skip sizes above {QUICK_MAX_SIZE}"
+    )
+    parser.add_argument("--save", default=None, help="write results as a baseline file")
+    parser.add_argument("--check", default=None, help="baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.names,
+        max_size=QUICK_MAX_SIZE if args.quick else None,
+        rounds=args.rounds,
+        min_time=args.min_time,
+    )
+    problems = growth_violations(results)
+    if args.check:
+        baseline = json.loads(Path(args.check).read_text(encoding="utf-8"))
+        problems += baseline_regressions(results, baseline["results"], args.tolerance)
+
+    report = {"python": sys.version.split()[0], "results": results, "problems": problems}
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.save:
+        Path(args.save).write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Local stand-ins for Google CSE and the OpenAI Responses API.
+
+Latency, error rate and payload size of each upstream are configurable so the
+real application can be driven under load without network access or API keys.
+
+Run standalone with ``python -m benchmarks.mock_upstreams --port 9100``; the
+app then needs ``GOOGLE_SEARCH_ENDPOINT=http://127.0.0.1:9100/customsearch/v1``
+and ``OPENAI_BASE_URL=http://127.0.0.1:9100/v1``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import zlib
+from collections import Counter
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from itertools import count
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+GOOGLE_PATH = "/customsearch/v1"
+OPENAI_PATH = "/v1/responses"
+
+# z-score of the 99th percentile of the standard normal distribution.
+_Z_P99 = 2.326
+_STREAM_CHUNK_CHARS = 24
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Response delay in seconds.
+
+    ``constant`` waits ``a``; ``uniform`` waits between ``a`` and ``b``;
+    ``lognormal`` has median ``a`` and 99th percentile ``b``, which gives the
+    long tail real upstreams show.
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> LatencyDistribution:
+        """Parse ``constant:0.05``, ``uniform:0.02:0.1`` or ``lognormal:0.05:0.4``."""
+        kind, *values = spec.split(":")
+        numbers = [float(value) for value in values]
+        if kind == "constant" and len(numbers) == 1:
+            return cls(kind, numbers[0], numbers[0])
+        if kind in {"uniform", "lognormal"} and len(numbers) == 2 and numbers[0] <= numbers[1]:
+            return cls(kind, numbers[0], numbers[1])
+        raise ValueError(f"Некорректное описание задержки: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal" and self.a > 0:
+            sigma = math.log(self.b / self.a) / _Z_P99
+            return rng.lognormvariate(math.log(self.a), sigma)
+        return self.a
+
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    """Behaviour of one mocked upstream."""
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0
+    error_status: int = 503
+    payload_bytes: int = 1024
+
+
+@dataclass(frozen=True)
+class MockConfig:
+    google: UpstreamProfile = field(default_factory=UpstreamProfile)
+    openai: UpstreamProfile = field(default_factory=UpstreamProfile)
+    seed: int | None = None
+
+
+def _filler(size: int, seed: int) -> str:
+    words = ("async", "python", "latency", "sieve", "search", "answer", "source", "cache")
+    text: list[str] = []
+    length = 0
+    for position in count(seed):
+        word = words[position % len(words)]
+        text.append(word)
+        length += len(word) + 1
+        if length >= size:
+            break
+    return " ".join(text)[:size]
+
+
+class MockUpstreams:
+    """Request handlers plus per-endpoint call statistics."""
+
+    def __init__(self, config: MockConfig) -> None:
+        self.config = config
+        self.calls: Counter[str] = Counter()
+        self._rng = random.Random(config.seed)
+        self._ids = count(1)
+
+    def _fail(self, profile: UpstreamProfile) -> bool:
+        return profile.error_rate > 0 and self._rng.random() < profile.error_rate
+
+    def _error(self, name: str, profile: UpstreamProfile) -> Response:
+        self.calls[f"{name}_error"] += 1
+        return JSONResponse(
+            {"error": {"message": "mock failure"}}, status_code=profile.error_status
+        )
+
+    async def google(self, request: Request) -> Response:
+        profile = self.config.google
+        self.calls["google"] += 1
+        await asyncio.sleep(profile.latency.sample(self._rng))
+        if self._fail(profile):
+            return self._error("google", profile)
+
+        num = int(request.query_params.get("num", 10))
+        start = int(request.query_params.get("start", 1))
+        query = request.query_params.get("q", "")
+        snippet_size = max(16, profile.payload_bytes // max(1, num))
+        items = [
+            {
+                "title": f"{query} — result {index}",
+                "link": f"https://example.com/{zlib.crc32(query.encode()):x}/{index}",
+                "snippet": _filler(snippet_size, index),
+            }
+            for index in range(start, start + num)
+        ]
+        return JSONResponse({"items": items})
+
+    async def openai(self, request: Request) -> Response:
+        profile = self.config.openai
+        payload = await request.json()
+        self.calls["openai"] += 1
+        if self._fail(profile):
+            await asyncio.sleep(profile.latency.sample(self._rng))
+            return self._error("openai", profile)
+
+        response_id = f"resp_mock_{next(self._ids)}"
+        answer = _filler(profile.payload_bytes, len(payload.get("input", ())))
+        usage = self._usage(payload, answer)
+        delay = profile.latency.sample(self._rng)
+        if payload.get("stream"):
+            return StreamingResponse(
+                self._stream(answer, delay, usage), media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(delay)
+        return JSONResponse(
+            {
+                "id": response_id,
+                "output": [
+                    {"type": "message", "content": [{"type": "output_text", "text": answer}]}
+                ],
+                "usage": usage,
+            }
+        )
+
+    def _usage(self, payload: dict, answer: str) -> dict:
+        # Token counts at ~4 bytes per token; the system message stands in for
+        # the prefix a provider would serve from its prompt cache.
+        messages = payload.get("input", [])
+        sizes = [len(json.dumps(message).encode()) // 4 for message in messages]
+        return {
+            "input_tokens": sum(sizes),
+            "input_tokens_details": {"cached_tokens": sizes[0] if sizes else 0},
+            "output_tokens": len(answer.encode()) // 4,
+        }
+
+    async def _stream(self, answer: str, delay: float, usage: dict) -> AsyncIterator[str]:
+        # Half of the delay before the first token, the rest spread over chunks.
+        chunks = [
+            answer[offset : offset + _STREAM_CHUNK_CHARS]
+            for offset in range(0, len(answer), _STREAM_CHUNK_CHARS)
+        ] or [""]
+        await asyncio.sleep(delay / 2)
+        pause = delay / 2 / len(chunks)
+        for chunk in chunks:
+            event = {"type": "response.output_text.delta", "delta": chunk}
+            yield f"data: {json.dumps(event)}\n\n"
+            await asyncio.sleep(pause)
+        completed = {"type": "response.completed", "response": {"usage": usage}}
+        yield f"data: {json.dumps(completed)}\n\n"
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse({"calls": dict(self.calls), "config": asdict(self.config)})
+
+    async def reset(self, request: Request) -> Response:
+        self.calls.clear()
+        return Response(status_code=204)
+
+
+def build_mock_app(config: MockConfig) -> Starlette:
+    upstreams = MockUpstreams(config)
+    app = Starlette(
+        routes=[
+            Route(GOOGLE_PATH, upstreams.google, methods=["GET", "HEAD"]),
+            Route(OPENAI_PATH, upstreams.openai, methods=["POST"]),
+            Route("/v1", lambda request: Response(), methods=["GET", "HEAD"]),
+            Route("/_mock/stats", upstreams.stats, methods=["GET"]),
+            Route("/_mock/reset", upstreams.reset, methods=["POST"]),
+        ]
+    )
+    app.state.upstreams = upstreams
+    return app
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the upstream behaviour options shared with the load test CLI."""
+    parser.add_argument("--google-latency", default="lognormal:0.08:0.4")
+    parser.add_argument("--google-error-rate", type=float, default=0.0)
+    parser.add_argument("--google-results-bytes", type=int, default=2048)
+    parser.add_argument("--openai-latency", default="lognormal:0.8:3.0")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--answer-bytes", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        google=UpstreamProfile(
+            latency=LatencyDistribution.parse(args.google_latency),
+            error_rate=args.google_error_rate,
+            payload_bytes=args.google_results_bytes,
+        ),
+        openai=UpstreamProfile(
+            latency=LatencyDistribution.parse(args.openai_latency),
+            error_rate=args.openai_error_rate,
+            payload_bytes=args.answer_bytes,
+        ),
+        seed=args.seed,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    app = build_mock_app(config_from_args(args))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Shared FastAPI dependencies."""
+
+from __future__ import annotations
+
+from fastapi import Request
+
+from src.sieve.services.http_clients import UpstreamClients
+
+
+def get_upstream_clients(request: Request) -> UpstreamClients | None:
+    """Return the pooled upstream clients created in the app lifespan."""
+    return getattr(request.app.state, "upstream_clients", None)
@@ -19,4 +19,6 @@ def register_error_handlers(app: FastAPI) -> None:
         request: Request, exc: AskServiceError
     ) -> JSONResponse:
         logger.debug("Handling AskServiceError for request %s", request.url)
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        return JSONResponse(
+            status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers
+        )
@@ -2,28 +2,72 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.sieve.api.error_handlers import register_error_handlers
-from src.sieve.api.routers import ask_router, health_router, history_router, index_router
+from src.sieve.api.middleware import (
+    RateLimitMiddleware,
+    RequestTracingMiddleware,
+    build_rate_limiters,
+)
+from src.sieve.api.routers import (
+    ask_router,
+    health_router,
+    history_router,
+    index_router,
+    metrics_router,
+)
+from src.sieve.config import get_settings
 from src.sieve.core.logging import get_logger
+from src.sieve.services.history import close_history_store, get_history_store
+from src.sieve.services.http_clients import start_upstream_clients
+from src.sieve.services.openai_payload import prebuild_payload_skeletons
 
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    prebuild_payload_skeletons(
+        {settings.openai_model, *settings.openai_model_options},
+        settings.openai_prompt_cache_key,
+    )
+    app.state.upstream_clients = await start_upstream_clients(settings)
+    get_history_store()
+    logger.info("Приложение Sieve запущено")
+    try:
+        yield
+    finally:
+        await app.state.upstream_clients.aclose()
+        app.state.upstream_clients = None
+        logger.info("Пулы соединений с внешними API закрыты")
+        close_history_store()
+
+
 def build_app() -> FastAPI:
     """Construct the FastAPI application with routers and middleware."""
-    app = FastAPI(title="Sieve", version="0.1.0")
+    app = FastAPI(title="Sieve", version="0.1.0", lifespan=_lifespan)
     app.include_router(health_router)
     app.include_router(index_router)
     app.include_router(ask_router)
     app.include_router(history_router)
+    app.include_router(metrics_router)
 
-    register_error_handlers(app)
+    settings = get_settings()
+    if settings.rate_limit_enabled:
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiters=build_rate_limiters(settings),
+            key_header=settings.rate_limit_key_header,
+        )
+    # Added last so it wraps everything, including rate-limited responses.
+    app.add_middleware(RequestTracingMiddleware)
 
-    @app.on_event("startup")
-    async def _startup_event() -> None:  # pragma: no cover - side-effect logging
-        logger.info("Приложение Sieve запущено")
+    register_error_handlers(app)
 
     return app
 
@@ -0,0 +1,195 @@
+"""ASGI middleware applied to the whole application."""
+
+from __future__ import annotations
+
+import json
+import re
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.sieve.config import Settings
+from src.sieve.core.constants import REQUEST_ID_HEADER
+from src.sieve.core.logging import get_logger
+from src.sieve.services.rate_limit import RateLimitDecision, RateLimitPolicy, TokenBucketLimiter
+from src.sieve.services.tracing import new_request_id, start_trace
+
+logger = get_logger(__name__)
+
+_RATE_LIMIT_WINDOW = 60.0
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,128}")
+
+# Longest prefix first: the batch route also starts with the ask prefix.
+_ROUTE_GROUPS = (
+    ("/api/ask/batch", "batch"),
+    ("/api/ask", "ask"),
+    ("/api/history", "history"),
+)
+
+
+def build_rate_limiters(settings: Settings) -> dict[str, TokenBucketLimiter]:
+    """Create one limiter per route group; groups with a zero limit are unlimited."""
+    configured = {
+        "ask": (settings.rate_limit_ask_per_minute, settings.rate_limit_ask_burst),
+        "batch": (settings.rate_limit_batch_per_minute, settings.rate_limit_batch_burst),
+        "history": (settings.rate_limit_history_per_minute, settings.rate_limit_history_burst),
+    }
+    return {
+        group: TokenBucketLimiter(
+            RateLimitPolicy(requests=requests, window=_RATE_LIMIT_WINDOW, burst=burst),
+            max_keys=settings.rate_limit_max_clients,
+        )
+        for group, (requests, burst) in configured.items()
+        if requests > 0
+    }
+
+
+def _rate_limit_headers(decision: RateLimitDecision, policy: str) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"ratelimit-limit", str(decision.limit).encode()),
+        (b"ratelimit-remaining", str(decision.remaining).encode()),
+        (b"ratelimit-reset", str(decision.reset).encode()),
+        (b"ratelimit-policy", policy.encode()),
+    ]
+    if not decision.allowed:
+        headers.append((b"retry-after", str(decision.retry_after).encode()))
+    return headers
+
+
+class RateLimitMiddleware:
+    """Per-client token buckets for the ask, batch and history routes.
+
+    Clients are identified by their address, or by ``key_header`` when one is
+    configured; that header must be authenticated upstream, since clients
+    could otherwise rotate it to escape their bucket. Behind a proxy the
+    address must be the real client's, or every user shares one bucket.
+    Implemented as plain ASGI so allowed requests only pay for a dictionary
+    lookup and a few header tuples.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiters: dict[str, TokenBucketLimiter],
+        key_header: str,
+    ) -> None:
+        self.app = app
+        self._limiters = limiters
+        self._policies = {group: limiter.policy.header() for group, limiter in limiters.items()}
+        self._key_header = key_header.lower().encode("latin-1") if key_header else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        group = self._route_group(scope["path"])
+        limiter = self._limiters.get(group) if group else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = limiter.acquire((group, self._client_key(scope)))
+        headers = _rate_limit_headers(decision, self._policies[group])
+        if not decision.allowed:
+            logger.warning("Превышен лимит запросов (%s) для клиента", group)
+            await self._reject(send, headers)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _route_group(path: str) -> str | None:
+        for prefix, group in _ROUTE_GROUPS:
+            if path.startswith(prefix):
+                return group
+        return None
+
+    def _client_key(self, scope: Scope) -> str:
+        if self._key_header is not None:
+            for name, value in scope["headers"]:
+                if name == self._key_header and value:
+                    return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    async def _reject(send: Send, headers: list[tuple[bytes, bytes]]) -> None:
+        body = json.dumps(
+            {"detail": "Слишком много запросов, повторите позже."}, ensure_ascii=False
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class RequestTracingMiddleware:
+    """Assign a request id, collect stage spans and report them per request.
+
+    The id is taken from a well-formed incoming ``X-Request-ID`` or generated.
+    Responses carry it together with a ``Server-Timing`` header listing the
+    stages finished before the headers were sent (for streamed answers that
+    is everything up to the start of generation). Once the response is
+    complete a structured log record with all stages is emitted.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._header = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with start_trace(self._request_id(scope)) as trace:
+            status = 500
+
+            async def send_with_trace(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (self._header, trace.request_id.encode("latin-1")),
+                        (b"server-timing", trace.server_timing().encode("latin-1")),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                record = {
+                    "request_id": trace.request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(trace.elapsed() * 1000, 1),
+                    "timings": trace.timings(),
+                }
+                logger.info(
+                    "Запрос обработан: %s",
+                    json.dumps(record, ensure_ascii=False),
+                    extra={"sieve_request": record},
+                )
+
+    def _request_id(self, scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.fullmatch(candidate):
+                    return candidate
+        return new_request_id()
@@ -6,10 +6,12 @@ from .ask import router as ask_router
 from .health import router as health_router
 from .history import router as history_router
 from .index import router as index_router
+from .metrics import router as metrics_router
 
 __all__ = [
     "ask_router",
     "health_router",
     "history_router",
     "index_router",
+    "metrics_router",
 ]
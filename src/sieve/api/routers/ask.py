@@ -2,19 +2,153 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable
+from typing import TypeVar
 
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+
+from src.sieve.api.dependencies import get_upstream_clients
 from src.sieve.config import Settings, get_settings
-from src.sieve.models.ask import AskRequest, AskResponse
-from src.sieve.services.ask_service import process_ask_request
+from src.sieve.core.constants import ANSWER_CACHE_HEADER
+from src.sieve.core.logging import get_logger
+from src.sieve.models.ask import AskBatchItemResult, AskBatchRequest, AskRequest, AskResponse
+from src.sieve.services.ask_service import (
+    AskStreamEvent,
+    process_ask_batch,
+    process_ask_request,
+    start_ask_stream,
+)
+from src.sieve.services.http_clients import UpstreamClients
+from src.sieve.services.metrics import ASKS_CANCELLED
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api", tags=["ask"])
 
+# Non-standard status (nginx convention) logged for asks the client abandoned.
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The body has already been read, so the next message is the disconnect.
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _cancel_on_disconnect(
+    request: Request, endpoint: str, work: Awaitable[T]
+) -> T | None:
+    """Await ``work``, cancelling it if the client disconnects first.
+
+    Cancellation aborts the upstream HTTP calls in flight and skips writing
+    history; ``None`` is returned when that happens.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if task.done():
+        return task.result()
+
+    task.cancel()
+    ASKS_CANCELLED.labels(endpoint).inc()
+    logger.info("Клиент отключился, запрос отменён")
+    await asyncio.gather(task, return_exceptions=True)
+    return None
+
+
+def _format_sse(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _close_on_disconnect(endpoint: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Close ``chunks`` (and the upstream work behind it) if the client goes away.
+
+    The response is cancelled either while waiting for the next chunk or
+    while sending one; in the latter case the generator is closed instead.
+    """
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except (asyncio.CancelledError, GeneratorExit):
+        ASKS_CANCELLED.labels(endpoint).inc()
+        logger.info("Клиент отключился, поток ответа прерван")
+        await chunks.aclose()
+        raise
+
+
+async def _encode_sse(events: AsyncIterator[AskStreamEvent]) -> AsyncIterator[str]:
+    try:
+        async for name, data in events:
+            yield _format_sse(name, data)
+    finally:
+        await events.aclose()
+
+
+async def _encode_ndjson(results: AsyncIterator[AskBatchItemResult]) -> AsyncIterator[str]:
+    try:
+        async for result in results:
+            yield result.model_dump_json() + "\n"
+    finally:
+        await results.aclose()
+
 
 @router.post("/ask", response_model=AskResponse)
 async def ask_endpoint(
     payload: AskRequest,
+    request: Request,
+    response: Response,
     settings: Settings = Depends(get_settings),
-) -> AskResponse:
-    """Handle incoming Ask requests."""
-    return await process_ask_request(payload, settings)
+    clients: UpstreamClients | None = Depends(get_upstream_clients),
+) -> AskResponse | Response:
+    """Handle incoming Ask requests; work stops if the client disconnects."""
+    result = await _cancel_on_disconnect(
+        request, "ask", process_ask_request(payload, settings, clients)
+    )
+    if result is None:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    response.headers[ANSWER_CACHE_HEADER] = "HIT" if result.cached else "MISS"
+    return result
+
+
+@router.post("/ask/stream")
+async def ask_stream_endpoint(
+    payload: AskRequest,
+    settings: Settings = Depends(get_settings),
+    clients: UpstreamClients | None = Depends(get_upstream_clients),
+) -> StreamingResponse:
+    """Stream the answer as Server-Sent Events while it is being generated."""
+    events = await start_ask_stream(payload, settings, clients)
+    return StreamingResponse(
+        _close_on_disconnect("stream", _encode_sse(events)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/ask/batch")
+async def ask_batch_endpoint(
+    payload: AskBatchRequest,
+    settings: Settings = Depends(get_settings),
+    clients: UpstreamClients | None = Depends(get_upstream_clients),
+) -> StreamingResponse:
+    """Answer many questions at once, streaming NDJSON lines as each completes.
+
+    Every line is an ``AskBatchItemResult``; ``index`` maps it back to the
+    submitted item because lines arrive in completion order.
+    """
+    results = process_ask_batch(payload.items, settings, clients)
+    return StreamingResponse(
+        _close_on_disconnect("batch", _encode_ndjson(results)),
+        media_type="application/x-ndjson",
+    )
@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends
+
+from src.sieve.config import Settings, get_settings
+from src.sieve.services.admission import ASK_ADMISSION, get_ask_admission
+from src.sieve.services.concurrency import (
+    GOOGLE_UPSTREAM,
+    OPENAI_UPSTREAM,
+    get_upstream_admission,
+)
 
 router = APIRouter(tags=["health"])
 
@@ -11,3 +21,14 @@ router = APIRouter(tags=["health"])
 async def healthcheck() -> dict[str, str]:
     """Basic health endpoint for diagnostics."""
     return {"status": "ok"}
+
+
+@router.get("/health/load")
+async def load_status(settings: Settings = Depends(get_settings)) -> dict[str, dict]:
+    """In-flight work, queue depth and shed counts of the admission controllers."""
+    controllers = {
+        ASK_ADMISSION: get_ask_admission(settings),
+        GOOGLE_UPSTREAM: get_upstream_admission(GOOGLE_UPSTREAM, settings),
+        OPENAI_UPSTREAM: get_upstream_admission(OPENAI_UPSTREAM, settings),
+    }
+    return {name: asdict(controller.stats()) for name, controller in controllers.items()}
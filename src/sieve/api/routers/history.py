@@ -4,35 +4,110 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
-from src.sieve.models.history import HistoryListResponse
+from src.sieve.core.constants import DEFAULT_HISTORY_SEARCH_LIMIT, MAX_HISTORY_PAGE_SIZE
+from src.sieve.models.history import HistoryListResponse, HistoryMutationResponse
 from src.sieve.services.history import (
     clear_history as clear_history_service,
     delete_history_entry as delete_history_entry_service,
+    history_version,
     list_entries,
+    search_entries,
 )
 
+# Endpoints are plain ``def``: the SQLite backend blocks on disk and on its
+# writer thread, so FastAPI runs them in the threadpool, off the event loop.
 router = APIRouter(prefix="/api/history", tags=["history"])
 
+_RETURN_MINIMAL = "return=minimal"
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _wants_minimal(prefer: str | None) -> bool:
+    if not prefer:
+        return False
+    return any(token.strip() == _RETURN_MINIMAL for token in prefer.split(","))
+
+
+def _mutation_response(
+    response: Response, prefer: str | None, deleted_id: UUID | None = None
+) -> HistoryListResponse | HistoryMutationResponse:
+    if _wants_minimal(prefer):
+        response.headers["Preference-Applied"] = _RETURN_MINIMAL
+        version = history_version()
+        response.headers["ETag"] = _etag(version)
+        return HistoryMutationResponse(version=version, deleted_id=deleted_id)
+    listing = list_entries()
+    response.headers["ETag"] = _etag(listing.version)
+    return listing
+
 
 @router.get("", response_model=HistoryListResponse)
-async def list_history() -> HistoryListResponse:
-    """Return stored ask history."""
-    return list_entries()
+def list_history(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    cursor: int | None = Query(default=None, ge=0),
+    if_none_match: str | None = Header(default=None),
+):
+    """Return stored ask history, newest first, optionally one page at a time.
+
+    Responses carry an ``ETag`` with the history version; a matching
+    ``If-None-Match`` yields ``304 Not Modified`` without re-serializing.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    etag = _etag(history_version())
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+
+    listing = list_entries(limit=limit, cursor=cursor)
+    response.headers.update({**headers, "ETag": _etag(listing.version)})
+    return listing
+
 
+@router.get("/search", response_model=HistoryListResponse)
+def search_history(
+    q: str = Query(min_length=1, description="Words to look for"),
+    limit: int = Query(default=DEFAULT_HISTORY_SEARCH_LIMIT, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+) -> HistoryListResponse:
+    """Full-text search over past questions, answers and citation titles."""
+    return search_entries(q, limit)
 
-@router.delete("", response_model=HistoryListResponse)
-async def clear_history() -> HistoryListResponse:
-    """Remove all history entries."""
+
+@router.delete("", response_model=HistoryListResponse | HistoryMutationResponse)
+def clear_history(
+    response: Response, prefer: str | None = Header(default=None)
+) -> HistoryListResponse | HistoryMutationResponse:
+    """Remove all history entries.
+
+    With ``Prefer: return=minimal`` only the new version is returned.
+    """
     clear_history_service()
-    return list_entries()
+    return _mutation_response(response, prefer)
 
 
-@router.delete("/{entry_id}", response_model=HistoryListResponse)
-async def delete_history_entry(entry_id: UUID) -> HistoryListResponse:
-    """Delete a specific history entry."""
+@router.delete(
+    "/{entry_id}", response_model=HistoryListResponse | HistoryMutationResponse
+)
+def delete_history_entry(
+    entry_id: UUID, response: Response, prefer: str | None = Header(default=None)
+) -> HistoryListResponse | HistoryMutationResponse:
+    """Delete a specific history entry.
+
+    With ``Prefer: return=minimal`` only the new version and removed id are
+    returned.
+    """
     deleted = delete_history_entry_service(entry_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Запись истории не найдена")
-    return list_entries()
+    return _mutation_response(response, prefer, deleted_id=entry_id)
@@ -7,7 +7,7 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from src.sieve.config import Settings, get_settings
-from src.sieve.core.constants import DEFAULT_TEMPLATES_DIR
+from src.sieve.core.constants import DEFAULT_TEMPLATES_DIR, MODEL_AUTO
 
 router = APIRouter(tags=["ui"])
 templates = Jinja2Templates(directory=DEFAULT_TEMPLATES_DIR)
@@ -17,6 +17,8 @@ templates = Jinja2Templates(directory=DEFAULT_TEMPLATES_DIR)
 async def index(request: Request, settings: Settings = Depends(get_settings)):
     """Render the minimal UI for manual interaction."""
     model_options = list(dict.fromkeys([settings.openai_model, *settings.openai_model_options]))
+    if settings.openai_auto_enabled:
+        model_options.append(MODEL_AUTO)
 
     return templates.TemplateResponse(
         "index.html",
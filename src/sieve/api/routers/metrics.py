@@ -0,0 +1,85 @@
+"""Prometheus metrics endpoint."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from src.sieve.config import Settings, get_settings
+from src.sieve.services.admission import ASK_ADMISSION, get_ask_admission
+from src.sieve.services.answer_cache import get_answer_cache
+from src.sieve.services.concurrency import (
+    GOOGLE_UPSTREAM,
+    OPENAI_UPSTREAM,
+    get_upstream_admission,
+)
+from src.sieve.services.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricFamily
+from src.sieve.services.resilience import CIRCUIT_CLOSED, get_circuit_breaker
+from src.sieve.services.search_cache import get_search_cache
+
+router = APIRouter(tags=["metrics"])
+
+
+def _cache_families(settings: Settings) -> list[MetricFamily]:
+    hits = MetricFamily("sieve_cache_hits", "counter", "Cache lookups that found an entry.")
+    misses = MetricFamily("sieve_cache_misses", "counter", "Cache lookups that missed.")
+    ratio = MetricFamily("sieve_cache_hit_ratio", "gauge", "Hits over lookups since start.")
+    entries = MetricFamily("sieve_cache_entries", "gauge", "Entries currently cached.")
+    size = MetricFamily("sieve_cache_bytes", "gauge", "Approximate cached bytes.")
+    caches = {"search": get_search_cache(settings), "answer": get_answer_cache(settings)}
+    for name, cache in caches.items():
+        if cache is None:
+            continue
+        stats = cache.stats()
+        labels = {"cache": name}
+        hits.samples.append(("_total", labels, stats.hits))
+        misses.samples.append(("_total", labels, stats.misses))
+        ratio.samples.append(("", labels, stats.hit_ratio))
+        entries.samples.append(("", labels, stats.entries))
+        size.samples.append(("", labels, stats.bytes))
+    return [hits, misses, ratio, entries, size]
+
+
+def _admission_families(settings: Settings) -> list[MetricFamily]:
+    in_flight = MetricFamily(
+        "sieve_admission_in_flight", "gauge", "Work holding an admission slot."
+    )
+    queued = MetricFamily("sieve_admission_queued", "gauge", "Work waiting for a slot.")
+    rejected = MetricFamily(
+        "sieve_admission_rejected", "counter", "Work shed by admission control."
+    )
+    controllers = {
+        ASK_ADMISSION: get_ask_admission(settings),
+        GOOGLE_UPSTREAM: get_upstream_admission(GOOGLE_UPSTREAM, settings),
+        OPENAI_UPSTREAM: get_upstream_admission(OPENAI_UPSTREAM, settings),
+    }
+    for name, controller in controllers.items():
+        stats = controller.stats()
+        labels = {"controller": name}
+        in_flight.samples.append(("", labels, stats.in_flight))
+        queued.samples.append(("", labels, stats.queued))
+        rejected.samples.append(("_total", labels, stats.rejected))
+    return [in_flight, queued, rejected]
+
+
+def _circuit_families(settings: Settings) -> list[MetricFamily]:
+    family = MetricFamily(
+        "sieve_circuit_open", "gauge", "1 while the upstream circuit breaker is not closed."
+    )
+    for upstream in (GOOGLE_UPSTREAM, OPENAI_UPSTREAM):
+        state = get_circuit_breaker(upstream, settings).state
+        family.samples.append(("", {"upstream": upstream}, float(state != CIRCUIT_CLOSED)))
+    return [family]
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(settings: Settings = Depends(get_settings)) -> Response:
+    """Expose application metrics in the Prometheus text format."""
+    body = REGISTRY.render(
+        [
+            *_cache_families(settings),
+            *_admission_families(settings),
+            *_circuit_families(settings),
+        ]
+    )
+    return Response(content=body, media_type=PROMETHEUS_CONTENT_TYPE)
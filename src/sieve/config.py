@@ -1,16 +1,74 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
 from src.sieve.core.constants import (
+    DEFAULT_ADMISSION_DEADLINE,
+    DEFAULT_ANSWER_CACHE_MAX_BYTES,
+    DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+    DEFAULT_ANSWER_CACHE_TTL,
+    DEFAULT_ASK_MAX_CONCURRENCY,
+    DEFAULT_ASK_MAX_QUEUE,
+    DEFAULT_BATCH_GOOGLE_CONCURRENCY,
+    DEFAULT_BATCH_OPENAI_CONCURRENCY,
+    DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_GOOGLE_MAX_CONCURRENCY,
     DEFAULT_GOOGLE_TIMEOUT,
+    DEFAULT_HISTORY_DB_PATH,
+    DEFAULT_HISTORY_MAX_SIZE,
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_HTTP_WARMUP_CONNECTIONS,
+    DEFAULT_OPENAI_AUTO_COMPLEX_WORDS,
     DEFAULT_OPENAI_BASE_URL,
+    DEFAULT_OPENAI_DEGRADED_COOLDOWN,
+    DEFAULT_OPENAI_LATENCY_THRESHOLD,
+    DEFAULT_OPENAI_MAX_CONCURRENCY,
     DEFAULT_OPENAI_MODEL,
     DEFAULT_OPENAI_MODEL_OPTIONS,
+    DEFAULT_OPENAI_STATS_WINDOW,
     DEFAULT_OPENAI_TIMEOUT,
+    DEFAULT_PAGE_CACHE_MAX_AGE,
+    DEFAULT_PAGE_CACHE_MAX_BYTES,
+    DEFAULT_PAGE_CACHE_MAX_ENTRIES,
+    DEFAULT_PAGE_CACHE_TTL,
+    DEFAULT_PAGE_FETCH_DEADLINE,
+    DEFAULT_PAGE_FETCH_MAX_BYTES,
+    DEFAULT_PAGE_FETCH_MAX_CHARS,
+    DEFAULT_PAGE_FETCH_PER_HOST,
+    DEFAULT_PAGE_FETCH_TOP_K,
+    DEFAULT_RATE_LIMIT_ASK_BURST,
+    DEFAULT_RATE_LIMIT_ASK_PER_MINUTE,
+    DEFAULT_RATE_LIMIT_BATCH_BURST,
+    DEFAULT_RATE_LIMIT_BATCH_PER_MINUTE,
+    DEFAULT_RATE_LIMIT_HISTORY_BURST,
+    DEFAULT_RATE_LIMIT_HISTORY_PER_MINUTE,
+    DEFAULT_RATE_LIMIT_KEY_HEADER,
+    DEFAULT_RATE_LIMIT_MAX_CLIENTS,
+    DEFAULT_REQUEST_DEADLINE,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_BUDGET_MIN_RETRIES,
+    DEFAULT_RETRY_BUDGET_RATIO,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_RETRY_MAX_DELAY,
+    DEFAULT_SEARCH_CACHE_MAX_BYTES,
+    DEFAULT_SEARCH_CACHE_MAX_ENTRIES,
+    DEFAULT_SEARCH_CACHE_TTL,
+    DEFAULT_SEARCH_DEADLINE,
+    DEFAULT_SEARCH_HEDGE_MIN_DELAY,
+    DEFAULT_SEARCH_HEDGE_PERCENTILE,
+    DEFAULT_SOURCES_DEDUP_THRESHOLD,
+    DEFAULT_SOURCES_TOKEN_BUDGET,
     DEFAULT_TOP_N,
+    GOOGLE_SEARCH_ENDPOINT,
+    HISTORY_BACKEND_MEMORY,
     MAX_TOP_N,
     MIN_TOP_N,
+    SEARCH_POLICY_FIRST,
+    SEARCH_PROVIDER_GOOGLE,
 )
 
 
@@ -21,11 +79,85 @@ class Settings(BaseSettings):
     openai_model: str = DEFAULT_OPENAI_MODEL
     openai_model_options: list[str] = DEFAULT_OPENAI_MODEL_OPTIONS
     openai_base_url: str = DEFAULT_OPENAI_BASE_URL
+    openai_prompt_cache_key: str = ""
+    openai_auto_enabled: bool = False
+    openai_auto_tiers: list[str] = []
+    openai_auto_complex_words: int = DEFAULT_OPENAI_AUTO_COMPLEX_WORDS
+    openai_fallback_enabled: bool = False
+    openai_latency_threshold: float = DEFAULT_OPENAI_LATENCY_THRESHOLD
+    openai_stats_window: int = DEFAULT_OPENAI_STATS_WINDOW
+    openai_degraded_cooldown: float = DEFAULT_OPENAI_DEGRADED_COOLDOWN
+    google_search_endpoint: str = GOOGLE_SEARCH_ENDPOINT
     google_timeout: float = DEFAULT_GOOGLE_TIMEOUT
     openai_timeout: float = DEFAULT_OPENAI_TIMEOUT
     default_top_n: int = DEFAULT_TOP_N
     min_top_n: int = MIN_TOP_N
     max_top_n: int = MAX_TOP_N
+    http_max_connections: int = DEFAULT_HTTP_MAX_CONNECTIONS
+    http_max_keepalive_connections: int = DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS
+    http_keepalive_expiry: float = DEFAULT_HTTP_KEEPALIVE_EXPIRY
+    http_http2: bool = False
+    http_warmup_connections: int = DEFAULT_HTTP_WARMUP_CONNECTIONS
+    ask_max_concurrency: int = DEFAULT_ASK_MAX_CONCURRENCY
+    ask_max_queue: int = DEFAULT_ASK_MAX_QUEUE
+    google_max_concurrency: int = DEFAULT_GOOGLE_MAX_CONCURRENCY
+    openai_max_concurrency: int = DEFAULT_OPENAI_MAX_CONCURRENCY
+    admission_deadline: float = DEFAULT_ADMISSION_DEADLINE
+    rate_limit_enabled: bool = True
+    rate_limit_key_header: str = DEFAULT_RATE_LIMIT_KEY_HEADER
+    rate_limit_ask_per_minute: int = DEFAULT_RATE_LIMIT_ASK_PER_MINUTE
+    rate_limit_ask_burst: int = DEFAULT_RATE_LIMIT_ASK_BURST
+    rate_limit_batch_per_minute: int = DEFAULT_RATE_LIMIT_BATCH_PER_MINUTE
+    rate_limit_batch_burst: int = DEFAULT_RATE_LIMIT_BATCH_BURST
+    rate_limit_history_per_minute: int = DEFAULT_RATE_LIMIT_HISTORY_PER_MINUTE
+    rate_limit_history_burst: int = DEFAULT_RATE_LIMIT_HISTORY_BURST
+    rate_limit_max_clients: int = DEFAULT_RATE_LIMIT_MAX_CLIENTS
+    retry_max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS
+    retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY
+    retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY
+    retry_budget_ratio: float = DEFAULT_RETRY_BUDGET_RATIO
+    retry_budget_min_retries: int = DEFAULT_RETRY_BUDGET_MIN_RETRIES
+    circuit_breaker_failure_threshold: int = DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    circuit_breaker_reset_timeout: float = DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT
+    # Only real providers: placeholder results would reach the model as sources.
+    search_providers: list[Literal["google"]] = [SEARCH_PROVIDER_GOOGLE]
+    # Fan-out policy and hedging are inactive until a second real provider
+    # exists: with one provider the search goes straight to it.
+    search_policy: Literal["first", "merge"] = SEARCH_POLICY_FIRST
+    search_hedge_enabled: bool = True
+    search_hedge_percentile: float = DEFAULT_SEARCH_HEDGE_PERCENTILE
+    search_hedge_min_delay: float = DEFAULT_SEARCH_HEDGE_MIN_DELAY
+    search_deadline: float = DEFAULT_SEARCH_DEADLINE
+    request_deadline: float = DEFAULT_REQUEST_DEADLINE
+    search_cache_enabled: bool = True
+    search_cache_ttl: float = DEFAULT_SEARCH_CACHE_TTL
+    search_cache_max_entries: int = DEFAULT_SEARCH_CACHE_MAX_ENTRIES
+    search_cache_max_bytes: int = DEFAULT_SEARCH_CACHE_MAX_BYTES
+    answer_cache_enabled: bool = True
+    answer_cache_ttl: float = DEFAULT_ANSWER_CACHE_TTL
+    answer_cache_max_entries: int = DEFAULT_ANSWER_CACHE_MAX_ENTRIES
+    answer_cache_max_bytes: int = DEFAULT_ANSWER_CACHE_MAX_BYTES
+    page_fetch_enabled: bool = False
+    page_fetch_top_k: int = DEFAULT_PAGE_FETCH_TOP_K
+    page_fetch_deadline: float = DEFAULT_PAGE_FETCH_DEADLINE
+    page_fetch_max_bytes: int = DEFAULT_PAGE_FETCH_MAX_BYTES
+    page_fetch_max_chars: int = DEFAULT_PAGE_FETCH_MAX_CHARS
+    page_fetch_per_host: int = DEFAULT_PAGE_FETCH_PER_HOST
+    page_fetch_allow_private: bool = False
+    page_cache_ttl: float = DEFAULT_PAGE_CACHE_TTL
+    page_cache_max_age: float = DEFAULT_PAGE_CACHE_MAX_AGE
+    page_cache_max_entries: int = DEFAULT_PAGE_CACHE_MAX_ENTRIES
+    page_cache_max_bytes: int = DEFAULT_PAGE_CACHE_MAX_BYTES
+    sources_token_budget: int = DEFAULT_SOURCES_TOKEN_BUDGET
+    sources_token_budgets: dict[str, int] = {}
+    sources_dedup_threshold: float = DEFAULT_SOURCES_DEDUP_THRESHOLD
+    coalesce_requests: bool = True
+    batch_google_concurrency: int = DEFAULT_BATCH_GOOGLE_CONCURRENCY
+    batch_openai_concurrency: int = DEFAULT_BATCH_OPENAI_CONCURRENCY
+    history_backend: Literal["memory", "sqlite"] = HISTORY_BACKEND_MEMORY
+    history_db_path: str = DEFAULT_HISTORY_DB_PATH
+    history_max_size: int = DEFAULT_HISTORY_MAX_SIZE
+    history_store_timings: bool = False
 
     class Config:
         env_file = ".env"
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 # API endpoints and routing paths
 GOOGLE_SEARCH_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+GOOGLE_PAGE_SIZE = 10  # CSE returns at most 10 items per request
+GOOGLE_MAX_RESULTS = 100  # CSE never serves results beyond position 100
 OPENAI_RESPONSES_PATH = "/responses"
 
 # Template configuration
@@ -11,6 +13,11 @@ DEFAULT_TEMPLATES_DIR = "templates"
 
 # History configuration
 DEFAULT_HISTORY_MAX_SIZE = 50
+HISTORY_BACKEND_MEMORY = "memory"
+HISTORY_BACKEND_SQLITE = "sqlite"
+DEFAULT_HISTORY_DB_PATH = "sieve_history.db"
+MAX_HISTORY_PAGE_SIZE = 200
+DEFAULT_HISTORY_SEARCH_LIMIT = 20
 
 # Settings defaults
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
@@ -22,6 +29,99 @@ DEFAULT_TOP_N = 5
 MIN_TOP_N = 1
 MAX_TOP_N = 10
 
+# Batch asks
+MAX_BATCH_SIZE = 500
+DEFAULT_BATCH_GOOGLE_CONCURRENCY = 4
+DEFAULT_BATCH_OPENAI_CONCURRENCY = 8
+
+# Upstream HTTP connection pools
+DEFAULT_HTTP_MAX_CONNECTIONS = 100
+DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_HTTP_WARMUP_CONNECTIONS = 0
+
+# Admission control
+DEFAULT_ASK_MAX_CONCURRENCY = 64
+DEFAULT_ASK_MAX_QUEUE = 128
+DEFAULT_GOOGLE_MAX_CONCURRENCY = 32
+DEFAULT_OPENAI_MAX_CONCURRENCY = 32
+DEFAULT_ADMISSION_DEADLINE = 5.0
+
+# Per-client rate limits (requests per minute and burst size)
+# Clients are keyed by IP unless a header the deployment authenticates is set.
+DEFAULT_RATE_LIMIT_KEY_HEADER = ""
+DEFAULT_RATE_LIMIT_ASK_PER_MINUTE = 60
+DEFAULT_RATE_LIMIT_ASK_BURST = 20
+DEFAULT_RATE_LIMIT_BATCH_PER_MINUTE = 6
+DEFAULT_RATE_LIMIT_BATCH_BURST = 2
+DEFAULT_RATE_LIMIT_HISTORY_PER_MINUTE = 300
+DEFAULT_RATE_LIMIT_HISTORY_BURST = 60
+DEFAULT_RATE_LIMIT_MAX_CLIENTS = 10_000
+
+# Upstream retries and circuit breakers
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.2
+DEFAULT_RETRY_MAX_DELAY = 5.0
+DEFAULT_RETRY_BUDGET_RATIO = 0.2
+DEFAULT_RETRY_BUDGET_MIN_RETRIES = 10
+DEFAULT_CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT = 30.0
+
+# Search providers
+SEARCH_PROVIDER_GOOGLE = "google"
+SEARCH_PROVIDER_STATIC = "static"
+SEARCH_POLICY_FIRST = "first"
+SEARCH_POLICY_MERGE = "merge"
+DEFAULT_SEARCH_HEDGE_PERCENTILE = 0.95
+DEFAULT_SEARCH_HEDGE_MIN_DELAY = 0.3
+
+# Search result cache
+DEFAULT_SEARCH_CACHE_TTL = 300.0
+DEFAULT_SEARCH_CACHE_MAX_ENTRIES = 512
+DEFAULT_SEARCH_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Answer cache
+DEFAULT_ANSWER_CACHE_TTL = 600.0
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES = 256
+DEFAULT_ANSWER_CACHE_MAX_BYTES = 8 * 1024 * 1024
+ANSWER_CACHE_HEADER = "X-Sieve-Cache"
+
+# Source packing: token budget of the sources block in the prompt (0 = unlimited)
+# and the share of a snippet's word shingles already seen that marks it as a duplicate.
+DEFAULT_SOURCES_TOKEN_BUDGET = 2500
+DEFAULT_SOURCES_DEDUP_THRESHOLD = 0.8
+
+# Result page enrichment: how many top results to fetch, the stage deadline in
+# seconds, the download and excerpt caps, and per-host concurrency.
+DEFAULT_PAGE_FETCH_TOP_K = 3
+DEFAULT_PAGE_FETCH_DEADLINE = 1.5
+DEFAULT_PAGE_FETCH_MAX_BYTES = 512 * 1024
+DEFAULT_PAGE_FETCH_MAX_CHARS = 3000
+DEFAULT_PAGE_FETCH_PER_HOST = 2
+DEFAULT_PAGE_CACHE_TTL = 900.0
+DEFAULT_PAGE_CACHE_MAX_AGE = 86400.0
+DEFAULT_PAGE_CACHE_MAX_ENTRIES = 512
+DEFAULT_PAGE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+PAGE_FETCH_USER_AGENT = "SieveBot/0.1 (+https://github.com/sieve)"
+
+# Model routing: the pseudo-model that lets the service pick one, the query
+# length (in words) that routes to the strongest tier, the latency threshold in
+# seconds past which a model is skipped or abandoned for a faster one, and how
+# many recent calls per model are tracked.
+MODEL_AUTO = "auto"
+DEFAULT_OPENAI_AUTO_COMPLEX_WORDS = 25
+DEFAULT_OPENAI_LATENCY_THRESHOLD = 8.0
+DEFAULT_OPENAI_STATS_WINDOW = 50
+DEFAULT_OPENAI_DEGRADED_COOLDOWN = 30.0
+
+# Deadlines in seconds (0 = disabled): how long an ask waits for search before
+# answering without sources, and the budget for the whole ask.
+DEFAULT_SEARCH_DEADLINE = 0.0
+DEFAULT_REQUEST_DEADLINE = 0.0
+
+# Request tracing
+REQUEST_ID_HEADER = "X-Request-ID"
+
 # Miscellaneous text fragments
 NO_SEARCH_RESULTS_FALLBACK = "(no search results available)"
 CITATIONS_HEADER = "Citations:"  # keep UI wording consistent across layers
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
+
 OPENAI_SYSTEM_PROMPT = (
     "You are an assistant that writes concise markdown answers."
     " Always reference evidence with bracketed numbers such as [1], [2],"
@@ -10,11 +12,20 @@ OPENAI_SYSTEM_PROMPT = (
     " Do not invent citations."
 )
 
-USER_PROMPT_TEMPLATE = (
-    "Question: {query}\n\n"
-    "Sources:\n{sources_block}\n\n"
-    "Respond in markdown with inline citations."
-)
+ANSWER_INSTRUCTIONS = "Respond in markdown with inline citations."
+
+# Everything before the first variable byte is identical for every request, so
+# providers can reuse the cached prefix. Sources come before the question:
+# different questions over the same sources still share a long prefix.
+SYSTEM_PROMPT_PREFIX = f"{OPENAI_SYSTEM_PROMPT}\n\n{ANSWER_INSTRUCTIONS}"
+
+USER_PROMPT_TEMPLATE = "Sources:\n{sources_block}\n\nQuestion: {query}"
+
+# Changes whenever the prompt wording changes, so cached answers produced with
+# an older prompt are never served.
+PROMPT_VERSION = hashlib.sha256(
+    f"{SYSTEM_PROMPT_PREFIX}\x00{USER_PROMPT_TEMPLATE}".encode("utf-8")
+).hexdigest()[:12]
 
 
 def build_user_prompt(query: str, sources_block: str) -> str:
@@ -2,10 +2,17 @@ from __future__ import annotations
 
 from pydantic import BaseModel, Field
 
+from src.sieve.core.constants import GOOGLE_MAX_RESULTS, MAX_BATCH_SIZE
+
 
 class AskRequest(BaseModel):
     query: str = Field(min_length=1, description="User question to process")
-    top_n: int | None = Field(default=None, ge=1, le=10, description="Number of search results")
+    top_n: int | None = Field(
+        default=None,
+        ge=1,
+        le=GOOGLE_MAX_RESULTS,
+        description="Number of search results; capped by the MAX_TOP_N setting",
+    )
     model: str | None = Field(default=None, description="Preferred OpenAI model identifier")
 
 
@@ -21,3 +28,16 @@ class AskResponse(BaseModel):
     citations: list[Citation]
     search_used: bool
     message: str | None = None
+    cached: bool = Field(default=False, description="Answer was served from the answer cache")
+    model: str | None = Field(default=None, description="Model that produced the answer")
+
+
+class AskBatchRequest(BaseModel):
+    items: list[AskRequest] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class AskBatchItemResult(BaseModel):
+    index: int = Field(description="Position of the item in the submitted batch")
+    status_code: int
+    response: AskResponse | None = None
+    error: str | None = None
@@ -26,7 +26,20 @@ class HistoryEntry(BaseModel):
     results: list[HistoryResult]
     search_used: bool
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    request_id: str | None = None
+    timings: dict[str, float] | None = Field(
+        default=None, description="Stage durations in milliseconds, when enabled"
+    )
 
 
 class HistoryListResponse(BaseModel):
     items: list[HistoryEntry]
+    next_cursor: int | None = Field(
+        default=None, description="Pass as ``cursor`` to fetch the next page"
+    )
+    version: int = Field(default=0, description="History version the page was read at")
+
+
+class HistoryMutationResponse(BaseModel):
+    version: int
+    deleted_id: UUID | None = None
@@ -3,5 +3,6 @@
 from __future__ import annotations
 
 from .history_repository import HistoryRepository
+from .sqlite_history_repository import SqliteHistoryRepository
 
-__all__ = ["HistoryRepository"]
+__all__ = ["HistoryRepository", "SqliteHistoryRepository"]
@@ -3,20 +3,75 @@
 from __future__ import annotations
 
 import threading
+import time
 from collections.abc import Iterable
 from uuid import UUID
 
 from src.sieve.models.ask import Citation
 from src.sieve.models.history import HistoryEntry, HistoryListResponse, HistoryResult
+from src.sieve.repositories.history_search import HistorySearchIndex, searchable_text, tokenize
 from src.sieve.services.google import SearchResult
 
 
+def build_history_entry(
+    *,
+    query: str,
+    top_n: int,
+    model: str,
+    answer_markdown: str,
+    message: str | None,
+    citations: Iterable[Citation],
+    results: Iterable[SearchResult],
+    search_used: bool,
+    request_id: str | None = None,
+    timings: dict[str, float] | None = None,
+) -> HistoryEntry:
+    """Convert ask outcome into a history entry shared by all repositories."""
+    history_results = [
+        HistoryResult(
+            title=item.title,
+            url=item.url,
+            snippet=item.snippet,
+            index=item.index,
+        )
+        for item in results
+    ]
+
+    return HistoryEntry(
+        query=query,
+        top_n=top_n,
+        model=model,
+        answer_markdown=answer_markdown,
+        message=message,
+        citations=list(citations),
+        results=history_results,
+        search_used=search_used,
+        request_id=request_id,
+        timings=timings,
+    )
+
+
 class HistoryRepository:
-    """Thread-safe in-memory storage for ask history."""
+    """Thread-safe in-memory storage for ask history.
+
+    Entries live in a fixed-size ring buffer addressed by a monotonically
+    increasing sequence number, with a dict index from entry id to sequence.
+    Insert, eviction and delete are O(1); deleted slots become tombstones.
+    Sequence numbers double as keyset pagination cursors, and ``version``
+    increases on every mutation so clients can revalidate cheaply.
+    """
 
     def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
         self._max_size = max_size
-        self._items: list[HistoryEntry] = []
+        self._slots: list[HistoryEntry | None] = [None] * max_size
+        self._index: dict[UUID, int] = {}
+        self._search_index = HistorySearchIndex()
+        self._next_seq = 0
+        # Seeded from the clock so versions keep growing across restarts and an
+        # ETag issued by a previous process never matches by accident.
+        self._version = time.time_ns() // 1000
         self._lock = threading.Lock()
 
     def insert(
@@ -30,48 +85,94 @@ class HistoryRepository:
         citations: Iterable[Citation],
         results: Iterable[SearchResult],
         search_used: bool,
+        request_id: str | None = None,
+        timings: dict[str, float] | None = None,
     ) -> HistoryEntry:
-        history_results = [
-            HistoryResult(
-                title=item.title,
-                url=item.url,
-                snippet=item.snippet,
-                index=item.index,
-            )
-            for item in results
-        ]
-
-        entry = HistoryEntry(
+        entry = build_history_entry(
             query=query,
             top_n=top_n,
             model=model,
             answer_markdown=answer_markdown,
             message=message,
-            citations=list(citations),
-            results=history_results,
+            citations=citations,
+            results=results,
             search_used=search_used,
+            request_id=request_id,
+            timings=timings,
         )
+        tokens = tokenize(searchable_text(entry))
 
         with self._lock:
-            self._items.insert(0, entry)
-            if len(self._items) > self._max_size:
-                self._items = self._items[: self._max_size]
+            seq = self._next_seq
+            slot = seq % self._max_size
+            evicted = self._slots[slot]
+            if evicted is not None:
+                del self._index[evicted.id]
+                self._search_index.remove(seq - self._max_size)
+            self._slots[slot] = entry
+            self._index[entry.id] = seq
+            self._search_index.add(seq, tokens)
+            self._next_seq = seq + 1
+            self._version += 1
 
         return entry
 
     def list(self) -> HistoryListResponse:
+        return self.list_page()
+
+    def list_page(
+        self, limit: int | None = None, cursor: int | None = None
+    ) -> HistoryListResponse:
+        """Return entries newest first, starting strictly below ``cursor``."""
         with self._lock:
-            items = list(self._items)
-        return HistoryListResponse(items=items)
+            lowest = max(self._next_seq - self._max_size, 0)
+            seq = self._next_seq - 1 if cursor is None else min(cursor, self._next_seq) - 1
+            items: list[HistoryEntry] = []
+            last_seq: int | None = None
+            next_cursor: int | None = None
+            while seq >= lowest:
+                entry = self._slots[seq % self._max_size]
+                if entry is not None:
+                    if limit is not None and len(items) == limit:
+                        next_cursor = last_seq
+                        break
+                    items.append(entry)
+                    last_seq = seq
+                seq -= 1
+            version = self._version
+        return HistoryListResponse(items=items, next_cursor=next_cursor, version=version)
+
+    def search(self, query: str, limit: int) -> HistoryListResponse:
+        """Return entries matching ``query`` ranked by BM25 relevance."""
+        with self._lock:
+            hits = self._search_index.search(query, limit)
+            items = [self._slots[seq % self._max_size] for seq, _ in hits]
+            version = self._version
+        return HistoryListResponse(items=items, version=version)
 
     def clear(self) -> None:
         with self._lock:
-            self._items.clear()
+            self._slots = [None] * self._max_size
+            self._index.clear()
+            self._search_index.clear()
+            self._version += 1
 
     def delete(self, entry_id: UUID) -> bool:
         with self._lock:
-            for index, item in enumerate(self._items):
-                if item.id == entry_id:
-                    del self._items[index]
-                    return True
-        return False
+            seq = self._index.pop(entry_id, None)
+            if seq is None:
+                return False
+            self._slots[seq % self._max_size] = None
+            self._search_index.remove(seq)
+            self._version += 1
+        return True
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        """Nothing to release for the in-memory store."""
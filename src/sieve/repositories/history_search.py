@@ -0,0 +1,95 @@
+"""Full-text search over history entries."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import Counter
+from collections.abc import Hashable, Iterable
+from operator import itemgetter
+
+from src.sieve.models.history import HistoryEntry
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into case-folded word tokens (Unicode aware)."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+def searchable_text(entry: HistoryEntry) -> str:
+    """Text indexed for an entry: question, answer and citation titles."""
+    titles = " ".join(citation.title for citation in entry.citations)
+    return f"{entry.query}\n{entry.answer_markdown}\n{titles}"
+
+
+class HistorySearchIndex:
+    """Incrementally maintained inverted index ranked with BM25.
+
+    Not thread-safe on its own; the owning repository serialises access.
+    A search only touches the posting lists of the query terms, never the
+    full set of documents.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._postings: dict[str, dict[Hashable, int]] = {}
+        self._lengths: dict[Hashable, int] = {}
+        self._terms: dict[Hashable, tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def add(self, doc_id: Hashable, tokens: Iterable[str]) -> None:
+        self.remove(doc_id)
+        counts = Counter(tokens)
+        for term, frequency in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._terms[doc_id] = tuple(counts)
+        self._total_length += length
+
+    def remove(self, doc_id: Hashable) -> None:
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._lengths.clear()
+        self._terms.clear()
+        self._total_length = 0
+
+    def search(self, query: str, limit: int) -> list[tuple[Hashable, float]]:
+        """Return up to ``limit`` ``(doc_id, score)`` pairs, best match first."""
+        documents = len(self._lengths)
+        if not documents or limit <= 0:
+            return []
+        average_length = self._total_length / documents or 1.0
+        k1 = self._k1
+        base = k1 * (1 - self._b)
+        per_token = k1 * self._b / average_length
+        lengths = self._lengths
+
+        scores: dict[Hashable, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            frequency = len(posting)
+            weight = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5)) * (k1 + 1)
+            for doc_id, term_frequency in posting.items():
+                norm = term_frequency + base + per_token * lengths[doc_id]
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * term_frequency / norm
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def __len__(self) -> int:
+        return len(self._lengths)
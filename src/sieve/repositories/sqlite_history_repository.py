@@ -0,0 +1,286 @@
+"""SQLite-backed repository for Ask history entries."""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from uuid import UUID
+
+from src.sieve.core.logging import get_logger
+from src.sieve.models.ask import Citation
+from src.sieve.models.history import HistoryEntry, HistoryListResponse
+from src.sieve.repositories.history_repository import build_history_entry
+from src.sieve.repositories.history_search import tokenize
+from src.sieve.services.google import SearchResult
+
+logger = get_logger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS history (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        created_at TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS history_created_at_idx ON history (created_at)",
+    "CREATE TABLE IF NOT EXISTS history_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO history_meta (key, value) VALUES ('version', 0)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts
+    USING fts5(query, answer_markdown, titles, tokenize = 'unicode61')
+    """,
+    # Triggers keep the full-text index in sync with inserts, deletes, clears
+    # and size trimming inside the same write transaction.
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts (rowid, query, answer_markdown, titles)
+        SELECT new.seq,
+               json_extract(new.payload, '$.query'),
+               json_extract(new.payload, '$.answer_markdown'),
+               (SELECT group_concat(json_extract(value, '$.title'), ' ')
+                  FROM json_each(new.payload, '$.citations'));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+        DELETE FROM history_fts WHERE rowid = old.seq;
+    END
+    """,
+)
+_BACKFILL_FTS = """
+    INSERT INTO history_fts (rowid, query, answer_markdown, titles)
+    SELECT seq,
+           json_extract(payload, '$.query'),
+           json_extract(payload, '$.answer_markdown'),
+           (SELECT group_concat(json_extract(value, '$.title'), ' ')
+              FROM json_each(payload, '$.citations'))
+    FROM history WHERE seq NOT IN (SELECT rowid FROM history_fts)
+"""
+_INSERT = "INSERT INTO history (id, created_at, payload) VALUES (?, ?, ?)"
+_TRIM = (
+    "DELETE FROM history WHERE seq <= "
+    "(SELECT seq FROM history ORDER BY seq DESC LIMIT 1 OFFSET ?)"
+)
+_SELECT_PAGE = "SELECT seq, payload FROM history WHERE seq < ? ORDER BY seq DESC LIMIT ?"
+_DELETE = "DELETE FROM history WHERE id = ?"
+_CLEAR = "DELETE FROM history"
+_SEARCH = (
+    "SELECT h.payload FROM history_fts JOIN history AS h ON h.seq = history_fts.rowid "
+    "WHERE history_fts MATCH ? ORDER BY bm25(history_fts) LIMIT ?"
+)
+_VERSION = "SELECT value FROM history_meta WHERE key = 'version'"
+_BUMP_VERSION = "UPDATE history_meta SET value = value + ? WHERE key = 'version'"
+
+_WRITE_BATCH_SIZE = 64
+_MAX_SEQ = 2**63 - 1
+
+_Operation = Callable[[sqlite3.Connection], sqlite3.Cursor]
+# Queued in place of an operation to mark a point in the write stream.
+_BARRIER = None
+
+
+class SqliteHistoryRepository:
+    """Persistent history storage shared between workers through a WAL database.
+
+    Inserts are handed to a single writer thread and committed in batches, so
+    callers on the event loop never wait for disk I/O. Reads and deletes first
+    wait for queued writes, which keeps the store read-your-writes consistent.
+    """
+
+    def __init__(self, path: str, max_size: int) -> None:
+        self._path = path
+        self._max_size = max_size
+        self._reader = self._connect()
+        self._reader_lock = threading.Lock()
+        with self._reader_lock:
+            for statement in _SCHEMA:
+                self._reader.execute(statement)
+            self._reader.execute(_BACKFILL_FTS)
+            self._reader.commit()
+
+        self._closed = False
+        self._queue: queue.Queue[tuple[_Operation | None, Future] | None] = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._run_writer, name="sieve-history-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    def insert(
+        self,
+        *,
+        query: str,
+        top_n: int,
+        model: str,
+        answer_markdown: str,
+        message: str | None,
+        citations: Iterable[Citation],
+        results: Iterable[SearchResult],
+        search_used: bool,
+        request_id: str | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> HistoryEntry:
+        entry = build_history_entry(
+            query=query,
+            top_n=top_n,
+            model=model,
+            answer_markdown=answer_markdown,
+            message=message,
+            citations=citations,
+            results=results,
+            search_used=search_used,
+            request_id=request_id,
+            timings=timings,
+        )
+        row = (str(entry.id), entry.created_at.isoformat(), entry.model_dump_json())
+        self._submit(lambda connection: connection.execute(_INSERT, row))
+        return entry
+
+    def list(self) -> HistoryListResponse:
+        return self.list_page()
+
+    def list_page(
+        self, limit: int | None = None, cursor: int | None = None
+    ) -> HistoryListResponse:
+        """Return entries newest first, starting strictly below ``cursor``."""
+        self.flush()
+        page_size = self._max_size if limit is None else min(limit, self._max_size)
+        upper = _MAX_SEQ if cursor is None else cursor
+        with self._reader_lock:
+            # One read transaction so the page and its version share a snapshot.
+            self._reader.execute("BEGIN")
+            try:
+                rows = self._reader.execute(_SELECT_PAGE, (upper, page_size + 1)).fetchall()
+                (version,) = self._reader.execute(_VERSION).fetchone()
+            finally:
+                self._reader.execute("COMMIT")
+        next_cursor = rows[page_size - 1][0] if len(rows) > page_size else None
+        return HistoryListResponse(
+            items=[HistoryEntry.model_validate_json(payload) for _, payload in rows[:page_size]],
+            next_cursor=next_cursor,
+            version=version,
+        )
+
+    def search(self, query: str, limit: int) -> HistoryListResponse:
+        """Return entries matching ``query`` ranked by the FTS5 BM25 score."""
+        terms = tokenize(query)
+        if not terms:
+            return HistoryListResponse(items=[], version=self.version)
+        expression = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        self.flush()
+        with self._reader_lock:
+            self._reader.execute("BEGIN")
+            try:
+                rows = self._reader.execute(_SEARCH, (expression, limit)).fetchall()
+                (version,) = self._reader.execute(_VERSION).fetchone()
+            finally:
+                self._reader.execute("COMMIT")
+        return HistoryListResponse(
+            items=[HistoryEntry.model_validate_json(payload) for (payload,) in rows],
+            version=version,
+        )
+
+    @property
+    def version(self) -> int:
+        self.flush()
+        with self._reader_lock:
+            (version,) = self._reader.execute(_VERSION).fetchone()
+        return version
+
+    def clear(self) -> None:
+        self._submit(lambda connection: connection.execute(_CLEAR)).result()
+
+    def delete(self, entry_id: UUID) -> bool:
+        cursor = self._submit(
+            lambda connection: connection.execute(_DELETE, (str(entry_id),))
+        ).result()
+        return cursor.rowcount > 0
+
+    def flush(self) -> None:
+        """Block until every write queued before this call has been committed.
+
+        Waits on a barrier rather than ``Queue.join`` so a steady stream of
+        new inserts cannot keep readers waiting forever.
+        """
+        if self._closed:
+            return
+        self._submit(_BARRIER).result()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        with self._reader_lock:
+            self._reader.close()
+
+    def _submit(self, operation: _Operation | None) -> Future:
+        if self._closed:
+            raise RuntimeError("SQLite history repository is closed")
+        future: Future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def _run_writer(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    self._queue.task_done()
+                    return
+                batch = [item]
+                while len(batch) < _WRITE_BATCH_SIZE:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                self._write_batch(connection, batch)
+        finally:
+            connection.close()
+
+    def _write_batch(
+        self, connection: sqlite3.Connection, batch: list[tuple[_Operation | None, Future]]
+    ) -> None:
+        writes = [(operation, future) for operation, future in batch if operation is not None]
+        outcomes: list[sqlite3.Cursor] = []
+        try:
+            if writes:
+                with connection:
+                    for operation, _ in writes:
+                        outcomes.append(operation(connection))
+                    changes = sum(1 for cursor in outcomes if cursor.rowcount > 0)
+                    if changes:
+                        connection.execute(_BUMP_VERSION, (changes,))
+                    connection.execute(_TRIM, (self._max_size,))
+        except sqlite3.Error as exc:
+            logger.error("Не удалось записать историю в SQLite: %s", exc)
+            for _, future in writes:
+                future.set_exception(exc)
+        else:
+            for (_, future), outcome in zip(writes, outcomes):
+                future.set_result(outcome)
+        finally:
+            # Barriers are released even when the batch failed.
+            for operation, future in batch:
+                if operation is _BARRIER:
+                    future.set_result(None)
+            for _ in batch:
+                self._queue.task_done()
@@ -0,0 +1,160 @@
+"""Admission control: bounded concurrency with a bounded, deadline-aware wait queue."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.sieve.config import Settings
+from src.sieve.core.logging import get_logger
+from src.sieve.services.exceptions import OverloadedError
+
+logger = get_logger(__name__)
+
+ASK_ADMISSION = "ask"
+
+_SERVICE_TIME_SMOOTHING = 0.2
+
+
+@dataclass(frozen=True)
+class AdmissionStats:
+    limit: int
+    in_flight: int
+    queued: int
+    max_queue: int
+    rejected: int
+    estimated_wait: float
+
+
+class AdmissionController:
+    """Run at most ``limit`` units of work at once and queue a bounded number more.
+
+    Work is rejected with :class:`OverloadedError` up front when the queue is
+    full or the estimated wait (queue position times the smoothed service
+    time) exceeds ``deadline``, and after waiting ``deadline`` seconds without
+    getting a slot. A non-positive ``limit`` disables the bound; a
+    non-positive ``max_queue`` leaves the queue length unbounded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        limit: int,
+        max_queue: int,
+        deadline: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._limit = limit
+        self._max_queue = max_queue
+        self._deadline = deadline
+        self._clock = clock
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._service_time: float | None = None
+        self._rejected = 0
+
+    def estimated_wait(self) -> float:
+        """Seconds a newly queued unit of work is expected to wait for a slot."""
+        if self._limit <= 0 or self._in_flight < self._limit:
+            return 0.0
+        if self._service_time is None:
+            return 0.0
+        return (len(self._waiters) + 1) * self._service_time / self._limit
+
+    def check(self) -> None:
+        """Raise :class:`OverloadedError` if new work would be shed right now."""
+        if self._limit <= 0 or (self._in_flight < self._limit and not self._waiters):
+            return
+        if self._max_queue > 0 and len(self._waiters) >= self._max_queue:
+            self._reject("очередь заполнена", self.estimated_wait())
+        estimate = self.estimated_wait()
+        if estimate > self._deadline:
+            self._reject(f"ожидание ~{estimate:.1f} с", estimate)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self._acquire()
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._observe(self._clock() - started)
+            self._release()
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            limit=self._limit,
+            in_flight=self._in_flight,
+            queued=len(self._waiters),
+            max_queue=self._max_queue,
+            rejected=self._rejected,
+            estimated_wait=self.estimated_wait(),
+        )
+
+    async def _acquire(self) -> None:
+        if self._limit <= 0 or (self._in_flight < self._limit and not self._waiters):
+            self._in_flight += 1
+            return
+        self.check()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=self._deadline)
+        except asyncio.TimeoutError:
+            self._reject("истёк срок ожидания в очереди", self._deadline)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest live waiter so newcomers cannot
+        # overtake the queue.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _observe(self, seconds: float) -> None:
+        if self._service_time is None:
+            self._service_time = seconds
+        else:
+            self._service_time += _SERVICE_TIME_SMOOTHING * (seconds - self._service_time)
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        self._rejected += 1
+        logger.warning("Запрос к %s отклонён: %s", self.name, reason)
+        raise OverloadedError(self.name, max(1.0, math.ceil(retry_after)))
+
+
+@lru_cache(maxsize=8)
+def admission_controller(
+    name: str, limit: int, max_queue: int, deadline: float
+) -> AdmissionController:
+    """Return the process-wide controller with the given name and bounds."""
+    return AdmissionController(name, limit=limit, max_queue=max_queue, deadline=deadline)
+
+
+def get_ask_admission(settings: Settings) -> AdmissionController:
+    return admission_controller(
+        ASK_ADMISSION,
+        settings.ask_max_concurrency,
+        settings.ask_max_queue,
+        settings.admission_deadline,
+    )
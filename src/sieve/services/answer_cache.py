@@ -0,0 +1,60 @@
+"""Cache of generated answers keyed by query, model and source set."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from functools import lru_cache
+
+from src.sieve.config import Settings
+from src.sieve.core.prompts import PROMPT_VERSION
+from src.sieve.services.cache import TTLCache
+from src.sieve.services.google import SearchResult
+from src.sieve.services.search_cache import normalize_query
+
+AnswerCacheKey = tuple[str, str, str, str]
+
+
+def sources_fingerprint(results: Iterable[SearchResult]) -> str:
+    """Hash the ordered sources exactly as they are presented to the model."""
+    digest = hashlib.sha256()
+    for item in results:
+        for part in (
+            str(item.index),
+            item.title,
+            item.url,
+            item.snippet,
+            item.content or "",
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def answer_cache_key(
+    query: str, model: str, results: Iterable[SearchResult]
+) -> AnswerCacheKey:
+    return normalize_query(query), model, sources_fingerprint(results), PROMPT_VERSION
+
+
+def _answer_size(answer: str) -> int:
+    return len(answer) + 64
+
+
+@lru_cache(maxsize=4)
+def _shared_answer_cache(max_entries: int, max_bytes: int, ttl: float) -> TTLCache[str]:
+    return TTLCache(
+        max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=_answer_size
+    )
+
+
+def get_answer_cache(settings: Settings) -> TTLCache[str] | None:
+    """Return the process-wide answer cache, or ``None`` when caching is disabled."""
+    if not settings.answer_cache_enabled or settings.answer_cache_max_entries <= 0:
+        return None
+    return _shared_answer_cache(
+        settings.answer_cache_max_entries,
+        settings.answer_cache_max_bytes,
+        settings.answer_cache_ttl,
+    )
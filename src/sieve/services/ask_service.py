@@ -2,35 +2,169 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import AsyncExitStack
+from typing import Any, Iterable
 
 from src.sieve.config import Settings
 from src.sieve.core.logging import get_logger
-from src.sieve.models.ask import AskRequest, AskResponse, Citation
-from src.sieve.services.google import GoogleSearchError, SearchResult, search_google
+from src.sieve.models.ask import AskBatchItemResult, AskRequest, AskResponse, Citation
+from src.sieve.services.admission import get_ask_admission
+from src.sieve.services.answer_cache import answer_cache_key, get_answer_cache
+from src.sieve.services.concurrency import (
+    GOOGLE_UPSTREAM,
+    OPENAI_UPSTREAM,
+    bounded_upstreams,
+    upstream_slot,
+)
+from src.sieve.services.deadline import Deadline, current_deadline, start_deadline
+from src.sieve.services.google import SearchResult
 from src.sieve.services.history import add_history_entry
-from src.sieve.services.openai_client import OpenAIError, generate_answer
+from src.sieve.services.http_clients import UpstreamClients
+from src.sieve.services.metrics import (
+    ANSWER_SIZE_BYTES,
+    ASK_REQUESTS,
+    ASK_STAGE_SECONDS,
+    ASKS_IN_FLIGHT,
+    DEADLINES_EXCEEDED,
+)
+from src.sieve.services.model_routing import ModelRoute, get_model_router, record_fallback
+from src.sieve.services.openai_client import (
+    OpenAIError,
+    OpenAIUnavailableError,
+    append_citations_footer,
+    generate_answer,
+    stream_answer,
+    strip_citations_footer,
+)
+from src.sieve.services.page_fetch import enrich_results
+from src.sieve.services.search_cache import (
+    get_search_cache,
+    normalize_query,
+    search_cache_key,
+)
+from src.sieve.services.search_providers import get_search_provider
+from src.sieve.services.singleflight import SingleFlight
+from src.sieve.services.source_packing import PackedSources, pack_sources
+from src.sieve.services.tracing import current_trace, span
 from src.sieve.services.validators import clean_query, resolve_model, resolve_top_n
-from src.sieve.services.exceptions import AskServiceError
+from src.sieve.services.exceptions import AskServiceError, OverloadedError, SearchError
 
 logger = get_logger(__name__)
 
+AskStreamEvent = tuple[str, dict[str, Any]]
+
+# Failures worth retrying on a faster model, with their metric reason.
+_FALLBACK_STATUSES = {502: "error", 504: "timeout"}
+
+_search_flights: SingleFlight[list[SearchResult]] = SingleFlight()
+_ask_flights: SingleFlight[AskResponse] = SingleFlight()
+# Searches that missed the search deadline; kept referenced until they finish.
+_background_searches: set[asyncio.Task] = set()
+
 
 async def _maybe_search_google(
-    query: str, top_n: int, settings: Settings
+    query: str,
+    top_n: int,
+    settings: Settings,
+    clients: UpstreamClients | None = None,
 ) -> tuple[list[SearchResult], str | None]:
-    google_ready = bool(settings.google_api_key and settings.google_cse_id)
-    if not google_ready:
-        logger.info("Google API ключи отсутствуют, пропускаем поиск")
-        return [], "Google не настроен: ответ будет сформирован без внешнего поиска."
+    provider = get_search_provider(settings)
+    if not provider.is_available(settings):
+        logger.info("Поисковый провайдер не настроен, пропускаем поиск")
+        return [], "Поиск не настроен: ответ будет сформирован без внешнего поиска."
+
+    cache = get_search_cache(settings)
+    cache_key = search_cache_key(query, top_n, settings)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Результаты поиска взяты из кэша")
+            return list(cached), None
+
+    async def _search():
+        return await provider.search(query, top_n, settings, clients)
 
     try:
-        results = await search_google(query=query, top_n=top_n, settings=settings)
-        return results, None
-    except GoogleSearchError as exc:
-        logger.warning("Поиск Google недоступен: %s", exc)
+        if settings.coalesce_requests:
+            results = await _search_flights.run(cache_key, _search)
+        else:
+            results = await _search()
+    except SearchError as exc:
+        logger.warning("Поиск недоступен: %s", exc)
         return [], str(exc)
 
+    if cache is not None:
+        cache.set(cache_key, list(results))
+    return results, None
+
+
+def _background_search_done(task: asyncio.Task) -> None:
+    _background_searches.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Фоновый поиск завершился ошибкой: %s", task.exception())
+
+
+async def _search_within_deadline(
+    query: str,
+    top_n: int,
+    settings: Settings,
+    clients: UpstreamClients | None,
+) -> tuple[list[SearchResult], str | None]:
+    """Search, but stop waiting once the search (or request) deadline passes.
+
+    A search that misses the deadline keeps running in the background, so its
+    results still reach the search cache for the next ask.
+    """
+    timeout = settings.search_deadline or None
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = deadline.cap(timeout)
+    if timeout is None:
+        return await _maybe_search_google(query, top_n, settings, clients)
+
+    search = asyncio.create_task(_maybe_search_google(query, top_n, settings, clients))
+    try:
+        done, _ = await asyncio.wait({search}, timeout=timeout)
+    except asyncio.CancelledError:
+        search.cancel()
+        raise
+    if done:
+        return search.result()
+    _background_searches.add(search)
+    search.add_done_callback(_background_search_done)
+    DEADLINES_EXCEEDED.labels("search").inc()
+    logger.warning("Поиск не уложился в %.2f с, отвечаем без источников", timeout)
+    return [], "Поиск не успел завершиться: ответ сгенерирован без внешних источников."
+
+
+def _note_deadline_exceeded() -> str:
+    DEADLINES_EXCEEDED.labels("generation").inc()
+    logger.warning("Запрос не уложился в отведённое время")
+    return "Не удалось сформировать ответ за отведённое время"
+
+
+def _deadline_exceeded() -> AskServiceError:
+    return AskServiceError(_note_deadline_exceeded(), status_code=504)
+
+
+def _attempt_timeout(
+    route: ModelRoute, position: int, deadline: Deadline | None
+) -> tuple[float | None, bool]:
+    """Timeout for one attempt, and whether the request deadline is what sets it.
+
+    Hitting a deadline-set timeout says nothing about the model, so it is
+    neither recorded against the model's health nor retried on another one.
+    """
+    timeout = route.timeout_for(position)
+    if deadline is None:
+        return timeout, False
+    capped = deadline.cap(timeout)
+    return capped, capped != timeout
+
 
 def _ensure_openai_ready(settings: Settings) -> None:
     if not settings.openai_api_key:
@@ -38,6 +172,120 @@ def _ensure_openai_ready(settings: Settings) -> None:
         raise AskServiceError("Ключ OpenAI не настроен.", status_code=500)
 
 
+async def _maybe_enrich(
+    results: list[SearchResult],
+    model_name: str,
+    settings: Settings,
+    clients: UpstreamClients | None,
+) -> list[SearchResult]:
+    """Attach page text to the top results when enrichment is enabled."""
+    if not settings.page_fetch_enabled or not results:
+        return results
+    with ASK_STAGE_SECONDS.labels("enrich", model_name).time(), span("enrich"):
+        return await enrich_results(results, settings, clients)
+
+
+async def _generate_or_reuse_answer(
+    query: str,
+    sources: PackedSources,
+    settings: Settings,
+    model_name: str,
+    clients: UpstreamClients | None,
+    timeout: float | None = None,
+    deadline_bound: bool = False,
+) -> tuple[str, bool]:
+    cache = get_answer_cache(settings)
+    cache_key = answer_cache_key(query, model_name, sources.results)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Ответ взят из кэша (модель: %s)", model_name)
+            return cached, True
+
+    router = get_model_router(settings)
+    try:
+        async with upstream_slot(OPENAI_UPSTREAM, settings):
+            started = time.perf_counter()
+            async with asyncio.timeout(timeout):
+                answer, _ = await generate_answer(
+                    query=query,
+                    sources=sources,
+                    settings=settings,
+                    model=model_name,
+                    client=clients.openai if clients else None,
+                )
+    except OpenAIUnavailableError as exc:
+        raise AskServiceError(
+            str(exc),
+            status_code=503,
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        ) from exc
+    except OpenAIError as exc:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            raise _deadline_exceeded() from exc
+        router.observe(model_name, time.perf_counter() - started, ok=False)
+        logger.error("Ошибка OpenAI при обработке '%s': %s", query, exc)
+        raise AskServiceError(str(exc) or "OpenAI вернул ошибку", status_code=502) from exc
+    except TimeoutError as exc:
+        if deadline_bound:
+            raise _deadline_exceeded() from exc
+        router.observe(model_name, timeout, ok=False)
+        raise AskServiceError(
+            f"Модель {model_name} не ответила за {timeout:.1f} с", status_code=504
+        ) from exc
+    router.observe(model_name, time.perf_counter() - started, ok=True)
+
+    if cache is not None:
+        cache.set(cache_key, answer)
+    return answer, False
+
+
+async def _generate_with_fallback(
+    query: str,
+    prompt_results: list[SearchResult],
+    route: ModelRoute,
+    settings: Settings,
+    clients: UpstreamClients | None,
+) -> tuple[str, bool, str, PackedSources]:
+    """Answer with the first model of ``route`` that succeeds in time.
+
+    Sources are packed for each model's own budget. Overload (503) is not
+    retried: the OpenAI circuit breaker is shared by all models.
+    """
+    deadline = current_deadline()
+    for position, model in enumerate(route.models):
+        if deadline is not None and deadline.expired:
+            raise _deadline_exceeded()
+        sources = pack_sources(prompt_results, model, settings)
+        timeout, deadline_bound = _attempt_timeout(route, position, deadline)
+        try:
+            answer, cached = await _generate_or_reuse_answer(
+                query,
+                sources,
+                settings,
+                model,
+                clients,
+                timeout=timeout,
+                deadline_bound=deadline_bound,
+            )
+        except AskServiceError as exc:
+            if position == len(route.models) - 1 or exc.status_code not in _FALLBACK_STATUSES:
+                raise
+            record_fallback(model, route.models[position + 1], _FALLBACK_STATUSES[exc.status_code])
+            continue
+        return answer, cached, model, sources
+    raise AssertionError("model route is empty")
+
+
+def _overloaded(exc: OverloadedError) -> AskServiceError:
+    return AskServiceError(
+        "Сервис перегружен, повторите запрос позже.",
+        status_code=503,
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 def _build_citations(results: Iterable[SearchResult]) -> list[Citation]:
     return [
         Citation(title=item.title, url=item.url, snippet=item.snippet, index=item.index)
@@ -55,8 +303,16 @@ def _persist_history(
     citations: list[Citation],
     results: list[SearchResult],
     search_used: bool,
+    settings: Settings,
 ) -> None:
+    trace = current_trace()
+    extra: dict[str, Any] = {}
+    if trace is not None:
+        extra["request_id"] = trace.request_id
+        if settings.history_store_timings:
+            extra["timings"] = trace.timings()
     add_history_entry(
+        **extra,
         query=query,
         top_n=top_n,
         model=model_name,
@@ -68,47 +324,354 @@ def _persist_history(
     )
 
 
-async def process_ask_request(payload: AskRequest, settings: Settings) -> AskResponse:
-    """Main entry point for orchestrating the ask workflow."""
+async def process_ask_request(
+    payload: AskRequest,
+    settings: Settings,
+    clients: UpstreamClients | None = None,
+    *,
+    admit: bool = True,
+) -> AskResponse:
+    """Main entry point for orchestrating the ask workflow.
+
+    With ``admit`` the work waits for a slot of the ask admission controller
+    and is shed with a 503 when the queue is saturated; batch items pass
+    ``admit=False`` and are counted under the ``batch`` endpoint label.
+    """
+    endpoint = "ask" if admit else "batch"
+    in_flight = ASKS_IN_FLIGHT.labels(endpoint)
+    in_flight.inc()
+    model_label, outcome = "unknown", "error"
+    try:
+        started = time.perf_counter()
+        query = clean_query(payload)
+        model_name = resolve_model(payload, settings)
+        top_n = resolve_top_n(payload, settings)
+        model_label = model_name
+        ASK_STAGE_SECONDS.labels("validation", model_name).observe(
+            time.perf_counter() - started
+        )
+
+        logger.info(
+            "Поступил запрос: '%s' (источников: %s, модель: %s)", query, top_n, model_name
+        )
+
+        async def _run():
+            with start_deadline(settings.request_deadline):
+                if not admit:
+                    return await _answer_query(query, top_n, model_name, settings, clients)
+                async with get_ask_admission(settings).admit():
+                    return await _answer_query(query, top_n, model_name, settings, clients)
+
+        try:
+            if not settings.coalesce_requests:
+                response = await _run()
+            else:
+                flight_key = (normalize_query(query), model_name, top_n, admit)
+                response = await _ask_flights.run(flight_key, _run)
+        except OverloadedError as exc:
+            outcome = "shed"
+            raise _overloaded(exc) from exc
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        outcome = "cached" if response.cached else "ok"
+        return response
+    finally:
+        in_flight.dec()
+        ASK_REQUESTS.labels(endpoint, model_label, outcome).inc()
+
+
+async def _answer_query(
+    query: str,
+    top_n: int,
+    model_name: str,
+    settings: Settings,
+    clients: UpstreamClients | None,
+) -> AskResponse:
+    with ASK_STAGE_SECONDS.labels("search", model_name).time(), span("search"):
+        results, message = await _search_within_deadline(query, top_n, settings, clients)
+    _ensure_openai_ready(settings)
+    prompt_results = await _maybe_enrich(results, model_name, settings, clients)
+    route = get_model_router(settings).route(query, model_name, settings.openai_fallback_enabled)
+    with ASK_STAGE_SECONDS.labels("generation", model_name).time():
+        answer, cached, answer_model, sources = await _generate_with_fallback(
+            query, prompt_results, route, settings, clients
+        )
+    ANSWER_SIZE_BYTES.labels(answer_model).observe(len(answer.encode()))
+
+    citations = _build_citations(sources.results)
+    search_used = bool(results)
+    if not search_used and message is None:
+        message = "Поиск недоступен: ответ сгенерирован без внешних источников."
+
+    logger.info("Ответ успешно сформирован (источников: %s)", len(citations))
+    with ASK_STAGE_SECONDS.labels("history", model_name).time(), span("history"):
+        _persist_history(
+            query=query,
+            top_n=top_n,
+            model_name=answer_model,
+            answer=answer,
+            message=message,
+            citations=citations,
+            results=results,
+            search_used=search_used,
+            settings=settings,
+        )
+
+    return AskResponse(
+        answer_markdown=answer,
+        citations=citations,
+        search_used=search_used,
+        message=message,
+        cached=cached,
+        model=answer_model,
+    )
+
+
+async def start_ask_stream(
+    payload: AskRequest,
+    settings: Settings,
+    clients: UpstreamClients | None = None,
+) -> AsyncIterator[AskStreamEvent]:
+    """Validate the request and run search, then return the answer event stream.
+
+    Validation, configuration and overload errors are raised before streaming
+    starts so they surface as regular HTTP errors; generation then holds an
+    ask admission slot until the first delta arrives. Events are ``(name, data)`` pairs:
+    ``delta`` chunks of answer text, a final ``citations`` footer, ``done`` with
+    the complete response, or ``error`` if generation fails midway.
+    """
+    started = time.perf_counter()
     query = clean_query(payload)
     model_name = resolve_model(payload, settings)
     top_n = resolve_top_n(payload, settings)
+    ASK_STAGE_SECONDS.labels("validation", model_name).observe(time.perf_counter() - started)
 
     logger.info(
-        "Поступил запрос: '%s' (источников: %s, модель: %s)", query, top_n, model_name
+        "Поступил потоковый запрос: '%s' (источников: %s, модель: %s)",
+        query,
+        top_n,
+        model_name,
     )
 
-    results, message = await _maybe_search_google(query, top_n, settings)
-    _ensure_openai_ready(settings)
+    admission = get_ask_admission(settings)
+    with start_deadline(settings.request_deadline) as deadline:
+        try:
+            admission.check()
+            with ASK_STAGE_SECONDS.labels("search", model_name).time(), span("search"):
+                results, message = await _search_within_deadline(
+                    query, top_n, settings, clients
+                )
+        except OverloadedError as exc:
+            ASK_REQUESTS.labels("stream", model_name, "shed").inc()
+            raise _overloaded(exc) from exc
+        _ensure_openai_ready(settings)
+        prompt_results = await _maybe_enrich(results, model_name, settings, clients)
+    route = get_model_router(settings).route(query, model_name, settings.openai_fallback_enabled)
+    return _stream_answer_events(
+        query, top_n, route, results, prompt_results, message, settings, clients, deadline
+    )
 
-    try:
-        answer, _ = await generate_answer(
-            query=query, results=results, settings=settings, model=model_name
+
+async def _prepend(first: str, rest: AsyncIterator[str]) -> AsyncIterator[str]:
+    if first:
+        yield first
+    async for delta in rest:
+        yield delta
+
+
+async def _open_answer_stream(
+    query: str,
+    prompt_results: list[SearchResult],
+    route: ModelRoute,
+    settings: Settings,
+    clients: UpstreamClients | None,
+    deadline: Deadline | None,
+) -> tuple[AsyncIterator[str], str, PackedSources]:
+    """Start streaming from the first model of ``route`` that sends a delta in time.
+
+    Fallback is only possible before the first delta reaches the client, and
+    the request deadline bounds the wait for that delta, not the whole stream.
+    """
+    router = get_model_router(settings)
+    for position, model in enumerate(route.models):
+        if deadline is not None and deadline.expired:
+            raise OpenAIError(_note_deadline_exceeded())
+        sources = pack_sources(prompt_results, model, settings)
+        deltas = stream_answer(
+            query=query,
+            sources=sources,
+            settings=settings,
+            model=model,
+            client=clients.openai if clients else None,
         )
-    except OpenAIError as exc:
-        logger.error("Ошибка OpenAI при обработке '%s': %s", query, exc)
-        raise AskServiceError(str(exc) or "OpenAI вернул ошибку", status_code=502) from exc
+        timeout, deadline_bound = _attempt_timeout(route, position, deadline)
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                first = await anext(deltas, "")
+        except (OpenAIError, TimeoutError) as exc:
+            await deltas.aclose()
+            if isinstance(exc, OpenAIUnavailableError):
+                raise
+            expired = deadline is not None and deadline.expired
+            if expired or (deadline_bound and isinstance(exc, TimeoutError)):
+                raise OpenAIError(_note_deadline_exceeded()) from exc
+            router.observe(model, time.perf_counter() - started, ok=False)
+            if position == len(route.models) - 1:
+                raise
+            reason = "timeout" if isinstance(exc, TimeoutError) else "error"
+            record_fallback(model, route.models[position + 1], reason)
+            continue
+        # Time to first delta is not comparable with full answers, so only the
+        # outcome is recorded.
+        router.observe(model, None, ok=True)
+        return _prepend(first, deltas), model, sources
+    raise AssertionError("model route is empty")
+
+
+async def _stream_answer_events(
+    query: str,
+    top_n: int,
+    route: ModelRoute,
+    results: list[SearchResult],
+    prompt_results: list[SearchResult],
+    message: str | None,
+    settings: Settings,
+    clients: UpstreamClients | None,
+    deadline: Deadline | None = None,
+) -> AsyncIterator[AskStreamEvent]:
+    model_name, answer_model = route.requested, route.primary
+    sources = pack_sources(prompt_results, answer_model, settings)
+    cache = get_answer_cache(settings)
+    cache_key = answer_cache_key(query, answer_model, sources.results)
+    answer = cache.get(cache_key) if cache is not None else None
+    cached = answer is not None
+
+    if cached:
+        logger.info("Ответ взят из кэша (модель: %s)", answer_model)
+        yield "delta", {"text": strip_citations_footer(answer, sources)}
+    else:
+        parts: list[str] = []
+        in_flight = ASKS_IN_FLIGHT.labels("stream")
+        in_flight.inc()
+        # The generation stage includes time spent waiting for the client to
+        # consume deltas, since streaming is paced by the reader.
+        generation = ASK_STAGE_SECONDS.labels("generation", model_name)
+        started = time.perf_counter()
+        try:
+            async with AsyncExitStack() as upstream:
+                # The ask slot is held only until the first delta: the rest is
+                # paced by the reader and would inflate the service time
+                # behind Retry-After. The OpenAI slot lasts the whole stream.
+                async with get_ask_admission(settings).admit():
+                    await upstream.enter_async_context(upstream_slot(OPENAI_UPSTREAM, settings))
+                    deltas, answer_model, sources = await _open_answer_stream(
+                        query, prompt_results, route, settings, clients, deadline
+                    )
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield "delta", {"text": delta}
+        except OverloadedError as exc:
+            ASK_REQUESTS.labels("stream", model_name, "shed").inc()
+            yield "error", {"detail": _overloaded(exc).detail}
+            return
+        except OpenAIError as exc:
+            logger.error("Ошибка OpenAI при потоковой обработке '%s': %s", query, exc)
+            ASK_REQUESTS.labels("stream", model_name, "error").inc()
+            yield "error", {"detail": str(exc) or "OpenAI вернул ошибку"}
+            return
+        finally:
+            in_flight.dec()
+            generation.observe(time.perf_counter() - started)
+
+        body = "".join(parts).strip()
+        if not body:
+            logger.error("OpenAI вернул пустой ответ для запроса: %s", query)
+            ASK_REQUESTS.labels("stream", model_name, "error").inc()
+            yield "error", {"detail": "OpenAI вернул пустой ответ"}
+            return
+        answer = append_citations_footer(body, sources)
+        if cache is not None:
+            cache.set(answer_cache_key(query, answer_model, sources.results), answer)
 
-    citations = _build_citations(results)
+    citations = _build_citations(sources.results)
     search_used = bool(results)
     if not search_used and message is None:
         message = "Поиск недоступен: ответ сгенерирован без внешних источников."
 
-    logger.info("Ответ успешно сформирован (источников: %s)", len(citations))
-    _persist_history(
-        query=query,
-        top_n=top_n,
-        model_name=model_name,
-        answer=answer,
-        message=message,
-        citations=citations,
-        results=results,
-        search_used=search_used,
-    )
+    yield "citations", {
+        "footer": sources.footer,
+        "citations": [citation.model_dump() for citation in citations],
+    }
 
-    return AskResponse(
+    logger.info("Потоковый ответ сформирован (источников: %s)", len(citations))
+    ANSWER_SIZE_BYTES.labels(answer_model).observe(len(answer.encode()))
+    with ASK_STAGE_SECONDS.labels("history", model_name).time(), span("history"):
+        _persist_history(
+            query=query,
+            top_n=top_n,
+            model_name=answer_model,
+            answer=answer,
+            message=message,
+            citations=citations,
+            results=results,
+            search_used=search_used,
+            settings=settings,
+        )
+    ASK_REQUESTS.labels("stream", model_name, "cached" if cached else "ok").inc()
+    response = AskResponse(
         answer_markdown=answer,
         citations=citations,
         search_used=search_used,
         message=message,
+        cached=cached,
+        model=answer_model,
     )
+    yield "done", response.model_dump()
+
+
+async def _run_batch_item(
+    index: int,
+    payload: AskRequest,
+    settings: Settings,
+    clients: UpstreamClients | None,
+) -> AskBatchItemResult:
+    try:
+        response = await process_ask_request(payload, settings, clients, admit=False)
+    except AskServiceError as exc:
+        return AskBatchItemResult(index=index, error=exc.detail, status_code=exc.status_code)
+    except Exception:
+        logger.exception("Непредвиденная ошибка при обработке элемента пакета %s", index)
+        return AskBatchItemResult(index=index, error="Внутренняя ошибка сервиса", status_code=500)
+    return AskBatchItemResult(index=index, status_code=200, response=response)
+
+
+async def process_ask_batch(
+    payloads: Sequence[AskRequest],
+    settings: Settings,
+    clients: UpstreamClients | None = None,
+) -> AsyncIterator[AskBatchItemResult]:
+    """Run many asks concurrently and yield each result as soon as it completes.
+
+    Calls to each upstream are bounded separately by the batch concurrency
+    settings, so items bypass the ask admission queue (they still share the
+    process-wide upstream limiters); items that fail are reported
+    individually instead of failing the whole batch.
+    """
+    logger.info("Поступил пакет из %s запросов", len(payloads))
+    limits = {
+        GOOGLE_UPSTREAM: settings.batch_google_concurrency,
+        OPENAI_UPSTREAM: settings.batch_openai_concurrency,
+    }
+    with bounded_upstreams(limits):
+        tasks = [
+            asyncio.create_task(_run_batch_item(index, payload, settings, clients))
+            for index, payload in enumerate(payloads)
+        ]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
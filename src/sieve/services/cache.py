@@ -0,0 +1,109 @@
+"""Bounded in-process caches shared by the service layer."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass
+class _CacheItem(Generic[V]):
+    value: V
+    size: int
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache bounded by entry count and approximate byte size.
+
+    Entries expire ``ttl`` seconds after insertion. ``sizeof`` estimates the
+    footprint of a value; values larger than ``max_bytes`` are not stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        sizeof: Callable[[V], int],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._items: OrderedDict[Hashable, _CacheItem[V]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            if item.expires_at <= self._clock():
+                self._remove(key)
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item.value
+
+    def set(self, key: Hashable, value: V, ttl: float | None = None) -> None:
+        size = self._sizeof(value)
+        if size > self._max_bytes:
+            return
+        expires_at = self._clock() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            self._items[key] = _CacheItem(value=value, size=size, expires_at=expires_at)
+            self._bytes += size
+            while len(self._items) > self._max_entries or self._bytes > self._max_bytes:
+                oldest = next(iter(self._items))
+                self._remove(oldest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._items),
+                bytes=self._bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _remove(self, key: Hashable) -> None:
+        item = self._items.pop(key)
+        self._bytes -= item.size
@@ -0,0 +1,68 @@
+"""Per-upstream concurrency bounds scoped to a unit of work."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from src.sieve.config import Settings
+from src.sieve.services.admission import AdmissionController, admission_controller
+
+GOOGLE_UPSTREAM = "google"
+OPENAI_UPSTREAM = "openai"
+
+_upstream_limits: ContextVar[dict[str, asyncio.Semaphore] | None] = ContextVar(
+    "sieve_upstream_limits", default=None
+)
+
+
+@contextmanager
+def bounded_upstreams(limits: Mapping[str, int]) -> Iterator[None]:
+    """Bound concurrent upstream calls made by tasks created inside the block.
+
+    Tasks copy the current context when created, so every task spawned here
+    shares the same semaphores even after the block exits. Non-positive
+    limits leave the upstream unbounded.
+    """
+    semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items() if limit > 0}
+    token = _upstream_limits.set(semaphores)
+    try:
+        yield
+    finally:
+        _upstream_limits.reset(token)
+
+
+def get_upstream_admission(upstream: str, settings: Settings) -> AdmissionController:
+    """Process-wide concurrency limiter for ``upstream``.
+
+    Only concurrency and the wait deadline are bounded: callers were already
+    admitted as asks, so queue length is bounded upstream of this limiter.
+    """
+    if upstream == GOOGLE_UPSTREAM:
+        limit = settings.google_max_concurrency
+    elif upstream == OPENAI_UPSTREAM:
+        limit = settings.openai_max_concurrency
+    else:
+        limit = 0
+    return admission_controller(upstream, limit, 0, settings.admission_deadline)
+
+
+@asynccontextmanager
+async def upstream_slot(upstream: str, settings: Settings | None = None) -> AsyncIterator[None]:
+    """Hold one concurrency slot for ``upstream``.
+
+    The slot is bounded by the current scope (see :func:`bounded_upstreams`)
+    and, when ``settings`` are given, by the process-wide upstream limiter.
+    The scope slot is taken first so scoped waiters never crowd the shared
+    queue.
+    """
+    limits = _upstream_limits.get()
+    semaphore = limits.get(upstream) if limits else None
+    async with AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+        if settings is not None:
+            await stack.enter_async_context(get_upstream_admission(upstream, settings).admit())
+        yield
@@ -0,0 +1,81 @@
+"""Per-request time budget propagated through contextvars.
+
+An ask gets one deadline. Upstream calls made on its behalf use the smaller of
+their own timeout and the time left, so a slow stage shortens the next one
+instead of every stage waiting out its fixed timeout.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Monotonic instant by which the request should be answered."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> Deadline:
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: float | None) -> float:
+        """``timeout`` shortened to the time left; ``None`` means no own limit."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("sieve_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+@contextmanager
+def start_deadline(seconds: float) -> Iterator[Deadline | None]:
+    """Bound code in this context (and tasks it spawns) to ``seconds``; 0 disables.
+
+    An enclosing deadline that expires sooner is kept.
+    """
+    outer = _current_deadline.get()
+    if seconds <= 0:
+        yield outer
+        return
+    deadline = Deadline.after(seconds)
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_timeout(timeout: float) -> float:
+    """``timeout`` capped by the current deadline, if any."""
+    deadline = _current_deadline.get()
+    return timeout if deadline is None else deadline.cap(timeout)
+
+
+def deadline_capped(timeout: float) -> bool:
+    """Whether the current deadline leaves less than ``timeout``."""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.remaining() < timeout
+
+
+def deadline_expired() -> bool:
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired
@@ -6,7 +6,23 @@ from __future__ import annotations
 class AskServiceError(Exception):
     """Domain-level error produced by the Ask service."""
 
-    def __init__(self, detail: str, status_code: int) -> None:
+    def __init__(
+        self, detail: str, status_code: int, headers: dict[str, str] | None = None
+    ) -> None:
         super().__init__(detail)
         self.detail = detail
         self.status_code = status_code
+        self.headers = headers
+
+
+class SearchError(Exception):
+    """Raised when a web search provider cannot return results."""
+
+
+class OverloadedError(Exception):
+    """Raised when work is shed because a concurrency limiter is saturated."""
+
+    def __init__(self, resource: str, retry_after: float) -> None:
+        super().__init__(f"{resource} is overloaded")
+        self.resource = resource
+        self.retry_after = retry_after
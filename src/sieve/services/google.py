@@ -1,15 +1,27 @@
+import asyncio
+import math
 from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import httpx
 
 from src.sieve.config import Settings
-from src.sieve.core.constants import GOOGLE_SEARCH_ENDPOINT
+from src.sieve.core.constants import GOOGLE_MAX_RESULTS, GOOGLE_PAGE_SIZE
 from src.sieve.core.logging import get_logger
+from src.sieve.services.concurrency import GOOGLE_UPSTREAM
+from src.sieve.services.deadline import remaining_timeout
+from src.sieve.services.exceptions import SearchError
+from src.sieve.services.http_clients import upstream_client
+from src.sieve.services.resilience import CircuitOpenError, get_upstream_guard
 
 logger = get_logger(__name__)
 
+_TRACKING_PARAM_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = {"gclid", "fbclid", "yclid"}
 
-class GoogleSearchError(Exception):
+
+class GoogleSearchError(SearchError):
     """Raised when Google search fails."""
 
 
@@ -19,21 +31,66 @@ class SearchResult:
     url: str
     snippet: str
     index: int
+    # Page text fetched for the prompt; citations keep showing the snippet.
+    content: str | None = None
+
+
+def effective_num(top_n: int, settings: Settings) -> int:
+    """Clamp the requested number of results to the configured bounds."""
+    upper = min(settings.max_top_n, GOOGLE_MAX_RESULTS)
+    return max(settings.min_top_n, min(top_n, upper))
+
+
+def canonical_url(url: str) -> str:
+    """Normalise a URL so trivially different links to one page compare equal."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in _TRACKING_PARAMS and not key.startswith(_TRACKING_PARAM_PREFIXES)
+        ]
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
 
 
-async def search_google(query: str, top_n: int, settings: Settings) -> list[SearchResult]:
-    """Query Google Custom Search and return ordered search results."""
+def _page_windows(num: int) -> list[tuple[int, int]]:
+    """Split ``num`` results into ``(start, count)`` CSE page requests."""
+    return [
+        (start, min(GOOGLE_PAGE_SIZE, num - start + 1))
+        for start in range(1, num + 1, GOOGLE_PAGE_SIZE)
+    ]
+
+
+async def _fetch_page(
+    http: httpx.AsyncClient, query: str, start: int, count: int, settings: Settings
+) -> list[dict[str, Any]]:
     params = {
         "key": settings.google_api_key,
         "cx": settings.google_cse_id,
         "q": query,
-        "num": max(settings.min_top_n, min(top_n, settings.max_top_n)),
+        "num": count,
         "safe": "off",
     }
+    if start > 1:
+        params["start"] = start
 
+    url = settings.google_search_endpoint
+    guard = get_upstream_guard(GOOGLE_UPSTREAM, settings)
     try:
-        async with httpx.AsyncClient(timeout=settings.google_timeout) as client:
-            response = await client.get(GOOGLE_SEARCH_ENDPOINT, params=params)
+        response = await guard.send(
+            lambda: http.get(
+                url, params=params, timeout=remaining_timeout(settings.google_timeout)
+            ),
+            timeout=settings.google_timeout,
+        )
+    except CircuitOpenError as exc:
+        logger.warning("Google CSE пропущен: цепь разомкнута")
+        raise GoogleSearchError(
+            f"Google CSE временно недоступен, повторите через {math.ceil(exc.retry_after)} с"
+        ) from exc
     except httpx.HTTPError as exc:
         logger.error("Сетевая ошибка при обращении к Google CSE: %s", exc)
         raise GoogleSearchError("Сетевая ошибка при обращении к Google CSE") from exc
@@ -49,17 +106,63 @@ async def search_google(query: str, top_n: int, settings: Settings) -> list[Sear
         )
 
     payload = response.json()
-    items = payload.get("items", [])
+    return payload.get("items", [])
+
+
+def _merge_pages(pages: list[list[dict[str, Any]]], limit: int) -> list[SearchResult]:
     results: list[SearchResult] = []
-    for index, item in enumerate(items, start=1):
-        results.append(
-            SearchResult(
-                title=item.get("title", ""),
-                url=item.get("link", ""),
-                snippet=item.get("snippet", ""),
-                index=index,
+    seen: set[str] = set()
+    for items in pages:
+        for item in items:
+            url = item.get("link", "")
+            key = canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(
+                SearchResult(
+                    title=item.get("title", ""),
+                    url=url,
+                    snippet=item.get("snippet", ""),
+                    index=len(results) + 1,
+                )
             )
+            if len(results) == limit:
+                return results
+    return results
+
+
+async def search_google(
+    query: str,
+    top_n: int,
+    settings: Settings,
+    client: httpx.AsyncClient | None = None,
+) -> list[SearchResult]:
+    """Query Google Custom Search and return ordered search results.
+
+    Requests above the CSE page size are split into pages fetched
+    concurrently; results are de-duplicated by canonical URL and renumbered
+    in rank order. The first page is required, later pages are best effort.
+    """
+    num = effective_num(top_n, settings)
+    windows = _page_windows(num)
+
+    async with upstream_client(client, timeout=settings.google_timeout) as http:
+        pages = await asyncio.gather(
+            *(_fetch_page(http, query, start, count, settings) for start, count in windows),
+            return_exceptions=True,
         )
 
+    first_page = pages[0]
+    if isinstance(first_page, BaseException):
+        raise first_page
+    merged_pages = [first_page]
+    for (start, _), page in zip(windows[1:], pages[1:]):
+        if isinstance(page, BaseException):
+            logger.warning("Страница Google CSE с позиции %s недоступна: %s", start, page)
+            break
+        merged_pages.append(page)
+
+    results = _merge_pages(merged_pages, num)
     logger.info("Google поиск вернул %s результатов", len(results))
     return results
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import threading
 from collections.abc import Iterable
 from uuid import UUID
 
-from src.sieve.core.constants import DEFAULT_HISTORY_MAX_SIZE
+from src.sieve.config import Settings, get_settings
+from src.sieve.core.constants import DEFAULT_HISTORY_MAX_SIZE, HISTORY_BACKEND_SQLITE
+from src.sieve.core.logging import get_logger
 from src.sieve.models.ask import Citation
 from src.sieve.models.history import HistoryListResponse
 from src.sieve.repositories.history_repository import HistoryRepository
+from src.sieve.repositories.sqlite_history_repository import SqliteHistoryRepository
 from src.sieve.services.google import SearchResult
 
+logger = get_logger(__name__)
+
 
 class HistoryStore(HistoryRepository):
     """Backwards-compatible alias for the in-memory history repository."""
@@ -49,6 +55,26 @@ class HistoryStore(HistoryRepository):
         return super().delete(entry_id)
 
 
+def build_history_store(settings: Settings) -> HistoryStore | SqliteHistoryRepository:
+    """Create the history backend selected in settings (in-memory by default)."""
+    if settings.history_backend == HISTORY_BACKEND_SQLITE:
+        logger.info("История хранится в SQLite: %s", settings.history_db_path)
+        return SqliteHistoryRepository(settings.history_db_path, settings.history_max_size)
+    return HistoryStore(settings.history_max_size)
+
+
+def get_history_store() -> HistoryStore | SqliteHistoryRepository:
+    """The process-wide store, opened on first use and again after a close."""
+    global history_store
+    store = history_store
+    if store is None:
+        with _history_store_lock:
+            if history_store is None:
+                history_store = build_history_store(get_settings())
+            store = history_store
+    return store
+
+
 def add_history_entry(
     *,
     query: str,
@@ -59,8 +85,10 @@ def add_history_entry(
     citations: list[Citation],
     results: list[SearchResult],
     search_used: bool,
+    request_id: str | None = None,
+    timings: dict[str, float] | None = None,
 ) -> None:
-    history_store.add_entry(
+    get_history_store().insert(
         query=query,
         top_n=top_n,
         model=model,
@@ -69,19 +97,39 @@ def add_history_entry(
         citations=citations,
         results=results,
         search_used=search_used,
+        request_id=request_id,
+        timings=timings,
     )
 
 
-def list_entries() -> HistoryListResponse:
-    return history_store.list_entries()
+def list_entries(limit: int | None = None, cursor: int | None = None) -> HistoryListResponse:
+    return get_history_store().list_page(limit=limit, cursor=cursor)
+
+
+def search_entries(query: str, limit: int) -> HistoryListResponse:
+    return get_history_store().search(query, limit)
+
+
+def history_version() -> int:
+    return get_history_store().version
 
 
 def clear_history() -> None:
-    history_store.clear()
+    get_history_store().clear()
 
 
 def delete_history_entry(entry_id: UUID) -> bool:
-    return history_store.delete(entry_id)
+    return get_history_store().delete(entry_id)
+
+
+def close_history_store() -> None:
+    """Close the store; the next call that needs history reopens it."""
+    global history_store
+    with _history_store_lock:
+        store, history_store = history_store, None
+    if store is not None:
+        store.close()
 
 
-history_store = HistoryStore()
+history_store: HistoryStore | SqliteHistoryRepository | None = None
+_history_store_lock = threading.Lock()
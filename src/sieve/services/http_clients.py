@@ -0,0 +1,107 @@
+"""Long-lived pooled HTTP clients for upstream APIs."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+
+from src.sieve.config import Settings
+from src.sieve.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class UpstreamClients:
+    """Per-upstream connection pools shared by all requests of the app."""
+
+    google: httpx.AsyncClient
+    openai: httpx.AsyncClient
+    pages: httpx.AsyncClient
+
+    async def aclose(self) -> None:
+        await asyncio.gather(
+            self.google.aclose(),
+            self.openai.aclose(),
+            self.pages.aclose(),
+            return_exceptions=True,
+        )
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_limits(settings: Settings) -> httpx.Limits:
+    """Translate pool settings into ``httpx.Limits``."""
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+
+
+def create_upstream_client(settings: Settings, timeout: float) -> httpx.AsyncClient:
+    """Create a pooled client honouring the configured limits and HTTP/2 flag."""
+    http2 = settings.http_http2
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 запрошен, но пакет h2 не установлен; используем HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(timeout=timeout, limits=build_limits(settings), http2=http2)
+
+
+def create_upstream_clients(settings: Settings) -> UpstreamClients:
+    return UpstreamClients(
+        google=create_upstream_client(settings, settings.google_timeout),
+        openai=create_upstream_client(settings, settings.openai_timeout),
+        pages=create_upstream_client(settings, settings.page_fetch_deadline),
+    )
+
+
+async def warm_up(client: httpx.AsyncClient, url: str, connections: int) -> int:
+    """Open up to ``connections`` keep-alive connections; return how many succeeded."""
+    if connections <= 0:
+        return 0
+
+    async def _probe() -> bool:
+        try:
+            await client.head(url)
+        except httpx.HTTPError as exc:
+            logger.warning("Не удалось прогреть соединение с %s: %s", url, exc)
+            return False
+        return True
+
+    outcomes = await asyncio.gather(*(_probe() for _ in range(connections)))
+    return sum(outcomes)
+
+
+async def start_upstream_clients(settings: Settings) -> UpstreamClients:
+    """Create the shared clients and optionally pre-open connections."""
+    clients = create_upstream_clients(settings)
+    connections = settings.http_warmup_connections
+    if connections > 0:
+        targets = []
+        if settings.google_api_key and settings.google_cse_id:
+            targets.append(warm_up(clients.google, settings.google_search_endpoint, connections))
+        if settings.openai_api_key:
+            targets.append(warm_up(clients.openai, settings.openai_base_url, connections))
+        warmed = await asyncio.gather(*targets)
+        logger.info("Прогрето соединений с внешними API: %s", sum(warmed))
+    return clients
+
+
+@asynccontextmanager
+async def upstream_client(
+    client: httpx.AsyncClient | None, *, timeout: float
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the shared client, or a short-lived one when none was injected."""
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient(timeout=timeout) as ephemeral:
+        yield ephemeral
@@ -0,0 +1,297 @@
+"""In-process metrics with Prometheus text exposition."""
+
+from __future__ import annotations
+
+import abc
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+LabelValues = tuple[str, ...]
+
+
+@dataclass
+class MetricFamily:
+    """A rendered metric: ``samples`` are ``(suffix, labels, value)`` triples."""
+
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self._bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+C = TypeVar("C")
+M = TypeVar("M", bound="_Metric")
+
+
+class _Metric(abc.ABC, Generic[C]):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[LabelValues, C] = {}
+
+    def labels(self, *values: str) -> C:
+        # Recording happens on the event loop, so a plain dict is enough; the
+        # setdefault keeps concurrent first use from threads consistent.
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abc.abstractmethod
+    def _new_child(self) -> C:
+        """Create the series for one set of label values."""
+
+    def _label_dict(self, values: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    @abc.abstractmethod
+    def collect(self) -> MetricFamily:
+        """Snapshot every series for exposition."""
+
+
+class Counter(_Metric[_CounterChild]):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.help)
+        for values, child in list(self._children.items()):
+            family.samples.append(("_total", self._label_dict(values), child.value))
+        return family
+
+
+class Gauge(_Metric[_GaugeChild]):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.help)
+        for values, child in list(self._children.items()):
+            family.samples.append(("", self._label_dict(values), child.value))
+        return family
+
+
+class Histogram(_Metric[_HistogramChild]):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.kind, self.help)
+        for values, child in list(self._children.items()):
+            labels = self._label_dict(values)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                family.samples.append(("_bucket", bucket_labels, cumulative))
+            family.samples.append(("_sum", labels, child.sum))
+            family.samples.append(("_count", labels, child.count))
+        return family
+
+
+class MetricsRegistry:
+    """Metrics recorded by the application plus collectors read at scrape time."""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> list[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self, extra: Iterable[MetricFamily] = ()) -> str:
+        """Render every family in the Prometheus text format (version 0.0.4)."""
+        lines: list[str] = []
+        for family in (*self.collect(), *extra):
+            # Counter samples carry the ``_total`` suffix; the 0.0.4 format
+            # expects the metadata lines to name the sample.
+            name = f"{family.name}_total" if family.kind == "counter" else family.name
+            lines.append(f"# HELP {name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            for suffix, labels, value in family.samples:
+                sample = f"{family.name}{suffix}{_format_labels(labels)}"
+                lines.append(f"{sample} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+ASK_STAGE_SECONDS = REGISTRY.histogram(
+    "sieve_ask_stage_duration_seconds",
+    "Duration of each ask pipeline stage.",
+    ("stage", "model"),
+)
+ASK_REQUESTS = REGISTRY.counter(
+    "sieve_ask_requests",
+    "Completed asks by endpoint, model and outcome.",
+    ("endpoint", "model", "outcome"),
+)
+ASKS_IN_FLIGHT = REGISTRY.gauge(
+    "sieve_asks_in_flight",
+    "Asks currently being processed.",
+    ("endpoint",),
+)
+ASKS_CANCELLED = REGISTRY.counter(
+    "sieve_asks_cancelled",
+    "Asks abandoned because the client disconnected, by endpoint.",
+    ("endpoint",),
+)
+ANSWER_SIZE_BYTES = REGISTRY.histogram(
+    "sieve_answer_size_bytes",
+    "Size of generated answers in UTF-8 bytes.",
+    ("model",),
+    buckets=SIZE_BUCKETS,
+)
+OPENAI_TOKENS = REGISTRY.counter(
+    "sieve_openai_tokens",
+    "OpenAI tokens by model and kind (input, cached_input, output).",
+    ("model", "kind"),
+)
+DEADLINES_EXCEEDED = REGISTRY.counter(
+    "sieve_deadlines_exceeded",
+    "Asks cut short by a deadline, by stage (search, generation).",
+    ("stage",),
+)
+MODEL_ROUTES = REGISTRY.counter(
+    "sieve_model_routes",
+    "Models picked for model=auto asks.",
+    ("model",),
+)
+MODEL_FALLBACKS = REGISTRY.counter(
+    "sieve_model_fallbacks",
+    "Retries on a faster model by the abandoned model and reason (error, timeout).",
+    ("model", "reason"),
+)
+PAGE_FETCHES = REGISTRY.counter(
+    "sieve_page_fetches",
+    "Result page fetches for enrichment by outcome.",
+    ("outcome",),
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "sieve_upstream_responses",
+    "Upstream HTTP attempts by status code ('error' for transport failures).",
+    ("upstream", "status"),
+)
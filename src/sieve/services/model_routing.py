@@ -0,0 +1,177 @@
+"""Pick the OpenAI model for an ask and the faster models to fall back to.
+
+Models are ordered in tiers from fastest to strongest. ``model=auto`` maps the
+query's complexity to a tier, then steps down past models that are currently
+degraded: their recent p95 latency is above the threshold or their last calls
+failed. Each model in a route is followed by faster healthy ones, so an ask
+that times out or errors is retried on a quicker model instead of failing.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.sieve.config import Settings
+from src.sieve.core.constants import MODEL_AUTO
+from src.sieve.core.logging import get_logger
+from src.sieve.services.metrics import MODEL_FALLBACKS, MODEL_ROUTES
+from src.sieve.services.search_providers import LatencyTracker
+
+logger = get_logger(__name__)
+
+_MAX_ROUTE_LENGTH = 3
+_FAILURE_STREAK = 3
+_LATENCY_PERCENTILE = 0.95
+# Questions asking for reasoning rather than a lookup count as longer ones.
+_REASONING_RE = re.compile(
+    r"\b(why|compare|explain|difference|versus|vs|pros|cons|trade-?offs?"
+    r"|почему|сравни\w*|объясни\w*|разниц\w*|отлича\w*|плюсы|минусы)\b",
+    re.I,
+)
+_REASONING_BONUS = 0.5
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Models to try in order; all but the last are abandoned after ``attempt_timeout``."""
+
+    requested: str
+    models: tuple[str, ...]
+    attempt_timeout: float | None = None
+
+    @property
+    def primary(self) -> str:
+        return self.models[0]
+
+    def timeout_for(self, position: int) -> float | None:
+        return self.attempt_timeout if position < len(self.models) - 1 else None
+
+
+class ModelHealth:
+    """Recent latency and failure streak of one model."""
+
+    def __init__(self, window: int, clock: Callable[[], float]) -> None:
+        self._latency = LatencyTracker(window)
+        self._clock = clock
+        self._failures = 0
+        self._updated_at: float | None = None
+
+    def record(self, seconds: float | None, ok: bool) -> None:
+        if seconds is not None:
+            self._latency.record(seconds)
+        self._failures = 0 if ok else self._failures + 1
+        self._updated_at = self._clock()
+
+    def degraded(self, threshold: float, cooldown: float) -> bool:
+        # Stale verdicts expire, so a degraded model is probed again eventually.
+        if self._updated_at is None or self._clock() - self._updated_at >= cooldown:
+            return False
+        if self._failures >= _FAILURE_STREAK:
+            return True
+        p95 = self._latency.percentile(_LATENCY_PERCENTILE)
+        return p95 is not None and p95 > threshold
+
+
+def query_complexity(query: str, complex_words: int) -> float:
+    """Score from 0 (short lookup) to 1 (long or reasoning-heavy question)."""
+    words = len(_WORD_RE.findall(query))
+    score = words / max(complex_words, 1)
+    if _REASONING_RE.search(query):
+        score += _REASONING_BONUS
+    return min(score, 1.0)
+
+
+class ModelRouter:
+    """Route asks across model tiers using live per-model health."""
+
+    def __init__(
+        self,
+        tiers: Sequence[str],
+        *,
+        latency_threshold: float,
+        complex_words: int,
+        window: int,
+        cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._tiers = list(tiers)
+        self._threshold = latency_threshold
+        self._complex_words = complex_words
+        self._cooldown = cooldown
+        self._health = {model: ModelHealth(window, clock) for model in self._tiers}
+
+    def _healthy(self, model: str) -> bool:
+        health = self._health.get(model)
+        return health is None or not health.degraded(self._threshold, self._cooldown)
+
+    def _faster_than(self, position: int) -> list[str]:
+        return [model for model in reversed(self._tiers[:position]) if self._healthy(model)]
+
+    def route(self, query: str, requested: str, fallback: bool = False) -> ModelRoute:
+        """Build the route for ``requested``, a configured model or ``auto``."""
+        if requested == MODEL_AUTO:
+            complexity = query_complexity(query, self._complex_words)
+            preferred = round(complexity * (len(self._tiers) - 1))
+            candidates = self._faster_than(preferred + 1) or self._tiers[:1]
+            MODEL_ROUTES.labels(candidates[0]).inc()
+            if candidates[0] != self._tiers[preferred]:
+                logger.info(
+                    "Модель %s деградировала, выбрана %s", self._tiers[preferred], candidates[0]
+                )
+        elif fallback and requested in self._tiers:
+            position = self._tiers.index(requested)
+            candidates = [requested, *self._faster_than(position)]
+        else:
+            return ModelRoute(requested=requested, models=(requested,))
+        models = tuple(candidates[:_MAX_ROUTE_LENGTH])
+        timeout = self._threshold if len(models) > 1 else None
+        return ModelRoute(requested=requested, models=models, attempt_timeout=timeout)
+
+    def observe(self, model: str, seconds: float | None, ok: bool) -> None:
+        """Record a finished call; ``seconds`` is ``None`` when not comparable."""
+        health = self._health.get(model)
+        if health is not None:
+            health.record(seconds, ok)
+
+
+def record_fallback(model: str, next_model: str, reason: str) -> None:
+    MODEL_FALLBACKS.labels(model, reason).inc()
+    logger.warning("Модель %s не ответила (%s), повторяем на %s", model, reason, next_model)
+
+
+def model_tiers(settings: Settings) -> list[str]:
+    """Configured tiers, or the selectable models in settings order."""
+    tiers = settings.openai_auto_tiers or [settings.openai_model, *settings.openai_model_options]
+    return list(dict.fromkeys(tiers))
+
+
+@lru_cache(maxsize=4)
+def _shared_model_router(
+    tiers: tuple[str, ...],
+    latency_threshold: float,
+    complex_words: int,
+    window: int,
+    cooldown: float,
+) -> ModelRouter:
+    return ModelRouter(
+        tiers,
+        latency_threshold=latency_threshold,
+        complex_words=complex_words,
+        window=window,
+        cooldown=cooldown,
+    )
+
+
+def get_model_router(settings: Settings) -> ModelRouter:
+    return _shared_model_router(
+        tuple(model_tiers(settings)),
+        settings.openai_latency_threshold,
+        settings.openai_auto_complex_words,
+        settings.openai_stats_window,
+        settings.openai_degraded_cooldown,
+    )
@@ -1,14 +1,30 @@
+import asyncio
+import math
+from collections.abc import AsyncIterator
+
 import httpx
 
 from src.sieve.config import Settings
-from src.sieve.core.constants import (
-    CITATIONS_HEADER,
-    NO_SEARCH_RESULTS_FALLBACK,
-    OPENAI_RESPONSES_PATH,
-)
+from src.sieve.core.constants import OPENAI_RESPONSES_PATH
 from src.sieve.core.logging import get_logger
-from src.sieve.services.google import SearchResult
-from src.sieve.services.openai_payload import extract_answer_chunks, build_responses_payload
+from src.sieve.services.concurrency import OPENAI_UPSTREAM
+from src.sieve.services.deadline import deadline_capped, remaining_timeout
+from src.sieve.services.http_clients import upstream_client
+from src.sieve.services.metrics import OPENAI_TOKENS
+from src.sieve.services.openai_payload import (
+    ResponseStreamParser,
+    ResponseUsage,
+    build_responses_payload,
+    extract_answer_chunks,
+    extract_stream_delta,
+    extract_stream_error,
+    extract_stream_usage,
+    extract_usage,
+)
+from src.sieve.services.resilience import CircuitOpenError, get_upstream_guard, ran_out_of_time
+from src.sieve.services.source_packing import PackedSources
+from src.sieve.services.tracing import span
+
 logger = get_logger(__name__)
 
 
@@ -16,28 +32,90 @@ class OpenAIError(Exception):
     """Raised when OpenAI response generation fails."""
 
 
-def _build_sources_block(results: list[SearchResult]) -> str:
-    lines = []
-    for result in results:
-        lines.append(f"[{result.index}] {result.title}\n{result.url}\n{result.snippet}")
-    return "\n\n".join(lines) if lines else NO_SEARCH_RESULTS_FALLBACK
+class OpenAIUnavailableError(OpenAIError):
+    """Raised without calling OpenAI while its circuit breaker is open."""
 
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            f"OpenAI временно недоступен, повторите через {math.ceil(retry_after)} с"
+        )
+        self.retry_after = retry_after
 
-async def generate_answer(
-    query: str, results: list[SearchResult], settings: Settings, model: str
-) -> tuple[str, str]:
-    """Ask OpenAI Responses API to craft a markdown answer with citations."""
-    headers = {
+
+def _circuit_open(exc: CircuitOpenError) -> OpenAIUnavailableError:
+    logger.warning("Запрос к OpenAI отклонён: цепь разомкнута")
+    return OpenAIUnavailableError(exc.retry_after)
+
+
+def append_citations_footer(answer: str, sources: PackedSources) -> str:
+    # Append an explicit citations footer so the UI (and tests) always presents
+    # the supporting sources together with the model answer.
+    return f"{answer}\n\n{sources.footer}".strip()
+
+
+def strip_citations_footer(answer_with_citations: str, sources: PackedSources) -> str:
+    """Inverse of :func:`append_citations_footer`."""
+    return answer_with_citations.removesuffix(sources.footer).rstrip()
+
+
+def _record_usage(model: str, usage: ResponseUsage | None) -> None:
+    if usage is None:
+        return
+    OPENAI_TOKENS.labels(model, "input").inc(usage.input_tokens)
+    OPENAI_TOKENS.labels(model, "cached_input").inc(usage.cached_tokens)
+    OPENAI_TOKENS.labels(model, "output").inc(usage.output_tokens)
+    logger.info(
+        "Токены OpenAI (модель: %s): вход %s, из кэша промта %s, выход %s",
+        model,
+        usage.input_tokens,
+        usage.cached_tokens,
+        usage.output_tokens,
+    )
+
+
+def _request_headers(settings: Settings) -> dict[str, str]:
+    return {
         "Authorization": f"Bearer {settings.openai_api_key}",
         "Content-Type": "application/json",
     }
 
-    sources_block = _build_sources_block(results)
-    payload = build_responses_payload(query=query, sources_block=sources_block, model=model)
-    url = f"{settings.openai_base_url.rstrip('/')}{OPENAI_RESPONSES_PATH}"
+
+def _responses_url(settings: Settings) -> str:
+    return f"{settings.openai_base_url.rstrip('/')}{OPENAI_RESPONSES_PATH}"
+
+
+async def generate_answer(
+    query: str,
+    sources: PackedSources,
+    settings: Settings,
+    model: str,
+    client: httpx.AsyncClient | None = None,
+) -> tuple[str, str]:
+    """Ask OpenAI Responses API to craft a markdown answer with citations."""
+    with span("payload"):
+        headers = _request_headers(settings)
+        payload = build_responses_payload(
+            query=query,
+            sources_block=sources.block,
+            model=model,
+            prompt_cache_key=settings.openai_prompt_cache_key,
+        )
+    url = _responses_url(settings)
+    guard = get_upstream_guard(OPENAI_UPSTREAM, settings)
     try:
-        async with httpx.AsyncClient(timeout=settings.openai_timeout) as client:
-            response = await client.post(url, headers=headers, json=payload)
+        async with upstream_client(client, timeout=settings.openai_timeout) as http:
+            with span("openai"):
+                response = await guard.send(
+                    lambda: http.post(
+                        url,
+                        headers=headers,
+                        json=payload,
+                        timeout=remaining_timeout(settings.openai_timeout),
+                    ),
+                    timeout=settings.openai_timeout,
+                )
+    except CircuitOpenError as exc:
+        raise _circuit_open(exc) from exc
     except httpx.HTTPError as exc:
         logger.error("Ошибка сети при обращении к OpenAI: %s", exc)
         raise OpenAIError("Сетевая ошибка при обращении к OpenAI") from exc
@@ -50,22 +128,125 @@ async def generate_answer(
         )
         raise OpenAIError(f"Ошибка OpenAI: {response.status_code} {response.text}")
 
-    try:
-        data = response.json()
-    except ValueError as exc:
-        logger.error("Не удалось разобрать JSON от OpenAI: %s", exc)
-        raise OpenAIError("Некорректный JSON в ответе OpenAI") from exc
-    answer_chunks = extract_answer_chunks(data)
-    answer = "\n".join(answer_chunks).strip()
+    with span("parse"):
+        try:
+            data = response.json()
+        except ValueError as exc:
+            logger.error("Не удалось разобрать JSON от OpenAI: %s", exc)
+            raise OpenAIError("Некорректный JSON в ответе OpenAI") from exc
+        answer_chunks = extract_answer_chunks(data)
+        answer = "\n".join(answer_chunks).strip()
+    _record_usage(model, extract_usage(data))
 
     if not answer:
         logger.error("OpenAI вернул пустой ответ для запроса: %s", query)
         raise OpenAIError("OpenAI вернул пустой ответ")
 
-    citations_block = _build_sources_block(results)
-    # Append an explicit citations footer so the UI (and tests) always presents
-    # the supporting sources together with the model answer.
-    answer_with_citations = f"{answer}\n\n{CITATIONS_HEADER}\n{citations_block}".strip()
+    answer_with_citations = append_citations_footer(answer, sources)
 
     logger.info("Ответ OpenAI успешно получен (модель: %s)", model)
     return answer_with_citations, data.get("id", "")
+
+
+async def stream_answer(
+    query: str,
+    sources: PackedSources,
+    settings: Settings,
+    model: str,
+    client: httpx.AsyncClient | None = None,
+) -> AsyncIterator[str]:
+    """Stream answer text deltas from the Responses API as they are generated.
+
+    The citations footer is not included; callers append it once the stream
+    completes. Failures are retried only until the first event is received.
+    """
+    with span("payload"):
+        payload = build_responses_payload(
+            query=query,
+            sources_block=sources.block,
+            model=model,
+            stream=True,
+            prompt_cache_key=settings.openai_prompt_cache_key,
+        )
+    parser = ResponseStreamParser()
+    usage: ResponseUsage | None = None
+    guard = get_upstream_guard(OPENAI_UPSTREAM, settings)
+    attempt = 0
+    started = False
+    try:
+        async with upstream_client(client, timeout=settings.openai_timeout) as http:
+            while True:
+                guard.before_attempt(attempt)
+                deadline_bound = deadline_capped(settings.openai_timeout)
+                try:
+                    async with http.stream(
+                        "POST",
+                        _responses_url(settings),
+                        headers=_request_headers(settings),
+                        json=payload,
+                        timeout=remaining_timeout(settings.openai_timeout),
+                    ) as response:
+                        delay = guard.on_response(response, attempt)
+                        if delay is None and response.status_code != httpx.codes.OK:
+                            body = (await response.aread()).decode("utf-8", errors="replace")
+                            logger.error(
+                                "OpenAI вернул статус %s и тело ответа: %s",
+                                response.status_code,
+                                body,
+                            )
+                            raise OpenAIError(f"Ошибка OpenAI: {response.status_code} {body}")
+
+                        if delay is None:
+                            started = True
+                            async for line in response.aiter_lines():
+                                event = parser.feed_line(line)
+                                usage = _stream_event_usage(event) or usage
+                                text = _stream_event_text(event)
+                                if text:
+                                    yield text
+                            event = parser.flush()
+                            usage = _stream_event_usage(event) or usage
+                            text = _stream_event_text(event)
+                            if text:
+                                yield text
+                            break
+                        logger.warning(
+                            "OpenAI вернул статус %s, повтор через %.2f с",
+                            response.status_code,
+                            delay,
+                        )
+                except httpx.TransportError as exc:
+                    if started:
+                        if not ran_out_of_time(exc, deadline_bound):
+                            guard.breaker.record_failure()
+                        raise
+                    delay = guard.on_transport_error(attempt, exc, deadline_bound)
+                    if delay is None:
+                        raise
+                attempt += 1
+                await asyncio.sleep(delay)
+    except CircuitOpenError as exc:
+        raise _circuit_open(exc) from exc
+    except httpx.HTTPError as exc:
+        logger.error("Ошибка сети при обращении к OpenAI: %s", exc)
+        raise OpenAIError("Сетевая ошибка при обращении к OpenAI") from exc
+    except ValueError as exc:
+        logger.error("Не удалось разобрать событие потока OpenAI: %s", exc)
+        raise OpenAIError("Некорректный JSON в потоке OpenAI") from exc
+
+    _record_usage(model, usage)
+    logger.info("Поток ответа OpenAI завершён (модель: %s)", model)
+
+
+def _stream_event_usage(event: dict | None) -> ResponseUsage | None:
+    return extract_stream_usage(event) if event is not None else None
+
+
+def _stream_event_text(event: dict | None) -> str:
+    if event is None:
+        return ""
+    error = extract_stream_error(event)
+    if error is not None:
+        logger.error("OpenAI прервал генерацию: %s", error)
+        raise OpenAIError(f"Ошибка OpenAI: {error}")
+    return extract_stream_delta(event)
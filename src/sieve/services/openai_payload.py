@@ -2,36 +2,87 @@
 
 from __future__ import annotations
 
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
-from src.sieve.core.prompts import OPENAI_SYSTEM_PROMPT, build_user_prompt
+from src.sieve.core.prompts import SYSTEM_PROMPT_PREFIX, build_user_prompt
 
+STREAM_TEXT_DELTA_EVENT = "response.output_text.delta"
+STREAM_COMPLETED_EVENT = "response.completed"
+STREAM_ERROR_EVENTS = {"error", "response.failed"}
 
-def build_responses_payload(query: str, sources_block: str, model: str) -> dict[str, Any]:
-    """Construct the request payload sent to the OpenAI Responses endpoint."""
-    return {
-        "model": model,
-        "input": [
-            {
-                "role": "system",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": OPENAI_SYSTEM_PROMPT,
-                    }
-                ],
-            },
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": [{"type": "input_text", "text": SYSTEM_PROMPT_PREFIX}],
+}
+
+
+@lru_cache(maxsize=64)
+def _payload_skeleton(model: str, stream: bool, prompt_cache_key: str) -> dict[str, Any]:
+    skeleton: dict[str, Any] = {"model": model, "input": (_SYSTEM_MESSAGE,)}
+    if stream:
+        skeleton["stream"] = True
+    if prompt_cache_key:
+        skeleton["prompt_cache_key"] = prompt_cache_key
+    return skeleton
+
+
+def prebuild_payload_skeletons(models: Iterable[str], prompt_cache_key: str = "") -> None:
+    """Build the static part of the payload for every configured model up front."""
+    for model in models:
+        for stream in (False, True):
+            _payload_skeleton(model, stream, prompt_cache_key)
+
+
+def build_responses_payload(
+    query: str,
+    sources_block: str,
+    model: str,
+    stream: bool = False,
+    prompt_cache_key: str = "",
+) -> dict[str, Any]:
+    """Construct the request payload sent to the OpenAI Responses endpoint.
+
+    The static prefix (model, system prompt and instructions) comes from a
+    shared per-model skeleton, so only the user message is built per call.
+    The returned payload shares the skeleton's nested objects: do not mutate it.
+    """
+    skeleton = _payload_skeleton(model, stream, prompt_cache_key)
+    user_message = {
+        "role": "user",
+        "content": [
             {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": build_user_prompt(query=query, sources_block=sources_block),
-                    }
-                ],
-            },
+                "type": "input_text",
+                "text": build_user_prompt(query=query, sources_block=sources_block),
+            }
         ],
     }
+    return {**skeleton, "input": [*skeleton["input"], user_message]}
+
+
+@dataclass(frozen=True)
+class ResponseUsage:
+    """Token counts reported by the Responses API; ``cached_tokens`` hit the prompt cache."""
+
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+
+
+def extract_usage(output_payload: dict[str, Any]) -> ResponseUsage | None:
+    """Read the ``usage`` block of a response, if present."""
+    usage = output_payload.get("usage")
+    if not isinstance(usage, dict):
+        return None
+    details = usage.get("input_tokens_details") or {}
+    return ResponseUsage(
+        input_tokens=int(usage.get("input_tokens") or 0),
+        cached_tokens=int(details.get("cached_tokens") or 0),
+        output_tokens=int(usage.get("output_tokens") or 0),
+    )
 
 
 def extract_answer_chunks(output_payload: dict[str, Any]) -> list[str]:
@@ -46,3 +97,60 @@ def extract_answer_chunks(output_payload: dict[str, Any]) -> list[str]:
                 if text:
                     chunks.append(text)
     return chunks
+
+
+class ResponseStreamParser:
+    """Incremental counterpart of :func:`extract_answer_chunks` for streamed output.
+
+    Feed Server-Sent Event lines as they arrive; each completed event is
+    returned as the decoded JSON object carried in its ``data`` field.
+    """
+
+    def __init__(self) -> None:
+        self._data_lines: list[str] = []
+
+    def feed_line(self, line: str) -> dict[str, Any] | None:
+        line = line.rstrip("\r")
+        if not line:
+            return self.flush()
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data_lines.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> dict[str, Any] | None:
+        """Dispatch a buffered event, e.g. when the stream ends without a blank line."""
+        if not self._data_lines:
+            return None
+        raw = "\n".join(self._data_lines)
+        self._data_lines.clear()
+        if raw == "[DONE]":
+            return None
+        return json.loads(raw)
+
+
+def extract_stream_delta(event: dict[str, Any]) -> str:
+    """Return the text carried by a streamed output delta event, if any."""
+    if event.get("type") != STREAM_TEXT_DELTA_EVENT:
+        return ""
+    return event.get("delta", "")
+
+
+def extract_stream_usage(event: dict[str, Any]) -> ResponseUsage | None:
+    """Return the usage carried by the final ``response.completed`` event, if any."""
+    if event.get("type") != STREAM_COMPLETED_EVENT:
+        return None
+    return extract_usage(event.get("response") or {})
+
+
+def extract_stream_error(event: dict[str, Any]) -> str | None:
+    """Return the error message of a streamed failure event, if any."""
+    event_type = event.get("type")
+    if event_type not in STREAM_ERROR_EVENTS:
+        return None
+    if event_type == "error":
+        return event.get("message") or "unknown error"
+    error = (event.get("response") or {}).get("error") or {}
+    return error.get("message") or "response failed"
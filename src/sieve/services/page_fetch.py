@@ -0,0 +1,364 @@
+"""Optional enrichment of top search results with text fetched from their pages.
+
+Pages are fetched concurrently over the shared pool, at most a few at a time
+per host, reading no more than a fixed number of bytes. The whole stage has a
+deadline: pages that are not ready by then keep their Google snippet, so
+enrichment never delays the answer by more than that budget. Extracted text is
+cached by URL and revalidated with ``If-None-Match`` once it goes stale.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import ipaddress
+import re
+import socket
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from src.sieve.config import Settings
+from src.sieve.core.constants import PAGE_FETCH_USER_AGENT
+from src.sieve.core.logging import get_logger
+from src.sieve.services.cache import TTLCache
+from src.sieve.services.deadline import remaining_timeout
+from src.sieve.services.google import SearchResult, canonical_url
+from src.sieve.services.http_clients import UpstreamClients, upstream_client
+from src.sieve.services.metrics import PAGE_FETCHES
+
+logger = get_logger(__name__)
+
+_MAX_REDIRECTS = 3
+_TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+_MIN_LINE_WORDS = 4
+
+_COMMENTS_RE = re.compile(r"<!--.*?-->", re.S)
+_DROPPED_BLOCKS_RE = re.compile(
+    r"<(script|style|noscript|svg|template|head|nav|header|footer|aside|form)\b[^>]*>.*?</\1\s*>",
+    re.I | re.S,
+)
+_MAIN_RE = re.compile(r"<(article|main)\b[^>]*>(.*?)</\1\s*>", re.I | re.S)
+_BREAK_TAGS_RE = re.compile(
+    r"<(?:br|/?p|/?div|/?li|/?h[1-6]|/?tr|/?section|/?article|/?blockquote|/?pre)\b[^>]*>",
+    re.I,
+)
+_TAGS_RE = re.compile(r"<[^>]*>")
+_SPACES_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+# URL parsers treat a host whose last label is a number as an IPv4 address in
+# decimal, octal or hex form ("2130706433", "127.1", "0x7f000001").
+_NUMERIC_LABEL_RE = re.compile(r"\d+|0x[0-9a-f]*", re.I)
+
+Resolver = Callable[[str, int], Awaitable[list[str]]]
+
+
+def extract_text(markup: str) -> str:
+    """Turn HTML into plain text paragraphs, skipping navigation and boilerplate.
+
+    Regex based rather than a full parser: it only has to be good enough for a
+    prompt, and it is several times faster on large pages.
+    """
+    markup = _DROPPED_BLOCKS_RE.sub(" ", _COMMENTS_RE.sub(" ", markup))
+    main = [match.group(2) for match in _MAIN_RE.finditer(markup)]
+    if main:
+        markup = max(main, key=len)
+    text = html.unescape(_TAGS_RE.sub(" ", _BREAK_TAGS_RE.sub("\n", markup)))
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if len(line.split()) >= _MIN_LINE_WORDS)
+
+
+def excerpt(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    head, space, _ = text[:max_chars].rpartition(" ")
+    return (head if space else text[:max_chars]).rstrip() + "…"
+
+
+def is_fetchable_url(url: str, allow_private: bool = False) -> bool:
+    """Only plain http(s) URLs, and no loopback, private or numeric-form hosts.
+
+    Host names still have to resolve to public addresses, see ``PageFetcher``.
+    """
+    try:
+        parts = urlsplit(url)
+        host, _ = parts.hostname, parts.port  # both raise on malformed hosts
+    except ValueError:
+        return False
+    if parts.scheme not in {"http", "https"} or not host:
+        return False
+    if allow_private:
+        return True
+    if host == "localhost" or host.endswith(".localhost"):
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return not _NUMERIC_LABEL_RE.fullmatch(host.rstrip(".").rpartition(".")[2])
+    return address.is_global
+
+
+def is_global_address(address: str) -> bool:
+    try:
+        return ipaddress.ip_address(address.partition("%")[0]).is_global
+    except ValueError:
+        return False
+
+
+async def resolve_host(host: str, port: int) -> list[str]:
+    """Addresses ``host`` resolves to, looked up without blocking the loop."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    text: str
+    etag: str | None
+    fetched_at: float
+
+
+def _page_size(page: CachedPage) -> int:
+    return len(page.text) + 128
+
+
+class HostLimiter:
+    """Per-host concurrency caps; idle hosts are forgotten."""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = limit
+        self._hosts: dict[str, tuple[asyncio.Semaphore, list[int]]] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        if self._limit <= 0:
+            yield
+            return
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = (asyncio.Semaphore(self._limit), [0])
+        semaphore, users = entry
+        users[0] += 1
+        try:
+            async with semaphore:
+                yield
+        finally:
+            users[0] -= 1
+            if users[0] == 0:
+                del self._hosts[host]
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+class PageFetcher:
+    """Fetch and extract page text with a shared cache and per-host limits."""
+
+    def __init__(
+        self,
+        *,
+        cache: TTLCache[CachedPage] | None,
+        per_host: int,
+        max_bytes: int,
+        fresh_for: float,
+        allow_private: bool = False,
+        resolver: Resolver = resolve_host,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._cache = cache
+        self._hosts = HostLimiter(per_host)
+        self._max_bytes = max_bytes
+        self._fresh_for = fresh_for
+        self._allow_private = allow_private
+        self._resolve = resolver
+        self._clock = clock
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> str | None:
+        """Return the page text, or ``None`` if it cannot be used.
+
+        Never raises: a page that fails for any reason keeps its snippet.
+        """
+        try:
+            return await self._fetch(client, url)
+        except Exception as exc:  # noqa: BLE001 - one bad page must not fail the ask
+            logger.info("Не удалось загрузить страницу %s: %s", url, exc)
+            PAGE_FETCHES.labels("error").inc()
+            return None
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> str | None:
+        if not is_fetchable_url(url, self._allow_private):
+            PAGE_FETCHES.labels("skipped").inc()
+            return None
+        key = canonical_url(url)
+        cached = self._cache.get(key) if self._cache is not None else None
+        if cached is not None and self._clock() - cached.fetched_at < self._fresh_for:
+            PAGE_FETCHES.labels("cached").inc()
+            return cached.text
+
+        async with self._hosts.slot(urlsplit(url).hostname or ""):
+            page = await self._download(client, url, cached)
+        if page is None:
+            return None
+        if self._cache is not None:
+            self._cache.set(key, page)
+        return page.text
+
+    async def _resolves_publicly(self, url: str) -> bool:
+        """Whether every address of the URL's host is public; checked on each hop."""
+        if not is_fetchable_url(url, self._allow_private):
+            return False
+        if self._allow_private:
+            return True
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            addresses = await self._resolve(parts.hostname or "", port)
+        except OSError as exc:
+            logger.info("Не удалось разрешить адрес %s: %s", parts.hostname, exc)
+            return False
+        return bool(addresses) and all(is_global_address(address) for address in addresses)
+
+    async def _download(
+        self, client: httpx.AsyncClient, url: str, cached: CachedPage | None
+    ) -> CachedPage | None:
+        headers = {"User-Agent": PAGE_FETCH_USER_AGENT, "Accept": "text/html,text/plain;q=0.8"}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        for _ in range(_MAX_REDIRECTS + 1):
+            if not await self._resolves_publicly(url):
+                PAGE_FETCHES.labels("skipped").inc()
+                return None
+            async with client.stream("GET", url, headers=headers) as response:
+                # httpx counts 304 as a redirect, so check it first.
+                if response.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+                    PAGE_FETCHES.labels("revalidated").inc()
+                    return replace(cached, fetched_at=self._clock())
+                if response.is_redirect and "location" in response.headers:
+                    url = urljoin(url, response.headers["location"])
+                    continue
+                content_type = response.headers.get("content-type", "text/html")
+                if response.status_code != httpx.codes.OK or not content_type.startswith(
+                    _TEXT_CONTENT_TYPES
+                ):
+                    break
+                body = await self._read_capped(response)
+                try:
+                    markup = body.decode(response.charset_encoding or "utf-8", errors="replace")
+                except LookupError:
+                    markup = body.decode("utf-8", errors="replace")
+                if "html" in content_type:
+                    # Regexes over a few hundred KB would stall every other request.
+                    text = await asyncio.to_thread(extract_text, markup)
+                else:
+                    text = markup.strip()
+                PAGE_FETCHES.labels("ok").inc()
+                return CachedPage(
+                    text=text,
+                    etag=response.headers.get("etag"),
+                    fetched_at=self._clock(),
+                )
+        PAGE_FETCHES.labels("unusable").inc()
+        return None
+
+    async def _read_capped(self, response: httpx.Response) -> bytes:
+        chunks: list[bytes] = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= self._max_bytes:
+                break
+        return b"".join(chunks)[: self._max_bytes]
+
+    async def enrich(
+        self,
+        results: list[SearchResult],
+        client: httpx.AsyncClient,
+        *,
+        top_k: int,
+        deadline: float,
+        max_chars: int,
+    ) -> list[SearchResult]:
+        """Attach page text to the first ``top_k`` results that load within ``deadline``."""
+        tasks = {
+            asyncio.create_task(self.fetch(client, result.url)): position
+            for position, result in enumerate(results[:top_k])
+        }
+        if not tasks:
+            return results
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            PAGE_FETCHES.labels("timeout").inc(len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        enriched = list(results)
+        for task in done:
+            text = task.result() if task.exception() is None else None
+            if text:
+                position = tasks[task]
+                enriched[position] = replace(results[position], content=excerpt(text, max_chars))
+        return enriched
+
+
+@lru_cache(maxsize=4)
+def _shared_page_fetcher(
+    per_host: int,
+    max_bytes: int,
+    fresh_for: float,
+    max_age: float,
+    cache_entries: int,
+    cache_bytes: int,
+    allow_private: bool,
+) -> PageFetcher:
+    cache = None
+    if cache_entries > 0:
+        cache = TTLCache(
+            max_entries=cache_entries, max_bytes=cache_bytes, ttl=max_age, sizeof=_page_size
+        )
+    return PageFetcher(
+        cache=cache,
+        per_host=per_host,
+        max_bytes=max_bytes,
+        fresh_for=fresh_for,
+        allow_private=allow_private,
+    )
+
+
+def get_page_fetcher(settings: Settings) -> PageFetcher:
+    return _shared_page_fetcher(
+        settings.page_fetch_per_host,
+        settings.page_fetch_max_bytes,
+        settings.page_cache_ttl,
+        max(settings.page_cache_max_age, settings.page_cache_ttl),
+        settings.page_cache_max_entries,
+        settings.page_cache_max_bytes,
+        settings.page_fetch_allow_private,
+    )
+
+
+async def enrich_results(
+    results: list[SearchResult],
+    settings: Settings,
+    clients: UpstreamClients | None = None,
+) -> list[SearchResult]:
+    """Return ``results`` with page text attached where it arrived in time."""
+    if not settings.page_fetch_enabled or settings.page_fetch_top_k <= 0 or not results:
+        return results
+    fetcher = get_page_fetcher(settings)
+    async with upstream_client(
+        clients.pages if clients else None, timeout=settings.page_fetch_deadline
+    ) as http:
+        return await fetcher.enrich(
+            results,
+            http,
+            top_k=settings.page_fetch_top_k,
+            deadline=remaining_timeout(settings.page_fetch_deadline),
+            max_chars=settings.page_fetch_max_chars,
+        )
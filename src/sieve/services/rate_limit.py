@@ -0,0 +1,98 @@
+"""Per-client token-bucket rate limiting."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """``requests`` per ``window`` seconds on average, bursts up to ``burst``."""
+
+    requests: int
+    window: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.window
+
+    def header(self) -> str:
+        return f"{self.requests};w={math.ceil(self.window)};burst={self.burst}"
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by client, with O(1) work per request.
+
+    Buckets are kept in least-recently-used order. A bucket idle long enough
+    to have refilled completely is indistinguishable from a new one, so such
+    buckets are dropped from the cold end, and the total is capped at
+    ``max_keys``. Not thread-safe: it is meant to be used from the event loop.
+    """
+
+    def __init__(
+        self,
+        policy: RateLimitPolicy,
+        *,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy
+        self._capacity = float(max(1, policy.burst))
+        self._rate = policy.rate
+        self._refill_time = self._capacity / self._rate
+        self._max_keys = max_keys
+        self._clock = clock
+        # key -> [tokens, updated_at]
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+
+    def acquire(self, key: Hashable) -> RateLimitDecision:
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self._capacity, now]
+            self._buckets[key] = bucket
+        else:
+            bucket[0] = min(self._capacity, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        allowed = bucket[0] >= 1.0
+        if allowed:
+            bucket[0] -= 1.0
+        tokens = bucket[0]
+        self._evict(now)
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=int(self._capacity),
+            remaining=int(tokens),
+            reset=math.ceil((self._capacity - tokens) / self._rate),
+            retry_after=0 if allowed else math.ceil((1.0 - tokens) / self._rate),
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while len(buckets) > self._max_keys:
+            buckets.popitem(last=False)
+        while buckets:
+            _, (tokens, updated_at) = next(iter(buckets.items()))
+            if tokens + (now - updated_at) * self._rate < self._capacity:
+                break
+            buckets.popitem(last=False)
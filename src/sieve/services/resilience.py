@@ -0,0 +1,345 @@
+"""Retries with backoff, a shared retry budget and circuit breakers for upstreams."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+import httpx
+
+from src.sieve.config import Settings
+from src.sieve.core.logging import get_logger
+from src.sieve.services.deadline import deadline_capped, deadline_expired, remaining_timeout
+from src.sieve.services.metrics import UPSTREAM_RESPONSES
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+_RETRY_BUDGET_WINDOW = 10.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+    def __init__(self, upstream: str, retry_after: float) -> None:
+        super().__init__(f"Circuit breaker for {upstream} is open")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait according to a ``Retry-After`` header (delta or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail fast for ``reset_timeout`` seconds. Then a single probe call is let
+    through (half-open): its success closes the circuit, its failure opens it
+    again. A probe that never reports back is replaced after another timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_started_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def retry_after(self) -> float:
+        """Seconds until the next call may be attempted (0 when closed)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            started = self._probe_started_at or self._opened_at
+            return max(0.0, started + self._reset_timeout - self._clock())
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._state()
+            if state == CIRCUIT_CLOSED:
+                return
+            if state == CIRCUIT_HALF_OPEN:
+                self._probe_started_at = self._clock()
+                logger.info("Пробный запрос к %s после размыкания цепи", self.name)
+                return
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Цепь %s снова замкнута", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        if self._failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self._failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        "Цепь %s разомкнута после %s ошибок подряд", self.name, self._failures
+                    )
+                self._opened_at = self._clock()
+                self._probe_started_at = None
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return CIRCUIT_CLOSED
+        started = self._probe_started_at or self._opened_at
+        if self._clock() - started >= self._reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests so they cannot amplify an outage.
+
+    Within a sliding window, retries are allowed while their count stays
+    below ``min_retries + ratio * requests``.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float,
+        min_retries: int,
+        window: float = _RETRY_BUDGET_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ratio = ratio
+        self._min_retries = min_retries
+        self._window = window
+        self._clock = clock
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            if len(self._retries) >= self._min_retries + self._ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self._window
+        for samples in (self._requests, self._retries):
+            while samples and samples[0] <= horizon:
+                samples.popleft()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int
+    base_delay: float
+    max_delay: float
+
+
+def ran_out_of_time(exc: Exception | None, deadline_bound: bool) -> bool:
+    """Whether a network error is due to the request deadline, not the upstream."""
+    return deadline_expired() or (deadline_bound and isinstance(exc, httpx.TimeoutException))
+
+
+class UpstreamGuard:
+    """Applies the circuit breaker, retry policy and retry budget to one upstream.
+
+    :meth:`send` wraps a whole request; streaming callers that cannot replay
+    a request after reading from it drive :meth:`before_attempt`,
+    :meth:`on_response` and :meth:`on_transport_error` themselves.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        policy: RetryPolicy,
+        budget: RetryBudget,
+        breaker: CircuitBreaker,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.name = name
+        self.breaker = breaker
+        self._policy = policy
+        self._budget = budget
+        self._rng = rng
+
+    def before_attempt(self, attempt: int) -> None:
+        """Fail fast when the circuit is open; count first attempts for the budget."""
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            UPSTREAM_RESPONSES.labels(self.name, "circuit_open").inc()
+            raise
+        if attempt == 0:
+            self._budget.record_request()
+
+    def on_response(self, response: httpx.Response, attempt: int) -> float | None:
+        """Record the outcome; return a delay if the request should be retried."""
+        UPSTREAM_RESPONSES.labels(self.name, str(response.status_code)).inc()
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            self.breaker.record_success()
+            return None
+        self.breaker.record_failure()
+        return self._retry_delay(
+            attempt, parse_retry_after(response.headers.get("Retry-After"))
+        )
+
+    def on_transport_error(
+        self, attempt: int, exc: Exception | None = None, deadline_bound: bool = False
+    ) -> float | None:
+        """Record a network error; return a delay if the request should be retried.
+
+        ``deadline_bound`` tells that the attempt's timeout was shortened by
+        the request deadline. Running out of request time says nothing about
+        the upstream, so it neither counts towards the breaker nor retries.
+        """
+        UPSTREAM_RESPONSES.labels(self.name, "error").inc()
+        if ran_out_of_time(exc, deadline_bound):
+            logger.info("Запрос к %s не уложился в дедлайн запроса", self.name)
+            return None
+        self.breaker.record_failure()
+        return self._retry_delay(attempt, None)
+
+    async def send(
+        self,
+        request: Callable[[], Awaitable[httpx.Response]],
+        *,
+        timeout: float | None = None,
+    ) -> httpx.Response:
+        """Run ``request`` with retries; the last response or error is returned/raised.
+
+        ``timeout`` is the upstream's own timeout that ``request`` caps by the
+        request deadline, used to tell deadline timeouts from slow upstreams.
+        """
+        attempt = 0
+        while True:
+            self.before_attempt(attempt)
+            deadline_bound = timeout is not None and deadline_capped(timeout)
+            try:
+                response = await request()
+            except httpx.TransportError as exc:
+                delay = self.on_transport_error(attempt, exc, deadline_bound)
+                if delay is None:
+                    raise
+                logger.warning(
+                    "Сетевая ошибка %s (%s), повтор через %.2f с", self.name, exc, delay
+                )
+            else:
+                delay = self.on_response(response, attempt)
+                if delay is None:
+                    return response
+                logger.warning(
+                    "%s вернул статус %s, повтор через %.2f с",
+                    self.name,
+                    response.status_code,
+                    delay,
+                )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: float | None) -> float | None:
+        if attempt + 1 >= self._policy.max_attempts:
+            return None
+        if retry_after is not None and retry_after > self._policy.max_delay:
+            logger.info("%s просит подождать %.1f с, повтор не выполняется", self.name, retry_after)
+            return None
+        if retry_after is None:
+            # Full jitter keeps synchronised clients from retrying in lockstep.
+            ceiling = min(self._policy.max_delay, self._policy.base_delay * 2**attempt)
+            retry_after = self._rng() * ceiling
+        if deadline_expired() or remaining_timeout(retry_after) < retry_after:
+            logger.info("Повтор запроса к %s не уложится в дедлайн запроса", self.name)
+            return None
+        if not self._budget.try_acquire():
+            logger.warning("Бюджет повторов исчерпан, запрос к %s не повторяется", self.name)
+            return None
+        return retry_after
+
+
+@lru_cache(maxsize=1)
+def _shared_retry_budget(ratio: float, min_retries: int) -> RetryBudget:
+    return RetryBudget(ratio=ratio, min_retries=min_retries)
+
+
+@lru_cache(maxsize=8)
+def _shared_circuit_breaker(
+    upstream: str, failure_threshold: int, reset_timeout: float
+) -> CircuitBreaker:
+    return CircuitBreaker(
+        upstream, failure_threshold=failure_threshold, reset_timeout=reset_timeout
+    )
+
+
+def get_circuit_breaker(upstream: str, settings: Settings) -> CircuitBreaker:
+    return _shared_circuit_breaker(
+        upstream,
+        settings.circuit_breaker_failure_threshold,
+        settings.circuit_breaker_reset_timeout,
+    )
+
+
+def get_upstream_guard(upstream: str, settings: Settings) -> UpstreamGuard:
+    """Return a guard sharing the process-wide budget and the upstream's breaker."""
+    return UpstreamGuard(
+        upstream,
+        policy=RetryPolicy(
+            max_attempts=max(1, settings.retry_max_attempts),
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+        ),
+        budget=_shared_retry_budget(settings.retry_budget_ratio, settings.retry_budget_min_retries),
+        breaker=get_circuit_breaker(upstream, settings),
+    )
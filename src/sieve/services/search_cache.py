@@ -0,0 +1,53 @@
+"""Cache of web search results keyed by normalized query."""
+
+from __future__ import annotations
+
+import unicodedata
+from functools import lru_cache
+
+from src.sieve.config import Settings
+from src.sieve.services.cache import TTLCache
+from src.sieve.services.google import SearchResult, effective_num
+
+SearchCacheKey = tuple[str, int, tuple[str, ...], str]
+
+_TRAILING_PUNCTUATION = " ?!.,;:"
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, Unicode forms and whitespace so near-identical queries share a key."""
+    folded = unicodedata.normalize("NFKC", query).casefold()
+    return " ".join(folded.split()).strip(_TRAILING_PUNCTUATION)
+
+
+def search_cache_key(query: str, top_n: int, settings: Settings) -> SearchCacheKey:
+    return (
+        normalize_query(query),
+        effective_num(top_n, settings),
+        tuple(settings.search_providers),
+        settings.search_policy,
+    )
+
+
+def _results_size(results: list[SearchResult]) -> int:
+    return sum(len(item.title) + len(item.url) + len(item.snippet) for item in results) + 64
+
+
+@lru_cache(maxsize=4)
+def _shared_search_cache(
+    max_entries: int, max_bytes: int, ttl: float
+) -> TTLCache[list[SearchResult]]:
+    return TTLCache(
+        max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=_results_size
+    )
+
+
+def get_search_cache(settings: Settings) -> TTLCache[list[SearchResult]] | None:
+    """Return the process-wide search cache, or ``None`` when caching is disabled."""
+    if not settings.search_cache_enabled or settings.search_cache_max_entries <= 0:
+        return None
+    return _shared_search_cache(
+        settings.search_cache_max_entries,
+        settings.search_cache_max_bytes,
+        settings.search_cache_ttl,
+    )
@@ -0,0 +1,348 @@
+"""Pluggable web search providers and hedged fan-out across them."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Protocol
+from urllib.parse import quote_plus
+
+from src.sieve.config import Settings
+from src.sieve.core.constants import (
+    SEARCH_POLICY_MERGE,
+    SEARCH_PROVIDER_GOOGLE,
+    SEARCH_PROVIDER_STATIC,
+)
+from src.sieve.core.logging import get_logger
+from src.sieve.services.concurrency import GOOGLE_UPSTREAM, upstream_slot
+from src.sieve.services.exceptions import OverloadedError, SearchError
+from src.sieve.services.google import (
+    SearchResult,
+    canonical_url,
+    effective_num,
+    search_google,
+)
+from src.sieve.services.http_clients import UpstreamClients
+
+logger = get_logger(__name__)
+
+
+class SearchProvider(Protocol):
+    name: str
+
+    def is_available(self, settings: Settings) -> bool:
+        """Whether the provider is configured well enough to be queried."""
+
+    async def search(
+        self,
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None = None,
+    ) -> list[SearchResult]:
+        """Return ranked results or raise :class:`SearchError`."""
+
+
+class GoogleSearchProvider:
+    name = SEARCH_PROVIDER_GOOGLE
+
+    def is_available(self, settings: Settings) -> bool:
+        return bool(settings.google_api_key and settings.google_cse_id)
+
+    async def search(
+        self,
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None = None,
+    ) -> list[SearchResult]:
+        # A saturated Google limiter is a search failure, not an overloaded
+        # ask: the caller answers without sources or hedges to another provider.
+        try:
+            async with upstream_slot(GOOGLE_UPSTREAM, settings):
+                return await search_google(
+                    query=query,
+                    top_n=top_n,
+                    settings=settings,
+                    client=clients.google if clients else None,
+                )
+        except OverloadedError as exc:
+            raise SearchError("Google перегружен: нет свободных слотов") from exc
+
+
+class StaticSearchProvider:
+    """Local stand-in returning canned results, injected by tests and benchmarks.
+
+    It is deliberately not selectable through ``SEARCH_PROVIDERS``.
+
+    Without explicit ``results`` it synthesises deterministic placeholder
+    results from the query. ``delay`` and ``error`` simulate slow or failing
+    upstreams.
+    """
+
+    def __init__(
+        self,
+        results: Sequence[SearchResult] | None = None,
+        *,
+        name: str = SEARCH_PROVIDER_STATIC,
+        delay: float = 0.0,
+        error: SearchError | None = None,
+    ) -> None:
+        self.name = name
+        self._results = list(results) if results is not None else None
+        self._delay = delay
+        self._error = error
+
+    def is_available(self, settings: Settings) -> bool:
+        return True
+
+    async def search(
+        self,
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None = None,
+    ) -> list[SearchResult]:
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+        limit = effective_num(top_n, settings)
+        if self._results is not None:
+            return self._results[:limit]
+        return [
+            SearchResult(
+                title=f"{query} — локальный результат {index}",
+                url=f"https://example.invalid/search?q={quote_plus(query)}&n={index}",
+                snippet=f"Заглушка поиска для запроса «{query}».",
+                index=index,
+            )
+            for index in range(1, limit + 1)
+        ]
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one provider."""
+
+    def __init__(self, window: int) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        position = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[position]
+
+
+class FanOutSearchProvider:
+    """Query several providers so one slow upstream does not define tail latency.
+
+    ``first`` policy: start the primary provider and fire the next one as a
+    hedge once the in-flight provider exceeds its observed latency
+    percentile (or immediately when it fails); the first successful answer
+    wins and the rest are cancelled. ``merge`` policy: query every provider
+    concurrently and interleave their results by rank, de-duplicated by URL.
+    """
+
+    name = "fanout"
+
+    def __init__(
+        self,
+        providers: Sequence[SearchProvider],
+        *,
+        policy: str,
+        hedge_enabled: bool,
+        hedge_percentile: float,
+        hedge_min_delay: float,
+        latency_window: int = 200,
+    ) -> None:
+        self._providers = list(providers)
+        self._policy = policy
+        self._hedge_enabled = hedge_enabled
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_delay = hedge_min_delay
+        self._latency = {provider.name: LatencyTracker(latency_window) for provider in providers}
+
+    def is_available(self, settings: Settings) -> bool:
+        return any(provider.is_available(settings) for provider in self._providers)
+
+    def hedge_delay(self, provider: SearchProvider) -> float | None:
+        """Seconds to wait on ``provider`` before firing a backup, ``None`` to never hedge."""
+        if not self._hedge_enabled:
+            return None
+        observed = self._latency[provider.name].percentile(self._hedge_percentile)
+        if observed is None:
+            return self._hedge_min_delay
+        return max(self._hedge_min_delay, observed)
+
+    async def search(
+        self,
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None = None,
+    ) -> list[SearchResult]:
+        providers = [provider for provider in self._providers if provider.is_available(settings)]
+        if not providers:
+            raise SearchError("Ни один поисковый провайдер не настроен")
+        if self._policy == SEARCH_POLICY_MERGE:
+            return await self._merge(providers, query, top_n, settings, clients)
+        return await self._first_wins(providers, query, top_n, settings, clients)
+
+    async def _timed_search(
+        self,
+        provider: SearchProvider,
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None,
+    ) -> list[SearchResult]:
+        started = time.perf_counter()
+        results = await provider.search(query, top_n, settings, clients)
+        self._latency[provider.name].record(time.perf_counter() - started)
+        return results
+
+    async def _first_wins(
+        self,
+        providers: list[SearchProvider],
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None,
+    ) -> list[SearchResult]:
+        queue = list(providers)
+        pending: dict[asyncio.Task[list[SearchResult]], SearchProvider] = {}
+        errors: list[str] = []
+
+        def launch() -> SearchProvider | None:
+            if not queue:
+                return None
+            provider = queue.pop(0)
+            task = asyncio.create_task(
+                self._timed_search(provider, query, top_n, settings, clients)
+            )
+            pending[task] = provider
+            return provider
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay(latest) if queue and latest else None
+                slow = latest
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    latest = launch()
+                    logger.info(
+                        "Провайдер поиска %s медлит, запускаем резервный %s",
+                        slow.name,
+                        latest.name,
+                    )
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except SearchError as exc:
+                        logger.warning("Провайдер поиска %s недоступен: %s", provider.name, exc)
+                        errors.append(f"{provider.name}: {exc}")
+                        latest = launch() or latest
+        finally:
+            for task in pending:
+                task.cancel()
+        raise SearchError("; ".join(errors) or "Поиск недоступен")
+
+    async def _merge(
+        self,
+        providers: list[SearchProvider],
+        query: str,
+        top_n: int,
+        settings: Settings,
+        clients: UpstreamClients | None,
+    ) -> list[SearchResult]:
+        outcomes = await asyncio.gather(
+            *(self._timed_search(p, query, top_n, settings, clients) for p in providers),
+            return_exceptions=True,
+        )
+        ranked: list[list[SearchResult]] = []
+        errors: list[str] = []
+        for provider, outcome in zip(providers, outcomes):
+            if isinstance(outcome, SearchError):
+                logger.warning("Провайдер поиска %s недоступен: %s", provider.name, outcome)
+                errors.append(f"{provider.name}: {outcome}")
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                ranked.append(outcome)
+        if not ranked:
+            raise SearchError("; ".join(errors))
+
+        limit = effective_num(top_n, settings)
+        merged: list[SearchResult] = []
+        seen: set[str] = set()
+        for rank in range(max(len(results) for results in ranked)):
+            for results in ranked:
+                if rank >= len(results):
+                    continue
+                item = results[rank]
+                key = canonical_url(item.url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(
+                    SearchResult(
+                        title=item.title,
+                        url=item.url,
+                        snippet=item.snippet,
+                        index=len(merged) + 1,
+                    )
+                )
+                if len(merged) == limit:
+                    return merged
+        return merged
+
+
+def _create_provider(name: str) -> SearchProvider:
+    if name == SEARCH_PROVIDER_GOOGLE:
+        return GoogleSearchProvider()
+    raise ValueError(f"Unknown search provider: {name}")
+
+
+@lru_cache(maxsize=4)
+def _shared_search_provider(
+    names: tuple[str, ...],
+    policy: str,
+    hedge_enabled: bool,
+    hedge_percentile: float,
+    hedge_min_delay: float,
+) -> SearchProvider:
+    providers = [_create_provider(name) for name in dict.fromkeys(names)]
+    if len(providers) == 1:
+        return providers[0]
+    return FanOutSearchProvider(
+        providers,
+        policy=policy,
+        hedge_enabled=hedge_enabled,
+        hedge_percentile=hedge_percentile,
+        hedge_min_delay=hedge_min_delay,
+    )
+
+
+def get_search_provider(settings: Settings) -> SearchProvider:
+    """Return the process-wide provider built from the configured provider list."""
+    return _shared_search_provider(
+        tuple(settings.search_providers),
+        settings.search_policy,
+        settings.search_hedge_enabled,
+        settings.search_hedge_percentile,
+        settings.search_hedge_min_delay,
+    )
@@ -0,0 +1,147 @@
+"""Fit search results into the prompt's token budget.
+
+Sources are packed once per ask: near-duplicate snippets are dropped, the rest
+are added in rank order until the per-model budget is spent (the last one may
+be trimmed), and the kept sources are renumbered. The rendered block is reused
+for the prompt and the answer cache key. Results enriched with page text are
+packed by that text, while the citations footer keeps showing their snippets.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+
+from src.sieve.config import Settings
+from src.sieve.core.constants import CITATIONS_HEADER, NO_SEARCH_RESULTS_FALLBACK
+from src.sieve.core.logging import get_logger
+from src.sieve.services.google import SearchResult
+
+logger = get_logger(__name__)
+
+# Roughly four UTF-8 bytes per token: about right for English and
+# conservative for Cyrillic, which takes two bytes per letter.
+_BYTES_PER_TOKEN = 4
+# Separator between rendered sources ("\n\n").
+_SEPARATOR_TOKENS = 1
+# A source trimmed below this many snippet tokens is not worth including.
+_MIN_SNIPPET_TOKENS = 24
+_SHINGLE_WORDS = 3
+_ELLIPSIS = "…"
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound estimate of the number of model tokens in ``text``."""
+    return math.ceil(len(text.encode("utf-8")) / _BYTES_PER_TOKEN)
+
+
+def _body(result: SearchResult) -> str:
+    return result.content or result.snippet
+
+
+def _render(result: SearchResult, body: str) -> str:
+    return f"[{result.index}] {result.title}\n{result.url}\n{body}"
+
+
+def render_source(result: SearchResult) -> str:
+    return _render(result, _body(result))
+
+
+@dataclass(frozen=True)
+class PackedSources:
+    """Sources as presented to the model, numbered from 1."""
+
+    results: list[SearchResult] = field(default_factory=list)
+    block: str = NO_SEARCH_RESULTS_FALLBACK
+    tokens: int = 0
+    dropped: int = 0
+
+    @property
+    def footer(self) -> str:
+        cited = "\n\n".join(_render(result, result.snippet) for result in self.results)
+        return f"{CITATIONS_HEADER}\n{cited or self.block}".strip()
+
+
+def sources_token_budget(model: str, settings: Settings) -> int:
+    """Budget for the sources block of ``model``; 0 means unlimited."""
+    return settings.sources_token_budgets.get(model, settings.sources_token_budget)
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < _SHINGLE_WORDS:
+        return {tuple(words)} if words else set()
+    last = len(words) - _SHINGLE_WORDS
+    return {tuple(words[start : start + _SHINGLE_WORDS]) for start in range(last + 1)}
+
+
+def _trim_to_tokens(text: str, tokens: int) -> str:
+    limit = tokens * _BYTES_PER_TOKEN - len(_ELLIPSIS.encode("utf-8"))
+    encoded = text.encode("utf-8")
+    if len(encoded) <= tokens * _BYTES_PER_TOKEN:
+        return text
+    cut = encoded[: max(limit, 0)].decode("utf-8", errors="ignore")
+    head, space, _ = cut.rpartition(" ")
+    return (head if space else cut).rstrip(" ,;:.") + _ELLIPSIS
+
+
+def pack_sources(
+    results: Sequence[SearchResult], model: str, settings: Settings
+) -> PackedSources:
+    """Select, trim and renumber ``results`` to fit the model's token budget."""
+    budget = sources_token_budget(model, settings)
+    threshold = settings.sources_dedup_threshold
+    seen: set[tuple[str, ...]] = set()
+    kept: list[SearchResult] = []
+    rendered: list[str] = []
+    used = 0
+
+    for result in results:
+        body = _body(result)
+        shingles = _shingles(body)
+        if threshold < 1 and shingles and len(shingles & seen) >= threshold * len(shingles):
+            continue
+
+        candidate = replace(result, index=len(kept) + 1)
+        separator = _SEPARATOR_TOKENS if kept else 0
+        cost = separator + estimate_tokens(render_source(candidate))
+        if budget > 0 and used + cost > budget:
+            # Trim the text of the first source that does not fit, then stop.
+            room = budget - used - (cost - estimate_tokens(body))
+            if room >= _MIN_SNIPPET_TOKENS:
+                trimmed = _trim_to_tokens(body, room)
+                if result.content:
+                    candidate.content = trimmed
+                else:
+                    candidate.snippet = trimmed
+                text = render_source(candidate)
+                cost = separator + estimate_tokens(text)
+                if used + cost <= budget:
+                    kept.append(candidate)
+                    rendered.append(text)
+                    used += cost
+            break
+
+        seen |= shingles
+        kept.append(candidate)
+        rendered.append(render_source(candidate))
+        used += cost
+
+    packed = PackedSources(
+        results=kept,
+        block="\n\n".join(rendered) or NO_SEARCH_RESULTS_FALLBACK,
+        tokens=used,
+        dropped=len(results) - len(kept),
+    )
+    if packed.dropped:
+        logger.info(
+            "Источники упакованы: %s из %s (~%s токенов, модель: %s)",
+            len(kept),
+            len(results),
+            used,
+            model,
+        )
+    return packed
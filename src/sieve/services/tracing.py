@@ -0,0 +1,74 @@
+"""Per-request stage timing propagated through contextvars."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+
+@dataclass
+class RequestTrace:
+    """Stage durations recorded while serving one HTTP request."""
+
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    spans: list[tuple[str, float]] = field(default_factory=list)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.spans.append((name, seconds))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def timings(self) -> dict[str, float]:
+        """Milliseconds per stage; repeated stages are summed."""
+        totals: dict[str, float] = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return {name: round(seconds * 1000, 1) for name, seconds in totals.items()}
+
+    def server_timing(self) -> str:
+        """Render the ``Server-Timing`` header value, ending with the total so far."""
+        metrics = [f"{name};dur={ms}" for name, ms in self.timings().items()]
+        metrics.append(f"total;dur={round(self.elapsed() * 1000, 1)}")
+        return ", ".join(metrics)
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("sieve_request_trace", default=None)
+
+
+def new_request_id() -> str:
+    return uuid4().hex
+
+
+def current_trace() -> RequestTrace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(request_id: str) -> Iterator[RequestTrace]:
+    """Collect spans recorded by code running in this context (and tasks it spawns)."""
+    trace = RequestTrace(request_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as stage ``name`` of the current request, if one is traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(name, time.perf_counter() - started)
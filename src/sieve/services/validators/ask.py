@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from src.sieve.config import Settings
+from src.sieve.core.constants import MODEL_AUTO
 from src.sieve.core.logging import get_logger
 from src.sieve.models.ask import AskRequest
 from src.sieve.services.exceptions import AskServiceError
@@ -19,6 +20,8 @@ def clean_query(payload: AskRequest) -> str:
 
 def resolve_model(payload: AskRequest, settings: Settings) -> str:
     model_name = (payload.model or settings.openai_model).strip()
+    if model_name == MODEL_AUTO and settings.openai_auto_enabled:
+        return model_name
     allowed_models = set(settings.openai_model_options) | {settings.openai_model}
     if model_name not in allowed_models:
         logger.warning("Получен недопустимый идентификатор модели: %s", model_name)
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from src.sieve.api.routers import ask as ask_router
+from src.sieve.models.ask import AskResponse
+from src.sieve.services.metrics import ASKS_CANCELLED
+
+
+def build_app():
+    app = FastAPI()
+    app.include_router(ask_router.router)
+    return app
+
+
+async def call(app, path, disconnect_after):
+    """Drive ``app`` directly so the client can disconnect mid-request."""
+    body = json.dumps({"query": "q"}).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.mark.anyio("asyncio")
+async def test_disconnect_cancels_the_ask(monkeypatch):
+    state = {"cancelled": False}
+
+    async def slow_ask(payload, settings, clients=None):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(ask_router, "process_ask_request", slow_ask)
+    before = ASKS_CANCELLED.labels("ask").value
+
+    sent = await call(build_app(), "/api/ask", disconnect_after=0.01)
+
+    assert state["cancelled"] is True
+    assert sent[0]["status"] == ask_router.CLIENT_CLOSED_REQUEST
+    assert ASKS_CANCELLED.labels("ask").value == before + 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_connected_client_gets_the_answer(monkeypatch):
+    async def fast_ask(payload, settings, clients=None):
+        return AskResponse(answer_markdown="answer", citations=[], search_used=False)
+
+    monkeypatch.setattr(ask_router, "process_ask_request", fast_ask)
+
+    sent = await call(build_app(), "/api/ask", disconnect_after=5)
+
+    assert sent[0]["status"] == 200
+    assert json.loads(sent[1]["body"])["answer_markdown"] == "answer"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_disconnect_closes_the_answer_stream(monkeypatch):
+    state = {"closed": False}
+
+    async def events():
+        try:
+            yield "delta", {"text": "partial"}
+            await asyncio.sleep(5)
+            yield "done", {}
+        finally:
+            state["closed"] = True
+
+    async def start_stream(payload, settings, clients=None):
+        return events()
+
+    monkeypatch.setattr(ask_router, "start_ask_stream", start_stream)
+    before = ASKS_CANCELLED.labels("stream").value
+
+    sent = await call(build_app(), "/api/ask/stream", disconnect_after=0.01)
+
+    assert state["closed"] is True
+    assert b"partial" in sent[1]["body"]
+    assert ASKS_CANCELLED.labels("stream").value == before + 1
@@ -0,0 +1,12 @@
+from fastapi.testclient import TestClient
+
+from src.sieve.api.main import build_app
+
+
+def test_load_status_reports_admission_queues():
+    with TestClient(build_app()) as client:
+        body = client.get("/health/load").json()
+
+    assert set(body) == {"ask", "google", "openai"}
+    assert body["ask"]["queued"] == 0
+    assert body["ask"]["in_flight"] == 0
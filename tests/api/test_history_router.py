@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.sieve.api.main import build_app
+from src.sieve.services import history
+from src.sieve.services.history import HistoryStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fresh = HistoryStore(max_size=10)
+    monkeypatch.setattr(history, "history_store", fresh)
+    return fresh
+
+
+@pytest.fixture
+def client(store):
+    with TestClient(build_app()) as test_client:
+        yield test_client
+
+
+def add(store, query):
+    return store.add_entry(
+        query=query,
+        top_n=1,
+        model="gpt",
+        answer_markdown="text",
+        message=None,
+        citations=[],
+        results=[],
+        search_used=False,
+    )
+
+
+def test_list_returns_304_while_history_is_unchanged(client, store):
+    add(store, "q")
+    first = client.get("/api/history")
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/history", headers={"If-None-Match": etag})
+    add(store, "another")
+    changed = client.get("/api/history", headers={"If-None-Match": etag})
+
+    assert first.json()["version"] == store.version - 1
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_minimal_delete_returns_only_version_and_id(client, store):
+    entry = add(store, "q")
+
+    response = client.delete(f"/api/history/{entry.id}", headers={"Prefer": "return=minimal"})
+
+    assert response.status_code == 200
+    assert response.json() == {"version": store.version, "deleted_id": str(entry.id)}
+    assert response.headers["preference-applied"] == "return=minimal"
+
+
+def test_delete_without_preference_returns_full_listing(client, store):
+    entry = add(store, "gone")
+    add(store, "kept")
+
+    response = client.delete(f"/api/history/{entry.id}")
+
+    assert [item["query"] for item in response.json()["items"]] == ["kept"]
+    assert client.delete(f"/api/history/{entry.id}").status_code == 404
+
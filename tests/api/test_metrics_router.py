@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.sieve.api.main import build_app
+from src.sieve.config import Settings
+from src.sieve.models.ask import AskRequest
+from src.sieve.services import ask_service, search_providers
+from src.sieve.services.google import SearchResult
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    async def fake_search(query, top_n, settings, client=None):
+        return [SearchResult(title="T", url="https://example.com", snippet="S", index=1)]
+
+    async def fake_generate(query, sources, settings, model, client=None):
+        return "answer", "resp"
+
+    monkeypatch.setattr(search_providers, "search_google", fake_search)
+    monkeypatch.setattr(ask_service, "generate_answer", fake_generate)
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: None)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_ask_stages_are_exposed_per_model(upstreams):
+    settings = Settings(google_api_key="k", google_cse_id="cx", openai_api_key="secret")
+    await ask_service.process_ask_request(AskRequest(query="q", model="gpt-4o"), settings)
+
+    with TestClient(build_app()) as client:
+        response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for stage in ("validation", "search", "generation", "history"):
+        assert f'sieve_ask_stage_duration_seconds_count{{stage="{stage}",model="gpt-4o"}}' in (
+            response.text
+        )
+    assert 'sieve_ask_requests_total{endpoint="ask",model="gpt-4o",outcome="ok"}' in response.text
+    assert 'sieve_cache_hit_ratio{cache="answer"}' in response.text
+    assert 'sieve_admission_queued{controller="ask"} 0' in response.text
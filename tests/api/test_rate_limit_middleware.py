@@ -0,0 +1,79 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.sieve.api.middleware import RateLimitMiddleware
+from src.sieve.services.rate_limit import RateLimitPolicy, TokenBucketLimiter
+
+
+def build_client(burst=2, key_header="X-API-Key"):
+    app = FastAPI()
+
+    @app.get("/api/history")
+    async def history():
+        return {"items": []}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    limiter = TokenBucketLimiter(
+        RateLimitPolicy(requests=1, window=60.0, burst=burst), max_keys=100
+    )
+    app.add_middleware(
+        RateLimitMiddleware, limiters={"history": limiter}, key_header=key_header
+    )
+    return TestClient(app)
+
+
+def test_requests_over_the_limit_get_429_with_headers():
+    client = build_client()
+
+    allowed = client.get("/api/history")
+    client.get("/api/history")
+    rejected = client.get("/api/history")
+
+    assert allowed.status_code == 200
+    assert allowed.headers["RateLimit-Limit"] == "2"
+    assert allowed.headers["RateLimit-Remaining"] == "1"
+    assert allowed.headers["RateLimit-Policy"] == "1;w=60;burst=2"
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "60"
+    assert rejected.json()["detail"]
+
+
+def test_api_keys_get_separate_buckets_and_other_routes_are_unlimited():
+    client = build_client(burst=1)
+
+    assert client.get("/api/history").status_code == 200
+    assert client.get("/api/history").status_code == 429
+    assert client.get("/api/history", headers={"X-API-Key": "k"}).status_code == 200
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert "RateLimit-Limit" not in health.headers
+
+
+def test_without_a_key_header_clients_cannot_escape_by_rotating_keys():
+    client = build_client(burst=1, key_header="")
+
+    assert client.get("/api/history", headers={"X-API-Key": "a"}).status_code == 200
+    assert client.get("/api/history", headers={"X-API-Key": "b"}).status_code == 429
+
+
+def from_address(app, address):
+    """Serve ``app`` as if every request came from ``address``."""
+
+    async def wrapped(scope, receive, send):
+        await app({**scope, "client": (address, 50000)}, receive, send)
+
+    return wrapped
+
+
+def test_clients_are_limited_per_address_by_default():
+    app = build_client(burst=1, key_header="").app
+    first = TestClient(from_address(app, "10.0.0.1"))
+    second = TestClient(from_address(app, "10.0.0.2"))
+
+    assert first.get("/api/history").status_code == 200
+    assert first.get("/api/history").status_code == 429
+    assert second.get("/api/history").status_code == 200
+    assert second.get("/api/history").status_code == 429
@@ -0,0 +1,39 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.sieve.api.middleware import RequestTracingMiddleware
+from src.sieve.services.tracing import current_trace, span
+
+
+def build_client():
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        with span("search"):
+            pass
+        return {"request_id": current_trace().request_id}
+
+    app.add_middleware(RequestTracingMiddleware)
+    return TestClient(app)
+
+
+def test_response_carries_request_id_and_server_timing():
+    response = build_client().get("/work")
+
+    request_id = response.headers["X-Request-ID"]
+    assert response.json() == {"request_id": request_id}
+    assert len(request_id) == 32
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("search;dur=")
+    assert "total;dur=" in timing
+
+
+def test_well_formed_incoming_request_id_is_reused():
+    client = build_client()
+
+    echoed = client.get("/work", headers={"X-Request-ID": "upstream-42"})
+    replaced = client.get("/work", headers={"X-Request-ID": "bad id\twith spaces"})
+
+    assert echoed.headers["X-Request-ID"] == "upstream-42"
+    assert replaced.headers["X-Request-ID"] != "bad id\twith spaces"
@@ -0,0 +1,61 @@
+import random
+
+from starlette.testclient import TestClient
+
+from benchmarks.load_test import LoadSamples, parse_server_timing, percentile, summarize
+from benchmarks.mock_upstreams import (
+    LatencyDistribution,
+    MockConfig,
+    UpstreamProfile,
+    build_mock_app,
+)
+from src.sieve.services.openai_payload import (
+    ResponseStreamParser,
+    extract_answer_chunks,
+    extract_stream_delta,
+)
+
+
+def test_server_timing_and_percentiles_feed_the_report():
+    samples = LoadSamples()
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        samples.add("200", latency, server_timing="search;dur=10.0, openai;dur=80, total;dur=95")
+    samples.add("503", 0.05)
+
+    report = summarize(samples, elapsed=1.0)
+
+    assert parse_server_timing("a;dur=1.5, b;desc=x;dur=2") == {"a": 1.5, "b": 2.0}
+    assert percentile([0.1, 0.2, 0.3, 0.4], 50) == 0.2
+    assert report["requests"] == 5
+    assert report["error_rate"] == 0.2
+    assert report["latency_ms"]["p99"] == 400.0
+    assert report["stages_ms"]["openai"]["p50"] == 80.0
+
+
+def test_latency_specs_are_parsed_and_sampled_within_bounds():
+    uniform = LatencyDistribution.parse("uniform:0.01:0.02")
+    rng = random.Random(1)
+
+    assert LatencyDistribution.parse("constant:0.05").sample(rng) == 0.05
+    assert all(0.01 <= uniform.sample(rng) <= 0.02 for _ in range(100))
+    assert LatencyDistribution.parse("lognormal:0.05:0.4").sample(rng) > 0
+
+
+def test_mock_upstreams_speak_the_real_wire_formats():
+    config = MockConfig(
+        google=UpstreamProfile(payload_bytes=200),
+        openai=UpstreamProfile(payload_bytes=100),
+    )
+    client = TestClient(build_mock_app(config))
+
+    items = client.get("/customsearch/v1", params={"q": "x", "num": 3, "start": 11}).json()
+    answer = client.post("/v1/responses", json={"input": []}).json()
+    stream = client.post("/v1/responses", json={"input": [], "stream": True})
+
+    assert [item["title"] for item in items["items"]][0] == "x — result 11"
+    assert len(extract_answer_chunks(answer)[0]) == 100
+    parser = ResponseStreamParser()
+    deltas = [parser.feed_line(line) for line in stream.text.splitlines()]
+    text = "".join(extract_stream_delta(event) for event in deltas if event)
+    assert len(text) == 100
+    assert client.get("/_mock/stats").json()["calls"] == {"google": 1, "openai": 2}
@@ -0,0 +1,40 @@
+from benchmarks.micro import (
+    BENCHMARKS,
+    baseline_regressions,
+    growth_violations,
+    make_results,
+    measure,
+)
+
+
+def result(size, median, minimum=None):
+    return {"size": size, "median_us": median, "min_us": minimum or median}
+
+
+def test_generators_are_deterministic():
+    assert make_results(3) == make_results(3)
+    assert make_results(3, seed=1) != make_results(3, seed=2)
+
+
+def test_superlinear_growth_is_reported_for_linear_cases():
+    linear = {"pack_sources[10]": result(10, 1.0), "pack_sources[100]": result(100, 10.0)}
+    quadratic = {"pack_sources[10]": result(10, 1.0), "pack_sources[100]": result(100, 100.0)}
+
+    assert growth_violations(linear) == []
+    assert growth_violations(quadratic)[0].startswith("pack_sources")
+
+
+def test_baseline_regression_needs_both_median_and_fastest_round_to_be_slower():
+    baseline = {"history_entry": result(0, 10.0)}
+
+    assert baseline_regressions({"history_entry": result(0, 11.0)}, baseline, 0.25) == []
+    assert baseline_regressions({"history_entry": result(0, 20.0, 9.0)}, baseline, 0.25) == []
+    assert baseline_regressions({"history_entry": result(0, 20.0, 15.0)}, baseline, 0.25)
+
+
+def test_measure_runs_calibrated_rounds_with_reset_between_them():
+    measurement = measure(BENCHMARKS["history.delete"], 50, rounds=3, min_time=0.0)
+
+    assert measurement.loops == 1
+    assert len(measurement.samples) == 3
+    assert measurement.summary()["size"] == 50
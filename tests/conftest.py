@@ -20,3 +20,31 @@ if str(PROJECT_ROOT) not in sys.path:
 def anyio_backend():
     """Run anyio-marked tests on the asyncio backend only."""
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_caches():
+    """Isolate tests from process-wide caches populated by earlier tests."""
+    from src.sieve.services.admission import admission_controller
+    from src.sieve.services.answer_cache import _shared_answer_cache
+    from src.sieve.services.model_routing import _shared_model_router
+    from src.sieve.services.page_fetch import _shared_page_fetcher
+    from src.sieve.services.resilience import _shared_circuit_breaker, _shared_retry_budget
+    from src.sieve.services.search_cache import _shared_search_cache
+    from src.sieve.services.search_providers import _shared_search_provider
+
+    caches = (
+        _shared_search_cache,
+        _shared_answer_cache,
+        _shared_model_router,
+        _shared_page_fetcher,
+        _shared_search_provider,
+        _shared_circuit_breaker,
+        _shared_retry_budget,
+        admission_controller,
+    )
+    for cache in caches:
+        cache.cache_clear()
+    yield
+    for cache in caches:
+        cache.cache_clear()
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.models.ask import AskRequest
+from src.sieve.services import ask_service, search_providers
+from src.sieve.services.admission import AdmissionController, get_ask_admission
+from src.sieve.services.exceptions import AskServiceError, OverloadedError
+from src.sieve.services.google import SearchResult
+
+
+@pytest.mark.anyio("asyncio")
+async def test_queued_work_runs_in_arrival_order():
+    controller = AdmissionController("test", limit=1, max_queue=10, deadline=1.0)
+    order = []
+
+    async def work(name):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(work(name) for name in "abcd"))
+
+    assert order == list("abcd")
+    assert controller.stats().in_flight == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_full_queue_is_rejected_up_front():
+    controller = AdmissionController("test", limit=1, max_queue=1, deadline=1.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    assert controller.stats().queued == 1
+    with pytest.raises(OverloadedError):
+        async with controller.admit():
+            pass
+    assert controller.stats().rejected == 1
+
+    release.set()
+    await asyncio.gather(holder, queued)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_wait_beyond_deadline_is_shed_and_slot_not_leaked():
+    controller = AdmissionController("test", limit=1, max_queue=0, deadline=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(OverloadedError) as excinfo:
+        async with controller.admit():
+            pass
+    assert excinfo.value.retry_after >= 1
+
+    release.set()
+    await holder
+    async with controller.admit():
+        assert controller.stats().in_flight == 1
+    assert controller.stats().queued == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_estimated_wait_over_deadline_rejects_without_queueing():
+    now = [0.0]
+    controller = AdmissionController(
+        "test", limit=1, max_queue=0, deadline=0.5, clock=lambda: now[0]
+    )
+    async with controller.admit():
+        now[0] += 1.0
+
+    async with controller.admit():
+        with pytest.raises(OverloadedError):
+            controller.check()
+    assert controller.stats().queued == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_overloaded_ask_returns_503_with_retry_after(monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_search(query, top_n, settings, client=None):
+        await release.wait()
+        return [SearchResult(title="T", url="https://example.com", snippet="S", index=1)]
+
+    async def fake_generate(query, sources, settings, model, client=None):
+        return "answer", "resp"
+
+    monkeypatch.setattr(search_providers, "search_google", slow_search)
+    monkeypatch.setattr(ask_service, "generate_answer", fake_generate)
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: None)
+    settings = Settings(
+        google_api_key="k",
+        google_cse_id="cx",
+        openai_api_key="secret",
+        ask_max_concurrency=1,
+        ask_max_queue=1,
+    )
+
+    first = asyncio.create_task(ask_service.process_ask_request(AskRequest(query="a"), settings))
+    second = asyncio.create_task(ask_service.process_ask_request(AskRequest(query="b"), settings))
+    await asyncio.sleep(0.01)
+    assert get_ask_admission(settings).stats().queued == 1
+
+    with pytest.raises(AskServiceError) as excinfo:
+        await ask_service.process_ask_request(AskRequest(query="c"), settings)
+    assert excinfo.value.status_code == 503
+    assert "Retry-After" in excinfo.value.headers
+
+    release.set()
+    assert (await first).answer_markdown == "answer"
+    await second
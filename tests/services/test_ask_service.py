@@ -0,0 +1,361 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.models.ask import AskRequest
+from src.sieve.services import ask_service, search_providers
+from src.sieve.services.exceptions import AskServiceError
+from src.sieve.services.google import SearchResult
+from src.sieve.services.metrics import DEADLINES_EXCEEDED
+from src.sieve.services.model_routing import ModelRouter
+from src.sieve.services.openai_client import OpenAIUnavailableError
+from src.sieve.services.tracing import start_trace
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    calls = {"search": [], "generate": []}
+
+    async def fake_search(query, top_n, settings, client=None):
+        calls["search"].append(query)
+        return [SearchResult(title="T", url="https://example.com", snippet="S", index=1)]
+
+    async def fake_generate(query, sources, settings, model, client=None):
+        calls["generate"].append((query, model))
+        return f"answer from {model}", "resp"
+
+    monkeypatch.setattr(search_providers, "search_google", fake_search)
+    monkeypatch.setattr(ask_service, "generate_answer", fake_generate)
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: None)
+    return calls
+
+
+def make_settings(**overrides):
+    values = {
+        "google_api_key": "k",
+        "google_cse_id": "cx",
+        "openai_api_key": "secret",
+        "openai_model": "model-a",
+        "openai_model_options": ["model-a", "model-b"],
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_repeated_question_is_answered_from_cache(upstream_calls):
+    settings = make_settings()
+
+    first = await ask_service.process_ask_request(AskRequest(query="What is AI?"), settings)
+    second = await ask_service.process_ask_request(AskRequest(query="what is ai"), settings)
+
+    assert first.cached is False
+    assert second.cached is True
+    assert second.answer_markdown == first.answer_markdown
+    assert len(upstream_calls["generate"]) == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_answer_cache_is_keyed_by_model(upstream_calls):
+    settings = make_settings()
+
+    await ask_service.process_ask_request(AskRequest(query="q", model="model-a"), settings)
+    other = await ask_service.process_ask_request(AskRequest(query="q", model="model-b"), settings)
+
+    assert other.cached is False
+    assert other.answer_markdown == "answer from model-b"
+    assert [model for _, model in upstream_calls["generate"]] == ["model-a", "model-b"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_disabled_answer_cache_always_generates(upstream_calls):
+    settings = make_settings(answer_cache_enabled=False)
+
+    await ask_service.process_ask_request(AskRequest(query="q"), settings)
+    repeat = await ask_service.process_ask_request(AskRequest(query="q"), settings)
+
+    assert repeat.cached is False
+    assert len(upstream_calls["generate"]) == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_concurrent_identical_asks_share_upstream_calls(upstream_calls, monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_generate(query, sources, settings, model, client=None):
+        upstream_calls["generate"].append((query, model))
+        await release.wait()
+        return "shared answer", "resp"
+
+    monkeypatch.setattr(ask_service, "generate_answer", slow_generate)
+    settings = make_settings(answer_cache_enabled=False, search_cache_enabled=False)
+
+    asks = [
+        asyncio.create_task(
+            ask_service.process_ask_request(AskRequest(query="Viral question"), settings)
+        )
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(*asks)
+
+    assert {response.answer_markdown for response in responses} == {"shared answer"}
+    assert len(upstream_calls["search"]) == 1
+    assert len(upstream_calls["generate"]) == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_emits_deltas_then_citations_and_persists_history(
+    upstream_calls, monkeypatch
+):
+    persisted = []
+
+    async def fake_stream(query, sources, settings, model, client=None):
+        for delta in ("Streamed ", "answer [1]."):
+            yield delta
+
+    monkeypatch.setattr(ask_service, "stream_answer", fake_stream)
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: persisted.append(kwargs))
+    settings = make_settings()
+
+    events = await ask_service.start_ask_stream(AskRequest(query="q"), settings)
+    received = [event async for event in events]
+
+    names = [name for name, _ in received]
+    assert names == ["delta", "delta", "citations", "done"]
+    assert received[2][1]["citations"][0]["url"] == "https://example.com"
+    done = received[-1][1]
+    assert done["answer_markdown"].startswith("Streamed answer [1].\n\nCitations:")
+    assert len(persisted) == 1
+
+    replay = await ask_service.start_ask_stream(AskRequest(query="q"), settings)
+    replayed = [event async for event in replay]
+    assert replayed[0] == ("delta", {"text": "Streamed answer [1]."})
+    assert replayed[-1][1]["cached"] is True
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_releases_the_ask_slot_after_the_first_delta(upstream_calls, monkeypatch):
+    async def fake_stream(query, sources, settings, model, client=None):
+        yield "first "
+        yield "second"
+
+    monkeypatch.setattr(ask_service, "stream_answer", fake_stream)
+    settings = make_settings(ask_max_concurrency=1)
+    admission = ask_service.get_ask_admission(settings)
+
+    events = await ask_service.start_ask_stream(AskRequest(query="q"), settings)
+    assert await anext(events) == ("delta", {"text": "first "})
+    assert admission.stats().in_flight == 0
+    await events.aclose()
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_reports_openai_failure_without_persisting(upstream_calls, monkeypatch):
+    persisted = []
+
+    async def failing_stream(query, sources, settings, model, client=None):
+        yield "partial"
+        raise ask_service.OpenAIError("boom")
+
+    monkeypatch.setattr(ask_service, "stream_answer", failing_stream)
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: persisted.append(kwargs))
+
+    events = await ask_service.start_ask_stream(AskRequest(query="q"), make_settings())
+    received = [event async for event in events]
+
+    assert received[-1] == ("error", {"detail": "boom"})
+    assert persisted == []
+
+
+@pytest.mark.anyio("asyncio")
+async def test_batch_bounds_upstream_concurrency_and_reports_item_errors(
+    upstream_calls, monkeypatch
+):
+    active = {"now": 0, "peak": 0}
+
+    async def tracked_generate(query, sources, settings, model, client=None):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return f"answer to {query}", "resp"
+
+    monkeypatch.setattr(ask_service, "generate_answer", tracked_generate)
+    settings = make_settings(batch_openai_concurrency=2)
+    payloads = [AskRequest(query=f"question {index}") for index in range(6)]
+    payloads.insert(3, AskRequest(query="q", model="unknown"))
+
+    results = [item async for item in ask_service.process_ask_batch(payloads, settings)]
+
+    assert sorted(item.index for item in results) == list(range(7))
+    failed = [item for item in results if item.error]
+    assert [(item.index, item.status_code) for item in failed] == [(3, 400)]
+    assert active["peak"] == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_batch_yields_results_in_completion_order(upstream_calls, monkeypatch):
+    async def delayed_generate(query, sources, settings, model, client=None):
+        await asyncio.sleep(0.05 if query == "slow" else 0)
+        return query, "resp"
+
+    monkeypatch.setattr(ask_service, "generate_answer", delayed_generate)
+    payloads = [AskRequest(query="slow"), AskRequest(query="fast")]
+
+    results = [item async for item in ask_service.process_ask_batch(payloads, make_settings())]
+
+    assert [item.index for item in results] == [1, 0]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_open_openai_circuit_maps_to_service_unavailable(upstream_calls, monkeypatch):
+    async def unavailable(query, sources, settings, model, client=None):
+        raise OpenAIUnavailableError(retry_after=12.5)
+
+    monkeypatch.setattr(ask_service, "generate_answer", unavailable)
+
+    with pytest.raises(AskServiceError) as excinfo:
+        await ask_service.process_ask_request(AskRequest(query="q"), make_settings())
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "13"}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_history_records_request_id_and_timings_when_enabled(upstream_calls, monkeypatch):
+    persisted = []
+    monkeypatch.setattr(ask_service, "add_history_entry", lambda **kwargs: persisted.append(kwargs))
+
+    with start_trace("req-1"):
+        await ask_service.process_ask_request(
+            AskRequest(query="q"), make_settings(history_store_timings=True)
+        )
+
+    assert persisted[0]["request_id"] == "req-1"
+    assert "search" in persisted[0]["timings"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_enriched_page_text_reaches_the_prompt_but_not_citations(
+    upstream_calls, monkeypatch
+):
+    prompts = []
+
+    async def fake_enrich(results, settings, clients=None):
+        return [replace(result, content="page text") for result in results]
+
+    async def recording_generate(query, sources, settings, model, client=None):
+        prompts.append(sources.block)
+        return "answer", "resp"
+
+    monkeypatch.setattr(ask_service, "enrich_results", fake_enrich)
+    monkeypatch.setattr(ask_service, "generate_answer", recording_generate)
+
+    response = await ask_service.process_ask_request(
+        AskRequest(query="q"), make_settings(page_fetch_enabled=True)
+    )
+
+    assert prompts == ["[1] T\nhttps://example.com\npage text"]
+    assert response.citations[0].snippet == "S"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_failed_or_slow_model_falls_back_to_a_faster_one(upstream_calls, monkeypatch):
+    async def flaky_generate(query, sources, settings, model, client=None):
+        upstream_calls["generate"].append((query, model))
+        if model == "model-b":
+            raise ask_service.OpenAIError("boom")
+        if model == "model-c":
+            await asyncio.sleep(1)
+        return f"answer from {model}", "resp"
+
+    monkeypatch.setattr(ask_service, "generate_answer", flaky_generate)
+    settings = make_settings(
+        openai_model_options=["model-a", "model-b", "model-c"],
+        openai_fallback_enabled=True,
+        openai_latency_threshold=0.05,
+    )
+
+    errored = await ask_service.process_ask_request(
+        AskRequest(query="q1", model="model-b"), settings
+    )
+    slow = await ask_service.process_ask_request(
+        AskRequest(query="q2", model="model-c"), settings
+    )
+
+    assert errored.model == "model-a"
+    assert slow.model == "model-a"
+    assert upstream_calls["generate"] == [
+        ("q1", "model-b"),
+        ("q1", "model-a"),
+        ("q2", "model-c"),
+        ("q2", "model-b"),
+        ("q2", "model-a"),
+    ]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_falls_back_before_the_first_delta(upstream_calls, monkeypatch):
+    attempts = []
+
+    async def flaky_stream(query, sources, settings, model, client=None):
+        attempts.append(model)
+        if model == "model-b":
+            raise ask_service.OpenAIError("boom")
+        yield f"from {model}"
+
+    monkeypatch.setattr(ask_service, "stream_answer", flaky_stream)
+    settings = make_settings(openai_auto_enabled=True, openai_auto_complex_words=1)
+
+    events = await ask_service.start_ask_stream(AskRequest(query="why", model="auto"), settings)
+    received = [event async for event in events]
+
+    assert attempts == ["model-b", "model-a"]
+    assert received[0] == ("delta", {"text": "from model-a"})
+    assert received[-1][1]["model"] == "model-a"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_slow_search_is_skipped_after_the_search_deadline(upstream_calls, monkeypatch):
+    async def slow_search(query, top_n, settings, client=None):
+        await asyncio.sleep(0.2)
+        return [SearchResult(title="T", url="https://example.com", snippet="S", index=1)]
+
+    monkeypatch.setattr(search_providers, "search_google", slow_search)
+    settings = make_settings(search_deadline=0.05, answer_cache_enabled=False)
+
+    first = await ask_service.process_ask_request(AskRequest(query="q"), settings)
+    await asyncio.sleep(0.3)
+    second = await ask_service.process_ask_request(AskRequest(query="q"), settings)
+
+    assert first.search_used is False
+    assert "Поиск не успел" in first.message
+    assert second.search_used is True
+    assert second.citations[0].url == "https://example.com"
+
+
+@pytest.mark.anyio("asyncio")
+async def test_request_deadline_bounds_generation(upstream_calls, monkeypatch):
+    async def slow_generate(query, sources, settings, model, client=None):
+        await asyncio.sleep(1)
+        return "late answer", "resp"
+
+    observed = []
+    monkeypatch.setattr(ask_service, "generate_answer", slow_generate)
+    monkeypatch.setattr(
+        ModelRouter, "observe", lambda self, model, seconds, ok: observed.append(model)
+    )
+    settings = make_settings(request_deadline=0.1)
+    exceeded = DEADLINES_EXCEEDED.labels("generation").value
+
+    with pytest.raises(AskServiceError) as excinfo:
+        await ask_service.process_ask_request(AskRequest(query="q"), settings)
+
+    assert excinfo.value.status_code == 504
+    assert excinfo.value.detail == "Не удалось сформировать ответ за отведённое время"
+    assert DEADLINES_EXCEEDED.labels("generation").value == exceeded + 1
+    assert observed == []
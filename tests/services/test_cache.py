@@ -0,0 +1,63 @@
+from src.sieve.services.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(clock, max_entries=3, max_bytes=100, ttl=10.0):
+    return TTLCache(
+        max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=len, clock=clock
+    )
+
+
+def test_get_counts_hits_and_misses():
+    cache = make_cache(FakeClock())
+    cache.set("a", "value")
+
+    assert cache.get("a") == "value"
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_ratio == 0.5
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = make_cache(clock, ttl=5.0)
+    cache.set("a", "value")
+
+    clock.now = 4.9
+    assert cache.get("a") == "value"
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_entry():
+    cache = make_cache(FakeClock(), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_byte_budget_bounds_total_size():
+    cache = make_cache(FakeClock(), max_entries=10, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    cache.set("huge", "z" * 11)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+    assert cache.get("huge") is None
+    assert cache.stats().bytes == 6
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from src.sieve.services.deadline import (
+    current_deadline,
+    deadline_expired,
+    remaining_timeout,
+    start_deadline,
+)
+
+
+def test_no_deadline_keeps_stage_timeouts():
+    with start_deadline(0) as deadline:
+        assert deadline is None
+        assert remaining_timeout(30.0) == 30.0
+        assert not deadline_expired()
+
+
+def test_deadline_caps_stage_timeouts_to_the_remaining_budget():
+    with start_deadline(2.0) as deadline:
+        assert current_deadline() is deadline
+        assert remaining_timeout(30.0) <= 2.0
+        assert remaining_timeout(0.5) == 0.5
+        assert deadline.cap(None) <= 2.0
+    assert current_deadline() is None
+
+
+def test_nested_deadline_never_extends_the_outer_one():
+    with start_deadline(1.0) as outer:
+        with start_deadline(10.0) as inner:
+            assert inner is outer
+        with start_deadline(0.5) as shorter:
+            assert shorter.expires_at < outer.expires_at
+        assert current_deadline() is outer
+
+
+@pytest.mark.anyio("asyncio")
+async def test_deadline_is_inherited_by_spawned_tasks():
+    with start_deadline(1.0) as deadline:
+        inherited = await asyncio.create_task(_current())
+
+    assert inherited is deadline
+
+
+async def _current():
+    return current_deadline()
@@ -10,6 +10,7 @@ class DummyResponse:
         self.status_code = status_code
         self._json_data = json_data or {}
         self.text = text
+        self.headers = {}
 
     def json(self):
         return self._json_data
@@ -44,7 +45,7 @@ async def test_search_google_success(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def get(self, url, params=None):
+        async def get(self, url, params=None, timeout=None):
             recorded["url"] = url
             recorded["params"] = params
             return dummy_response
@@ -78,7 +79,7 @@ async def test_search_google_http_error(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def get(self, url, params=None):
+        async def get(self, url, params=None, timeout=None):
             raise httpx.ReadTimeout("timeout")
 
     monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: DummyClient())
@@ -100,7 +101,7 @@ async def test_search_google_non_ok_status(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def get(self, url, params=None):
+        async def get(self, url, params=None, timeout=None):
             return dummy_response
 
     monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: DummyClient())
@@ -109,3 +110,45 @@ async def test_search_google_non_ok_status(monkeypatch):
 
     with pytest.raises(GoogleSearchError):
         await search_google("query", 1, settings)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_search_google_fetches_pages_concurrently_and_deduplicates():
+    requested = []
+
+    def handler(request):
+        start = int(request.url.params.get("start", "1"))
+        num = int(request.url.params["num"])
+        requested.append((start, num))
+        items = [
+            {"title": f"R{position}", "link": f"https://example.com/{position}", "snippet": ""}
+            for position in range(start, start + num)
+        ]
+        if start == 11:
+            items[0]["link"] = "https://WWW.example.com/1/?utm_source=x"
+        return httpx.Response(200, json={"items": items})
+
+    settings = Settings(google_api_key="k", google_cse_id="cx", max_top_n=25)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        results = await search_google("python", 25, settings, client=client)
+
+    assert sorted(requested) == [(1, 10), (11, 10), (21, 5)]
+    assert len(results) == 24
+    assert [item.index for item in results] == list(range(1, 25))
+    assert [item.title for item in results[9:11]] == ["R10", "R12"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_search_google_keeps_first_pages_when_later_page_fails():
+    def handler(request):
+        start = int(request.url.params.get("start", "1"))
+        if start > 1:
+            return httpx.Response(500, text="quota")
+        items = [{"title": "R1", "link": "https://example.com/1", "snippet": ""}]
+        return httpx.Response(200, json={"items": items})
+
+    settings = Settings(google_api_key="k", google_cse_id="cx", max_top_n=20)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        results = await search_google("python", 20, settings, client=client)
+
+    assert [item.url for item in results] == ["https://example.com/1"]
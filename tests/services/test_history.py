@@ -91,3 +91,56 @@ def test_clear_empties_store():
     store.clear()
 
     assert store.list_entries().items == []
+
+
+def add_simple_entry(store, query):
+    return store.add_entry(
+        query=query,
+        top_n=1,
+        model="gpt",
+        answer_markdown="text",
+        message=None,
+        citations=[],
+        results=[],
+        search_used=True,
+    )
+
+
+def test_list_page_walks_history_with_cursor():
+    store = HistoryStore(max_size=10)
+    for index in range(5):
+        add_simple_entry(store, f"q{index}")
+    store.delete(store.list_page(limit=2).items[1].id)
+
+    first = store.list_page(limit=2)
+    second = store.list_page(limit=2, cursor=first.next_cursor)
+
+    assert [item.query for item in first.items] == ["q4", "q2"]
+    assert [item.query for item in second.items] == ["q1", "q0"]
+    assert second.next_cursor is None
+
+
+def test_ring_buffer_evicts_oldest_and_keeps_index_in_sync():
+    store = HistoryStore(max_size=3)
+    entries = [add_simple_entry(store, f"q{index}") for index in range(7)]
+
+    assert len(store) == 3
+    assert [item.query for item in store.list_entries().items] == ["q6", "q5", "q4"]
+    assert store.delete(entries[3].id) is False
+    assert store.delete(entries[5].id) is True
+    assert [item.query for item in store.list_entries().items] == ["q6", "q4"]
+
+
+def test_version_increases_on_every_mutation():
+    store = HistoryStore(max_size=5)
+    initial = store.version
+
+    entry = add_simple_entry(store, "q")
+    after_insert = store.list_entries().version
+    store.delete(entry.id)
+    after_delete = store.version
+    store.delete(entry.id)
+    store.clear()
+
+    assert initial < after_insert < after_delete < store.version
+    assert store.version == after_delete + 1
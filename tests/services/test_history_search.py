@@ -0,0 +1,63 @@
+from src.sieve.models.ask import Citation
+from src.sieve.repositories.history_search import HistorySearchIndex, tokenize
+from src.sieve.services.history import HistoryStore
+
+
+def add(store, query, answer, titles=()):
+    return store.add_entry(
+        query=query,
+        top_n=1,
+        model="gpt",
+        answer_markdown=answer,
+        message=None,
+        citations=[
+            Citation(title=title, url="https://example.com", snippet="", index=index)
+            for index, title in enumerate(titles, start=1)
+        ],
+        results=[],
+        search_used=True,
+    )
+
+
+def test_tokenize_folds_case_and_handles_cyrillic():
+    assert tokenize("Новости Python, 3.12!") == ["новости", "python", "3", "12"]
+
+
+def test_index_ranks_by_bm25_and_supports_removal():
+    index = HistorySearchIndex()
+    index.add("rare", tokenize("asyncio event loop"))
+    index.add("common", tokenize("python python python asyncio"))
+    index.add("other", tokenize("django orm"))
+
+    ranked = [doc_id for doc_id, _ in index.search("python asyncio", 10)]
+    assert ranked[0] == "common"
+    assert set(ranked) == {"common", "rare"}
+
+    index.remove("common")
+    assert [doc_id for doc_id, _ in index.search("python", 10)] == []
+    assert len(index) == 2
+
+
+def test_store_search_covers_query_answer_and_citation_titles():
+    store = HistoryStore(max_size=10)
+    by_query = add(store, "What is asyncio?", "An event loop library.")
+    by_title = add(store, "Web frameworks", "Several options.", titles=["Django asyncio support"])
+    add(store, "Unrelated", "Nothing here.")
+
+    found = {item.id for item in store.search("asyncio", 10).items}
+
+    assert found == {by_query.id, by_title.id}
+
+
+def test_store_search_stays_in_sync_with_delete_eviction_and_clear():
+    store = HistoryStore(max_size=2)
+    evicted = add(store, "first topic", "alpha")
+    deleted = add(store, "second topic", "alpha")
+    add(store, "third topic", "alpha")
+    store.delete(deleted.id)
+
+    assert [item.query for item in store.search("alpha", 10).items] == ["third topic"]
+    assert evicted.id not in {item.id for item in store.search("first", 10).items}
+
+    store.clear()
+    assert store.search("alpha", 10).items == []
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.sieve.api.main import build_app
+from src.sieve.config import Settings
+from src.sieve.services import http_clients
+from src.sieve.services.google import search_google
+from src.sieve.services.http_clients import create_upstream_client, warm_up
+
+
+class DummyResponse:
+    status_code = httpx.codes.OK
+    text = ""
+
+    def json(self):
+        return {"items": [{"title": "T", "link": "https://example.com", "snippet": "S"}]}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_search_google_uses_injected_client(monkeypatch):
+    calls = []
+
+    class SharedClient:
+        async def get(self, url, params=None, timeout=None):
+            calls.append(params["q"])
+            return DummyResponse()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("per-call client must not be created")
+
+    monkeypatch.setattr(httpx, "AsyncClient", _fail)
+
+    settings = Settings(google_api_key="k", google_cse_id="cx")
+    client = SharedClient()
+    await search_google("first", 1, settings, client=client)
+    results = await search_google("second", 1, settings, client=client)
+
+    assert calls == ["first", "second"]
+    assert results[0].url == "https://example.com"
+
+
+def test_create_upstream_client_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(http_clients, "_http2_available", lambda: False)
+    recorded = {}
+
+    def _client(**kwargs):
+        recorded.update(kwargs)
+        return object()
+
+    monkeypatch.setattr(httpx, "AsyncClient", _client)
+
+    settings = Settings(http_http2=True, http_max_connections=7, http_max_keepalive_connections=3)
+    create_upstream_client(settings, timeout=1.5)
+
+    assert recorded["http2"] is False
+    assert recorded["timeout"] == 1.5
+    assert recorded["limits"].max_connections == 7
+    assert recorded["limits"].max_keepalive_connections == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_warm_up_counts_successful_probes():
+    attempts = []
+
+    class FlakyClient:
+        async def head(self, url):
+            attempts.append(url)
+            if len(attempts) == 2:
+                raise httpx.ConnectError("refused")
+
+    warmed = await warm_up(FlakyClient(), "https://example.com", 3)
+
+    assert warmed == 2
+    assert len(attempts) == 3
+
+
+def test_lifespan_opens_and_closes_shared_clients():
+    app = build_app()
+
+    with TestClient(app):
+        clients = app.state.upstream_clients
+        assert not clients.google.is_closed
+        assert not clients.openai.is_closed
+
+    assert clients.google.is_closed
+    assert clients.openai.is_closed
+    assert app.state.upstream_clients is None
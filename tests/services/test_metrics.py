@@ -0,0 +1,47 @@
+import pytest
+
+from src.sieve.services.metrics import MetricFamily, MetricsRegistry, _Metric
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.1, 1.0))
+
+    stages.labels("search").observe(0.05)
+    stages.labels("search").observe(0.5)
+    stages.labels("search").observe(5.0)
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="search",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="search",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="search",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="search"} 5.55' in text
+    assert 'stage_seconds_count{stage="search"} 3' in text
+
+
+def test_counters_gauges_and_extra_families_render_with_escaped_labels():
+    registry = MetricsRegistry()
+    responses = registry.counter("upstream_responses", "Responses.", ("status",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    responses.labels('5"0"3').inc()
+    responses.labels('5"0"3').inc(2)
+    in_flight.labels().inc()
+    in_flight.labels().dec()
+
+    extra = MetricFamily("cache_hit_ratio", "gauge", "Ratio.", [("", {"cache": "search"}, 0.25)])
+    text = registry.render([extra])
+
+    assert "# TYPE upstream_responses_total counter" in text
+    assert 'upstream_responses_total{status="5\\"0\\"3"} 3' in text
+    assert "in_flight 0" in text
+    assert 'cache_hit_ratio{cache="search"} 0.25' in text
+
+
+def test_metric_subclasses_must_implement_children_and_collect():
+    class Incomplete(_Metric):
+        def _new_child(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete("sieve_incomplete", "Missing collect")
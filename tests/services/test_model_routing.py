@@ -0,0 +1,56 @@
+from src.sieve.services.model_routing import ModelRouter, query_complexity
+
+TIERS = ["fast", "medium", "strong"]
+
+
+def make_router(now):
+    return ModelRouter(
+        TIERS,
+        latency_threshold=5.0,
+        complex_words=20,
+        window=10,
+        cooldown=30.0,
+        clock=lambda: now[0],
+    )
+
+
+def test_query_complexity_grows_with_length_and_reasoning():
+    assert query_complexity("python version", 20) == 0.1
+    assert query_complexity("why is python slow", 20) == 0.7
+    assert query_complexity(" ".join(["word"] * 40), 20) == 1.0
+
+
+def test_auto_routes_by_complexity_with_faster_fallbacks():
+    router = make_router([0.0])
+
+    simple = router.route("python version", "auto")
+    complex_ = router.route("compare asyncio and threads for network servers", "auto")
+
+    assert simple.models == ("fast",)
+    assert simple.attempt_timeout is None
+    assert complex_.models == ("strong", "medium", "fast")
+    assert complex_.timeout_for(0) == 5.0
+    assert complex_.timeout_for(2) is None
+
+
+def test_degraded_models_are_skipped_until_the_cooldown_expires():
+    now = [0.0]
+    router = make_router(now)
+    query = "compare asyncio and threads for network servers"
+    for _ in range(3):
+        router.observe("strong", 6.0, ok=True)
+    for _ in range(3):
+        router.observe("medium", 1.0, ok=False)
+
+    assert router.route(query, "auto").models == ("fast",)
+
+    now[0] = 31.0
+    assert router.route(query, "auto").models == ("strong", "medium", "fast")
+
+
+def test_explicit_models_fall_back_only_when_enabled():
+    router = make_router([0.0])
+
+    assert router.route("q", "strong").models == ("strong",)
+    assert router.route("q", "strong", fallback=True).models == ("strong", "medium", "fast")
+    assert router.route("q", "unlisted", fallback=True).models == ("unlisted",)
@@ -1,9 +1,18 @@
+import json
+
 import httpx
 import pytest
 
 from src.sieve.config import Settings
 from src.sieve.services.google import SearchResult
-from src.sieve.services.openai_client import OpenAIError, generate_answer
+from src.sieve.services.openai_client import OpenAIError, generate_answer, stream_answer
+from src.sieve.services.metrics import OPENAI_TOKENS
+from src.sieve.services.openai_payload import (
+    ResponseStreamParser,
+    build_responses_payload,
+    extract_stream_delta,
+)
+from src.sieve.services.source_packing import PackedSources, pack_sources
 
 
 class DummyResponse:
@@ -11,6 +20,7 @@ class DummyResponse:
         self.status_code = status_code
         self._payload = payload or {}
         self.text = text
+        self.headers = {}
 
     def json(self):
         return self._payload
@@ -34,6 +44,11 @@ async def test_generate_answer_success(monkeypatch):
                     ],
                 }
             ],
+            "usage": {
+                "input_tokens": 1500,
+                "input_tokens_details": {"cached_tokens": 1024},
+                "output_tokens": 80,
+            },
         },
     )
 
@@ -47,7 +62,7 @@ async def test_generate_answer_success(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def post(self, url, headers=None, json=None):
+        async def post(self, url, headers=None, json=None, timeout=None):
             recorded["url"] = url
             recorded["headers"] = headers
             recorded["payload"] = json
@@ -65,13 +80,17 @@ async def test_generate_answer_success(monkeypatch):
         )
     ]
 
-    answer, response_id = await generate_answer("What is AI?", results, settings, model="gpt-test")
+    sources = pack_sources(results, "gpt-test", settings)
+    answer, response_id = await generate_answer("What is AI?", sources, settings, model="gpt-test")
 
     assert "citations" in answer.lower()
     assert response_id == "resp_123"
     assert recorded["headers"]["Authorization"] == "Bearer secret"
     assert recorded["payload"]["model"] == "gpt-test"
-    assert recorded["payload"]["input"][1]["content"][0]["text"].startswith("Question: What is AI?")
+    user_text = recorded["payload"]["input"][1]["content"][0]["text"]
+    assert user_text.startswith("Sources:\n[1] Result One")
+    assert user_text.endswith("Question: What is AI?")
+    assert OPENAI_TOKENS.labels("gpt-test", "cached_input").value == 1024
     assert recorded["url"] == "https://api.example.com/v1/responses"
 
 
@@ -86,7 +105,7 @@ async def test_generate_answer_non_ok_status(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def post(self, url, headers=None, json=None):
+        async def post(self, url, headers=None, json=None, timeout=None):
             return dummy_response
 
     monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: DummyClient())
@@ -94,7 +113,7 @@ async def test_generate_answer_non_ok_status(monkeypatch):
     settings = Settings(openai_api_key="secret")
 
     with pytest.raises(OpenAIError):
-        await generate_answer("Question", [], settings, model="gpt")
+        await generate_answer("Question", PackedSources(), settings, model="gpt")
 
 
 @pytest.mark.anyio("asyncio")
@@ -108,7 +127,7 @@ async def test_generate_answer_empty_output(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def post(self, url, headers=None, json=None):
+        async def post(self, url, headers=None, json=None, timeout=None):
             return dummy_response
 
     monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: DummyClient())
@@ -116,4 +135,78 @@ async def test_generate_answer_empty_output(monkeypatch):
     settings = Settings(openai_api_key="secret")
 
     with pytest.raises(OpenAIError):
-        await generate_answer("Question", [], settings, model="gpt")
+        await generate_answer("Question", PackedSources(), settings, model="gpt")
+
+
+def _sse(event_type, **fields):
+    return f"event: {event_type}\ndata: {json.dumps({'type': event_type, **fields})}\n\n"
+
+
+def test_stream_parser_decodes_events_across_lines():
+    parser = ResponseStreamParser()
+    lines = _sse("response.output_text.delta", delta="Hel").split("\n")
+
+    events = [parser.feed_line(line) for line in lines]
+    decoded = [event for event in events if event is not None]
+
+    assert [extract_stream_delta(event) for event in decoded] == ["Hel"]
+    assert parser.feed_line(": keep-alive") is None
+    assert parser.feed_line("data: [DONE]") is None
+    assert parser.flush() is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_answer_yields_text_deltas():
+    recorded = {}
+
+    def handler(request):
+        recorded["payload"] = json.loads(request.content)
+        body = (
+            _sse("response.created")
+            + _sse("response.output_text.delta", delta="Hello")
+            + _sse("response.output_text.delta", delta=" world [1].")
+            + _sse(
+                "response.completed",
+                response={
+                    "id": "resp_1",
+                    "usage": {"input_tokens": 900, "input_tokens_details": {"cached_tokens": 512}},
+                },
+            )
+        )
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    settings = Settings(openai_api_key="secret")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        stream = stream_answer("Question", PackedSources(), settings, model="gpt", client=client)
+        deltas = [delta async for delta in stream]
+
+    assert deltas == ["Hello", " world [1]."]
+    assert recorded["payload"]["stream"] is True
+    assert OPENAI_TOKENS.labels("gpt", "cached_input").value >= 512
+
+
+@pytest.mark.anyio("asyncio")
+async def test_stream_answer_raises_on_failure_event():
+    def handler(request):
+        body = _sse("response.output_text.delta", delta="partial") + _sse(
+            "response.failed", response={"error": {"message": "overloaded"}}
+        )
+        return httpx.Response(200, text=body)
+
+    settings = Settings(openai_api_key="secret")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(OpenAIError, match="overloaded"):
+            sources = PackedSources()
+            async for _ in stream_answer("Question", sources, settings, model="gpt", client=client):
+                pass
+
+
+def test_payloads_share_a_byte_stable_prefix_per_model():
+    first = build_responses_payload("first", "[1] A", model="gpt", prompt_cache_key="sieve")
+    second = build_responses_payload("second", "[1] B", model="gpt", prompt_cache_key="sieve")
+
+    assert first["input"][0] is second["input"][0]
+    assert first["prompt_cache_key"] == "sieve"
+    assert json.dumps(first["input"][0]) == json.dumps(second["input"][0])
+    assert first["input"][1]["content"][0]["text"].endswith("Question: first")
+    assert "stream" not in first
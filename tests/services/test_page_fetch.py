@@ -0,0 +1,235 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.services.cache import TTLCache
+from src.sieve.services.google import SearchResult
+from src.sieve.services.page_fetch import (
+    PageFetcher,
+    enrich_results,
+    excerpt,
+    extract_text,
+    is_fetchable_url,
+)
+
+ARTICLE = """
+<html><head><title>T</title><script>var tracking = "a b c d e";</script></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About us and our team</a></nav>
+  <article>
+    <h1>Event loops explained in depth</h1>
+    <p>An event loop runs coroutines concurrently on one thread &amp; never blocks.</p>
+    <p>Short.</p>
+  </article>
+  <footer>Copyright notice for the whole site here</footer>
+</body></html>
+"""
+
+
+def make_result(index, url=None):
+    return SearchResult(
+        title=f"Title {index}",
+        url=url or f"https://site{index}.example/page",
+        snippet=f"snippet {index}",
+        index=index,
+    )
+
+
+PUBLIC_ADDRESS = "93.184.216.34"
+
+
+async def public_resolver(host, port):
+    return [PUBLIC_ADDRESS]
+
+
+def make_fetcher(clock=None, **overrides):
+    options = {
+        "per_host": 2,
+        "max_bytes": 64 * 1024,
+        "fresh_for": 60.0,
+        "resolver": public_resolver,
+    }
+    options.update(overrides)
+    cache = TTLCache(
+        max_entries=16, max_bytes=1024 * 1024, ttl=3600.0, sizeof=lambda page: len(page.text)
+    )
+    if clock is not None:
+        return PageFetcher(cache=cache, clock=clock, **options)
+    return PageFetcher(cache=cache, **options)
+
+
+def test_extract_text_keeps_main_content_and_drops_boilerplate():
+    text = extract_text(ARTICLE)
+
+    assert text.splitlines() == [
+        "Event loops explained in depth",
+        "An event loop runs coroutines concurrently on one thread & never blocks.",
+    ]
+
+
+def test_excerpt_cuts_on_a_word_boundary():
+    assert excerpt("alpha beta gamma", 100) == "alpha beta gamma"
+    assert excerpt("alpha beta gamma", 12) == "alpha beta…"
+
+
+@pytest.mark.parametrize(
+    ("url", "allowed"),
+    [
+        ("https://example.com/a", True),
+        ("ftp://example.com/a", False),
+        ("http://localhost:8000/", False),
+        ("http://127.0.0.1/admin", False),
+        ("http://10.1.2.3/", False),
+        ("http://[::1]/", False),
+        ("http://169.254.169.254/latest/meta-data", False),
+        ("http://2130706433/", False),
+        ("http://127.1/", False),
+        ("http://0x7f000001/", False),
+        ("http://0177.0.0.1/", False),
+        ("http://127.0.0.1./", False),
+        ("http://[zz]/", False),
+        ("http://example.com:99999/", False),
+    ],
+)
+def test_is_fetchable_url_rejects_private_targets(url, allowed):
+    assert is_fetchable_url(url) is allowed
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_revalidates_stale_pages_with_etag():
+    now = [0.0]
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, text=ARTICLE, headers={"content-type": "text/html", "etag": '"v1"'}
+        )
+
+    fetcher = make_fetcher(clock=lambda: now[0])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await fetcher.fetch(client, "https://example.com/a")
+        cached = await fetcher.fetch(client, "https://example.com/a")
+        now[0] = 120.0
+        revalidated = await fetcher.fetch(client, "https://example.com/a")
+
+    assert first == cached == revalidated
+    assert seen == [None, '"v1"']
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_reads_at_most_max_bytes_and_skips_binary_pages():
+    def handler(request):
+        if request.url.path == "/file.pdf":
+            return httpx.Response(200, content=b"%PDF", headers={"content-type": "application/pdf"})
+        return httpx.Response(200, text="word " * 10_000, headers={"content-type": "text/plain"})
+
+    fetcher = make_fetcher(max_bytes=100)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        text = await fetcher.fetch(client, "https://example.com/big.txt")
+        binary = await fetcher.fetch(client, "https://example.com/file.pdf")
+
+    assert len(text) <= 100
+    assert binary is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_does_not_follow_redirects_to_private_addresses():
+    def handler(request):
+        return httpx.Response(302, headers={"location": "http://127.0.0.1/admin"})
+
+    fetcher = make_fetcher()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await fetcher.fetch(client, "https://example.com/a") is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_fetch_skips_hosts_resolving_to_private_addresses():
+    requested = []
+
+    async def resolver(host, port):
+        return {"internal.example": ["10.0.0.5"], "mixed.example": [PUBLIC_ADDRESS, "::1"]}.get(
+            host, [PUBLIC_ADDRESS]
+        )
+
+    def handler(request):
+        requested.append(request.url.host)
+        return httpx.Response(302, headers={"location": "http://internal.example/admin"})
+
+    fetcher = make_fetcher(resolver=resolver)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await fetcher.fetch(client, "https://mixed.example/") is None
+        assert await fetcher.fetch(client, "https://example.com/a") is None
+
+    assert requested == ["example.com"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_per_host_limit_caps_concurrent_downloads():
+    active = {"now": 0, "peak": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(200, text="plain text body with enough words")
+
+    fetcher = make_fetcher(per_host=2)
+    urls = [f"https://example.com/{number}" for number in range(6)]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await asyncio.gather(*(fetcher.fetch(client, url) for url in urls))
+
+    assert active["peak"] == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_enrich_keeps_snippets_for_pages_missing_the_deadline():
+    async def handler(request):
+        if request.url.host == "site2.example":
+            await asyncio.sleep(5)
+        return httpx.Response(200, text=ARTICLE, headers={"content-type": "text/html"})
+
+    results = [make_result(1), make_result(2), make_result(3)]
+    fetcher = make_fetcher()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        enriched = await fetcher.enrich(results, client, top_k=2, deadline=0.2, max_chars=40)
+
+    assert enriched[0].content == "Event loops explained in depth\nAn event…"
+    assert enriched[0].snippet == "snippet 1"
+    assert enriched[1].content is None
+    assert enriched[2].content is None
+    assert results[0].content is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_enrich_keeps_snippets_for_urls_that_fail_to_load():
+    async def resolver(host, port):
+        if host == "site3.example":
+            raise OSError("no such host")
+        return [PUBLIC_ADDRESS]
+
+    def handler(request):
+        return httpx.Response(200, text=ARTICLE, headers={"content-type": "text/html"})
+
+    results = [
+        make_result(1, url="http://exa\tmple.com/"),
+        make_result(2, url="http://[zz]/"),
+        make_result(3),
+    ]
+    fetcher = make_fetcher(resolver=resolver)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        enriched = await fetcher.enrich(results, client, top_k=3, deadline=1.0, max_chars=40)
+
+    assert [result.content for result in enriched] == [None, None, None]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_enrich_results_is_a_no_op_when_disabled():
+    results = [make_result(1)]
+
+    assert await enrich_results(results, Settings()) is results
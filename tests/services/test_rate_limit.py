@@ -0,0 +1,42 @@
+from src.sieve.services.rate_limit import RateLimitPolicy, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(
+        RateLimitPolicy(requests=60, window=60.0, burst=2), max_keys=10, clock=clock
+    )
+
+    first, second, third = (limiter.acquire("client") for _ in range(3))
+
+    assert (first.allowed, first.remaining) == (True, 1)
+    assert (second.allowed, second.remaining) == (True, 0)
+    assert third.allowed is False
+    assert third.retry_after == 1
+    assert third.reset == 2
+
+    clock.now = 1.0
+    assert limiter.acquire("client").allowed is True
+    assert limiter.acquire("other").allowed is True
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(
+        RateLimitPolicy(requests=60, window=60.0, burst=5), max_keys=2, clock=clock
+    )
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+    assert len(limiter) == 2
+
+    clock.now = 10.0
+    limiter.acquire("d")
+    assert len(limiter) == 1
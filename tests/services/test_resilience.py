@@ -0,0 +1,188 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.services.concurrency import OPENAI_UPSTREAM
+from src.sieve.services.deadline import start_deadline
+from src.sieve.services.openai_client import (
+    OpenAIError,
+    OpenAIUnavailableError,
+    generate_answer,
+)
+from src.sieve.services.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    UpstreamGuard,
+    get_circuit_breaker,
+    parse_retry_after,
+)
+from src.sieve.services.source_packing import PackedSources
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_guard(*, attempts=3, budget=None, breaker=None):
+    return UpstreamGuard(
+        "upstream",
+        policy=RetryPolicy(max_attempts=attempts, base_delay=0.0, max_delay=1.0),
+        budget=budget or RetryBudget(ratio=0.0, min_retries=100),
+        breaker=breaker or CircuitBreaker("upstream", failure_threshold=100, reset_timeout=1.0),
+    )
+
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_circuit_breaker_opens_then_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker("google", failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 10.0
+
+    clock.now = 10.0
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_retry_budget_limits_retries_to_fraction_of_requests():
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.5, min_retries=1, window=10.0, clock=clock)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now = 11.0
+    assert budget.try_acquire() is True
+
+
+@pytest.mark.anyio("asyncio")
+async def test_guard_retries_retryable_statuses_until_success():
+    statuses = iter([503, 429, 200])
+    calls = []
+
+    async def request():
+        calls.append(1)
+        return httpx.Response(next(statuses), headers={"Retry-After": "0"})
+
+    response = await make_guard().send(request)
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_guard_gives_up_when_budget_or_attempts_exhausted():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        return httpx.Response(500)
+
+    exhausted = RetryBudget(ratio=0.0, min_retries=0)
+    response = await make_guard(budget=exhausted).send(request)
+    assert response.status_code == 500
+    assert len(calls) == 1
+
+    response = await make_guard(attempts=2).send(request)
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio("asyncio")
+async def test_guard_does_not_retry_client_errors_or_long_retry_after():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        return httpx.Response(429 if len(calls) > 1 else 400, headers={"Retry-After": "60"})
+
+    guard = make_guard()
+    assert (await guard.send(request)).status_code == 400
+    assert (await guard.send(request)).status_code == 429
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_guard_does_not_retry_past_the_request_deadline():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        return httpx.Response(503, headers={"Retry-After": "1"})
+
+    with start_deadline(0.2):
+        response = await make_guard().send(request)
+
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_generate_answer_fails_fast_while_openai_circuit_is_open():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    settings = Settings(
+        openai_api_key="secret",
+        retry_max_attempts=1,
+        circuit_breaker_failure_threshold=2,
+    )
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(2):
+            with pytest.raises(OpenAIError, match="503"):
+                await generate_answer("q", PackedSources(), settings, model="m", client=client)
+        with pytest.raises(OpenAIUnavailableError):
+            await generate_answer("q", PackedSources(), settings, model="m", client=client)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_deadline_timeouts_do_not_open_the_circuit():
+    calls = []
+
+    async def slow_handler(request):
+        # MockTransport ignores timeouts, so stand in for the read timeout.
+        calls.append(request)
+        await asyncio.sleep(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    settings = Settings(openai_api_key="secret", circuit_breaker_failure_threshold=1)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as client:
+        for _ in range(2):
+            with start_deadline(0.05), pytest.raises(OpenAIError):
+                await generate_answer("q", PackedSources(), settings, model="m", client=client)
+
+    assert get_circuit_breaker(OPENAI_UPSTREAM, settings).state == CIRCUIT_CLOSED
+    assert len(calls) == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.services import ask_service, search_providers
+from src.sieve.services.google import SearchResult
+from src.sieve.services.search_cache import get_search_cache, normalize_query
+
+
+def test_normalize_query_folds_case_whitespace_and_punctuation():
+    assert normalize_query("  What   is Python? ") == normalize_query("what is python")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_maybe_search_google_serves_repeated_queries_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_search(query, top_n, settings, client=None):
+        calls.append(query)
+        return [SearchResult(title="T", url="https://example.com", snippet="S", index=1)]
+
+    monkeypatch.setattr(search_providers, "search_google", fake_search)
+    settings = Settings(google_api_key="k", google_cse_id="cx")
+
+    first, _ = await ask_service._maybe_search_google("Python news", 3, settings)
+    second, message = await ask_service._maybe_search_google("python  NEWS?", 3, settings)
+    await ask_service._maybe_search_google("python news", 4, settings)
+
+    assert calls == ["Python news", "python news"]
+    assert second == first
+    assert message is None
+    assert get_search_cache(settings).stats().hits == 1
+
+
+@pytest.mark.anyio("asyncio")
+async def test_maybe_search_google_bypasses_disabled_cache(monkeypatch):
+    calls = []
+
+    async def fake_search(query, top_n, settings, client=None):
+        calls.append(query)
+        return []
+
+    monkeypatch.setattr(search_providers, "search_google", fake_search)
+    settings = Settings(google_api_key="k", google_cse_id="cx", search_cache_enabled=False)
+
+    await ask_service._maybe_search_google("q", 1, settings)
+    await ask_service._maybe_search_google("q", 1, settings)
+
+    assert len(calls) == 2
+    assert get_search_cache(settings) is None
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from src.sieve.config import Settings
+from src.sieve.services.exceptions import SearchError
+from src.sieve.services.google import SearchResult
+from src.sieve.services.search_providers import (
+    FanOutSearchProvider,
+    GoogleSearchProvider,
+    LatencyTracker,
+    StaticSearchProvider,
+    get_search_provider,
+)
+
+
+def result(url, index=1):
+    return SearchResult(title=url, url=url, snippet="", index=index)
+
+
+def fanout(*providers, policy="first", hedge_min_delay=0.05):
+    return FanOutSearchProvider(
+        providers,
+        policy=policy,
+        hedge_enabled=True,
+        hedge_percentile=0.95,
+        hedge_min_delay=hedge_min_delay,
+    )
+
+
+def test_latency_tracker_percentile_uses_rolling_window():
+    tracker = LatencyTracker(window=3)
+    assert tracker.percentile(0.95) is None
+    for sample in (5.0, 0.1, 0.2, 0.3):
+        tracker.record(sample)
+    assert tracker.percentile(0.95) == 0.3
+    assert tracker.percentile(0.5) == 0.2
+
+
+def test_get_search_provider_offers_only_real_providers():
+    assert isinstance(get_search_provider(Settings()), GoogleSearchProvider)
+    duplicated = get_search_provider(Settings(search_providers=["google", "google"]))
+    assert isinstance(duplicated, GoogleSearchProvider)
+    with pytest.raises(ValidationError):
+        Settings(search_providers=["google", "static"])
+
+
+@pytest.mark.anyio("asyncio")
+async def test_first_policy_hedges_slow_primary():
+    slow = StaticSearchProvider([result("https://slow.test")], name="slow", delay=1.0)
+    fast = StaticSearchProvider([result("https://fast.test")], name="fast")
+    provider = fanout(slow, fast)
+
+    started = time.perf_counter()
+    results = await provider.search("q", 5, Settings())
+
+    assert [item.url for item in results] == ["https://fast.test"]
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.anyio("asyncio")
+async def test_first_policy_fails_over_without_waiting_for_hedge_delay():
+    broken = StaticSearchProvider(name="broken", error=SearchError("down"))
+    backup = StaticSearchProvider([result("https://backup.test")], name="backup")
+    provider = fanout(broken, backup, hedge_min_delay=5.0)
+
+    results = await asyncio.wait_for(provider.search("q", 5, Settings()), timeout=1.0)
+
+    assert [item.url for item in results] == ["https://backup.test"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_first_policy_raises_when_every_provider_fails():
+    provider = fanout(
+        StaticSearchProvider(name="a", error=SearchError("boom")),
+        StaticSearchProvider(name="b", error=SearchError("bust")),
+    )
+    with pytest.raises(SearchError, match="a: boom; b: bust"):
+        await provider.search("q", 5, Settings())
+
+
+@pytest.mark.anyio("asyncio")
+async def test_merge_policy_interleaves_and_deduplicates():
+    first = StaticSearchProvider(
+        [result("https://a.test", 1), result("https://www.shared.test/", 2)], name="first"
+    )
+    second = StaticSearchProvider(
+        [result("https://shared.test", 1), result("https://b.test", 2)], name="second"
+    )
+    failing = StaticSearchProvider(name="failing", error=SearchError("down"))
+    provider = fanout(first, second, failing, policy="merge")
+
+    results = await provider.search("q", 10, Settings())
+
+    assert [item.url for item in results] == [
+        "https://a.test",
+        "https://shared.test",
+        "https://b.test",
+    ]
+    assert [item.index for item in results] == [1, 2, 3]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_saturated_google_limiter_is_a_search_error(monkeypatch):
+    from src.sieve.services import search_providers
+    from src.sieve.services.concurrency import GOOGLE_UPSTREAM, get_upstream_admission
+
+    async def fake_search(query, top_n, settings, client=None):
+        return [result("https://example.com")]
+
+    monkeypatch.setattr(search_providers, "search_google", fake_search)
+    settings = Settings(google_max_concurrency=1, admission_deadline=0.01)
+
+    async with get_upstream_admission(GOOGLE_UPSTREAM, settings).admit():
+        with pytest.raises(SearchError):
+            await GoogleSearchProvider().search("q", 5, settings)
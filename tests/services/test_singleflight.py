@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from src.sieve.services.singleflight import SingleFlight
+
+
+@pytest.mark.anyio("asyncio")
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await release.wait()
+        return "done"
+
+    waiters = [asyncio.create_task(flight.run("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["done"] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_errors_propagate_to_every_caller():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        raise ValueError("boom")
+
+    waiters = [asyncio.create_task(flight.run("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.anyio("asyncio")
+async def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    leader = asyncio.create_task(flight.run("key", work))
+    follower = asyncio.create_task(flight.run("key", work))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == 42
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.anyio("asyncio")
+async def test_work_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.create_task(flight.run("key", work)) for _ in range(2)]
+    await started.wait()
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled.is_set()
+    assert flight.in_flight() == 0
@@ -0,0 +1,70 @@
+from dataclasses import replace
+
+from src.sieve.config import Settings
+from src.sieve.services.google import SearchResult
+from src.sieve.services.source_packing import estimate_tokens, pack_sources
+
+
+def make_result(index, snippet, url=None):
+    return SearchResult(
+        title=f"Title {index}",
+        url=url or f"https://example.com/{index}",
+        snippet=snippet,
+        index=index,
+    )
+
+
+def test_near_duplicate_snippets_are_dropped_and_sources_renumbered():
+    snippet = "python asyncio runs coroutines concurrently on a single event loop thread"
+    results = [
+        make_result(1, snippet),
+        make_result(2, snippet + " today"),
+        make_result(3, "pydantic validates data with type hints at runtime"),
+    ]
+
+    packed = pack_sources(results, "gpt", Settings(sources_token_budget=0))
+
+    assert [item.url for item in packed.results] == [
+        "https://example.com/1",
+        "https://example.com/3",
+    ]
+    assert [item.index for item in packed.results] == [1, 2]
+    assert packed.block.startswith("[1] Title 1\n")
+    assert "[2] Title 3" in packed.block
+    assert packed.dropped == 1
+    assert packed.footer == f"Citations:\n{packed.block}"
+
+
+def test_budget_keeps_sources_in_rank_order_and_trims_the_last_one():
+    long_snippet = " ".join(f"word{number}" for number in range(200))
+    results = [make_result(index, f"{index} {long_snippet}") for index in range(1, 6)]
+    settings = Settings(sources_token_budget=900, sources_dedup_threshold=1.0)
+
+    packed = pack_sources(results, "gpt", settings)
+
+    assert packed.tokens <= 900
+    assert estimate_tokens(packed.block) <= 900
+    assert [item.index for item in packed.results] == [1, 2, 3]
+    assert packed.results[-1].snippet.endswith("…")
+    assert packed.results[0].snippet == results[0].snippet
+
+
+def test_per_model_budget_overrides_the_default():
+    results = [make_result(1, "short snippet about search")]
+    settings = Settings(sources_token_budget=0, sources_token_budgets={"tiny": 5})
+
+    assert pack_sources(results, "gpt", settings).results
+    tiny = pack_sources(results, "tiny", settings)
+    assert tiny.results == []
+    assert tiny.block == "(no search results available)"
+
+
+def test_page_content_is_packed_but_citations_keep_the_snippet():
+    page_text = "full page text explaining the event loop in much more detail"
+    results = [replace(make_result(1, "short snippet"), content=page_text)]
+
+    packed = pack_sources(results, "gpt", Settings(sources_token_budget=0))
+
+    assert page_text in packed.block
+    assert "short snippet" not in packed.block
+    assert packed.footer == "Citations:\n[1] Title 1\nhttps://example.com/1\nshort snippet"
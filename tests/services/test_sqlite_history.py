@@ -0,0 +1,177 @@
+import threading
+
+import pytest
+
+from src.sieve.config import Settings
+from src.sieve.services import history
+from src.sieve.repositories.sqlite_history_repository import SqliteHistoryRepository
+from src.sieve.services.google import SearchResult
+from src.sieve.services.history import HistoryStore, build_history_store
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = SqliteHistoryRepository(str(tmp_path / "history.db"), max_size=2)
+    yield repo
+    repo.close()
+
+
+def insert(repo, query, **overrides):
+    values = {
+        "query": query,
+        "top_n": 1,
+        "model": "gpt",
+        "answer_markdown": f"answer to {query}",
+        "message": None,
+        "citations": [],
+        "results": [SearchResult(title="T", url="https://example.com", snippet="S", index=1)],
+        "search_used": True,
+    }
+    values.update(overrides)
+    return repo.insert(**values)
+
+
+def test_insert_lists_newest_first_and_truncates(repository):
+    insert(repository, "first")
+    second = insert(repository, "second")
+    third = insert(repository, "third")
+
+    items = repository.list().items
+
+    assert [item.id for item in items] == [third.id, second.id]
+    assert items[1].results[0].url == "https://example.com"
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "history.db")
+    repo = SqliteHistoryRepository(path, max_size=10)
+    entry = insert(repo, "persisted")
+    repo.close()
+
+    reopened = SqliteHistoryRepository(path, max_size=10)
+    try:
+        items = reopened.list().items
+    finally:
+        reopened.close()
+
+    assert [item.id for item in items] == [entry.id]
+    assert items[0].created_at == entry.created_at
+
+
+def test_delete_and_clear(repository):
+    entry = insert(repository, "gone")
+    insert(repository, "kept")
+
+    assert repository.delete(entry.id) is True
+    assert repository.delete(entry.id) is False
+    assert [item.query for item in repository.list().items] == ["kept"]
+
+    repository.clear()
+    assert repository.list().items == []
+
+
+def test_database_uses_wal_mode(repository):
+    mode = repository._reader.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_build_history_store_selects_backend(tmp_path):
+    assert isinstance(build_history_store(Settings()), HistoryStore)
+
+    store = build_history_store(
+        Settings(history_backend="sqlite", history_db_path=str(tmp_path / "h.db"))
+    )
+    try:
+        assert isinstance(store, SqliteHistoryRepository)
+    finally:
+        store.close()
+
+
+def test_list_page_uses_keyset_cursor(tmp_path):
+    repo = SqliteHistoryRepository(str(tmp_path / "history.db"), max_size=10)
+    try:
+        for index in range(5):
+            insert(repo, f"q{index}")
+
+        first = repo.list_page(limit=3)
+        second = repo.list_page(limit=3, cursor=first.next_cursor)
+    finally:
+        repo.close()
+
+    assert [item.query for item in first.items] == ["q4", "q3", "q2"]
+    assert [item.query for item in second.items] == ["q1", "q0"]
+    assert second.next_cursor is None
+
+
+def test_version_is_persisted_and_bumped_by_effective_writes(tmp_path):
+    path = str(tmp_path / "history.db")
+    repo = SqliteHistoryRepository(path, max_size=10)
+    entry = insert(repo, "q")
+    repo.delete(entry.id)
+    repo.delete(entry.id)
+    version = repo.list().version
+    repo.close()
+
+    reopened = SqliteHistoryRepository(path, max_size=10)
+    try:
+        assert version == 2
+        assert reopened.version == version
+    finally:
+        reopened.close()
+
+
+def test_search_uses_full_text_index(repository):
+    insert(repository, "What is asyncio?", answer_markdown="event loop")
+    match = insert(repository, "Web frameworks", answer_markdown="django asyncio")
+    repository.delete(match.id)
+    kept = insert(repository, "Databases", answer_markdown="postgres")
+
+    assert [item.query for item in repository.search("asyncio", 10).items] == [
+        "What is asyncio?"
+    ]
+    assert [item.id for item in repository.search("POSTGRES", 10).items] == [kept.id]
+    assert repository.search("!!!", 10).items == []
+
+
+def test_flush_returns_while_inserts_keep_arriving(repository):
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            insert(repository, "busy")
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        flusher = threading.Thread(target=repository.flush)
+        flusher.start()
+        flusher.join(timeout=5)
+        assert not flusher.is_alive()
+    finally:
+        stop.set()
+        producer.join()
+
+
+def test_history_store_reopens_after_close(tmp_path, monkeypatch):
+    settings = Settings(history_backend="sqlite", history_db_path=str(tmp_path / "h.db"))
+    monkeypatch.setattr(history, "get_settings", lambda: settings)
+    monkeypatch.setattr(history, "history_store", None)
+
+    first = history.get_history_store()
+    history.close_history_store()
+    history.add_history_entry(
+        query="after restart",
+        top_n=1,
+        model="gpt",
+        answer_markdown="text",
+        message=None,
+        citations=[],
+        results=[],
+        search_used=False,
+    )
+
+    try:
+        assert history.get_history_store() is not first
+        assert [item.query for item in history.list_entries().items] == ["after restart"]
+    finally:
+        history.close_history_store()
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from src.sieve.services.tracing import current_trace, span, start_trace
+
+
+def test_span_outside_a_trace_is_a_no_op():
+    with span("search"):
+        pass
+    assert current_trace() is None
+
+
+def test_timings_sum_repeated_stages_and_header_ends_with_total():
+    with start_trace("abc") as trace:
+        trace.record("search", 0.010)
+        trace.record("openai", 0.200)
+        trace.record("search", 0.005)
+
+    assert trace.timings() == {"search": 15.0, "openai": 200.0}
+    header = trace.server_timing()
+    assert header.startswith("search;dur=15.0, openai;dur=200.0, total;dur=")
+    assert current_trace() is None
+
+
+@pytest.mark.anyio("asyncio")
+async def test_spans_from_spawned_tasks_land_in_the_request_trace():
+    async def stage(name):
+        with span(name):
+            await asyncio.sleep(0)
+
+    with start_trace("abc") as trace:
+        await asyncio.gather(stage("a"), stage("b"))
+
+    assert sorted(trace.timings()) == ["a", "b"]
@@ -31,6 +31,13 @@ def test_resolve_model_rejects_unknown_model():
     assert exc.value.status_code == 400
 
 
+def test_resolve_model_accepts_auto_only_when_enabled():
+    payload = type("Payload", (), {"query": "q", "model": "auto", "top_n": None})()
+    assert resolve_model(payload, Settings(openai_auto_enabled=True)) == "auto"
+    with pytest.raises(AskServiceError):
+        resolve_model(payload, Settings())
+
+
 def test_resolve_top_n_respects_limits():
     settings = Settings(default_top_n=5, min_top_n=1, max_top_n=10)
     payload = type("Payload", (), {"query": "q", "model": None, "top_n": 50})()